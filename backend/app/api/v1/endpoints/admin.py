@@ -0,0 +1,84 @@
+"""
+Admin Endpoints
+Operational tools restricted to holders of ADMIN_TOKEN
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.database import db
+from app.core.metrics import recent_loop_blocks
+from app.core.profiling import collapsed_stacks, get_profile, list_profiles
+from app.core.query_log import get_slow_queries, reset_slow_queries
+from app.core.security import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def get_profiles():
+    """
+    List recent request profiles, newest first
+    
+    Profile a request by sending it with `X-Profile: 1` and `X-Admin-Token`;
+    the response carries the profile id in `X-Profile-Id`.
+    """
+    profiles = list_profiles()
+    return {"profiles": profiles, "count": len(profiles)}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(profile_id: str):
+    """Full profile: top functions, flame stacks, peak memory and top allocations"""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return profile
+
+
+@router.get("/profiles/{profile_id}/flame", response_class=PlainTextResponse)
+async def get_request_flame(profile_id: str):
+    """Flame data as collapsed stacks (for flamegraph.pl or speedscope)"""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return collapsed_stacks(profile)
+
+
+@router.get("/loop-blocks")
+async def get_loop_blocks():
+    """
+    Recent event loop stalls beyond LOOP_BLOCK_THRESHOLD_MS, newest first
+    
+    Each stall names the route whose task held the loop and the stack
+    captured while it was blocked (innermost frame last).
+    """
+    blocks = recent_loop_blocks()
+    return {"blocks": blocks, "count": len(blocks)}
+
+
+@router.get("/slow-queries")
+async def get_slow_query_log(
+    explain: bool = Query(True, description="Run explain() on shapes not yet planned"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    MongoDB query shapes slower than SLOW_QUERY_MS, by total time spent
+    
+    Each shape carries its winning plan (stages, indexes, COLLSCAN and
+    in-memory SORT flags) and, when the plan scans or sorts in memory and
+    no existing index covers it, a suggested compound index.
+    """
+    shapes = await get_slow_queries(db.client, explain=explain)
+    return {
+        "shapes": shapes[:limit],
+        "count": len(shapes),
+        "collscans": sum(1 for shape in shapes if (shape["plan"] or {}).get("collscan")),
+    }
+
+
+@router.delete("/slow-queries")
+async def clear_slow_query_log():
+    """Forget every logged query shape"""
+    return {"cleared": reset_slow_queries()}
@@ -1,47 +1,167 @@
 """
 Alerts Endpoints
 """
-from fastapi import APIRouter, HTTPException, Query
-from app.models.alert import Alert
-from datetime import datetime
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from pydantic import BaseModel
+from typing import List, Optional
+from app.core.security import require_admin
+from app.services.alert_archive import archive_closed_alerts
+from app.utils.alert_templates import DEFAULT_LOCALE
+from app.services.alerts import (
+    ALERT_STATUSES,
+    ALERT_TRANSITIONS,
+    alert_filter,
+    list_alerts,
+    migrate_alert_text,
+    transition_alert,
+    transition_alerts
+)
 
 router = APIRouter()
 
 @router.get("/active")
-async def get_active_alerts(field_id: str = Query(...)):
-    """Get all active alerts"""
-    alerts = await Alert.find(
-        Alert.field_id == field_id,
-        Alert.status == "active"
-    ).sort("-timestamp").to_list()
+async def get_active_alerts(
+    field_id: str = Query(...),
+    severity: Optional[str] = Query(None, description="info, warning or critical"),
+    alert_type: Optional[str] = Query(None, description="Alert type, e.g. pest_outbreak"),
+    zone_id: Optional[str] = Query(None),
+    crop_type: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None, description="Inclusive start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Inclusive end date (YYYY-MM-DD)"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    locale: str = Query(DEFAULT_LOCALE, description="Language for alert text")
+):
+    """Get active alerts, newest first, one page at a time with counts by severity and type"""
+    query = alert_filter(field_id, "active", severity, alert_type, zone_id, crop_type, start_date, end_date)
+    
+    try:
+        page = await list_alerts(query, limit, cursor, locale=locale)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "active_alerts": [
-            {
-                "alert_id": str(alert.id),
-                "type": alert.alert_type,
-                "severity": alert.severity,
-                "zone_id": alert.zone_id,
-                "timestamp": alert.timestamp,
-                "message": alert.message,
-                "metrics": alert.metrics,
-                "recommendation": alert.recommendation
-            }
-            for alert in alerts
-        ],
-        "total_active": len(alerts)
+        "active_alerts": page["alerts"],
+        "total_active": page["counts"]["total"],
+        "counts": page["counts"],
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"]
     }
 
 
+@router.get("/")
+async def get_alerts(
+    field_id: str = Query(...),
+    status: Optional[str] = Query("active", description="active, acknowledged, resolved or all"),
+    severity: Optional[str] = Query(None, description="info, warning or critical"),
+    alert_type: Optional[str] = Query(None, description="Alert type, e.g. pest_outbreak"),
+    zone_id: Optional[str] = Query(None),
+    crop_type: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None, description="Inclusive start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Inclusive end date (YYYY-MM-DD)"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_counts: bool = Query(True, description="Include counts by severity and type"),
+    include_archived: bool = Query(False, description="Also return alerts moved to the archive"),
+    locale: str = Query(DEFAULT_LOCALE, description="Language for alert text")
+):
+    """Get alerts in any status with filters, keyset pagination and facet counts"""
+    if status == "all":
+        status = None
+    elif status not in ALERT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(ALERT_STATUSES)} or all")
+    
+    query = alert_filter(field_id, status, severity, alert_type, zone_id, crop_type, start_date, end_date)
+    
+    try:
+        return await list_alerts(query, limit, cursor, include_counts, include_archived, locale)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/acknowledge/{alert_id}")
 async def acknowledge_alert(alert_id: str):
     """Acknowledge an alert"""
-    alert = await Alert.get(alert_id)
+    alert = await transition_alert("acknowledge", alert_id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    
+    return {"status": "success", "alert_id": alert_id, "alert_status": alert["status"]}
+
+
+@router.post("/resolve/{alert_id}")
+async def resolve_alert(alert_id: str):
+    """Resolve an alert"""
+    alert = await transition_alert("resolve", alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    alert.acknowledged = True
-    alert.acknowledged_at = datetime.utcnow()
-    await alert.save()
+    return {"status": "success", "alert_id": alert_id, "alert_status": alert["status"]}
+
+
+class BulkTransitionRequest(BaseModel):
+    alert_ids: Optional[List[str]] = None
+    field_id: Optional[str] = None
+    zone_id: Optional[str] = None
+    alert_type: Optional[str] = None
+    severity: Optional[str] = None
+    crop_type: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+@router.post("/bulk/{action}")
+async def bulk_transition_alerts(action: str, request: BulkTransitionRequest = Body(...)):
+    """
+    Acknowledge or resolve many alerts in one update
+    
+    Pass either alert_ids, or a field_id with optional zone, type, severity,
+    crop and date range filters (e.g. every pest alert in a sprayed zone).
+    
+    Args:
+        action: acknowledge or resolve
+    """
+    if action not in ALERT_TRANSITIONS:
+        raise HTTPException(status_code=400, detail=f"action must be one of {', '.join(ALERT_TRANSITIONS)}")
+    if bool(request.alert_ids) == bool(request.field_id):
+        raise HTTPException(status_code=400, detail="Provide either alert_ids or a field_id filter")
+    
+    try:
+        if request.alert_ids:
+            result = await transition_alerts(action, alert_ids=request.alert_ids)
+        else:
+            query = alert_filter(
+                request.field_id, None, request.severity, request.alert_type, request.zone_id,
+                request.crop_type, request.start_date, request.end_date
+            )
+            result = await transition_alerts(action, query=query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"status": "success", **result}
+
+
+@router.post("/archive", dependencies=[Depends(require_admin)])
+async def archive_alerts(
+    older_than_days: Optional[int] = Query(None, ge=0, description="Defaults to ALERT_ARCHIVE_AFTER_DAYS"),
+    field_id: Optional[str] = Query(None, description="Restrict to one field")
+):
+    """
+    Move acknowledged and resolved alerts older than the archive age to alerts_archive
+    
+    Safe to re-run; schedule it daily (e.g. from cron) to keep the hot collection small.
+    Archived alerts stay readable through GET /alerts/?include_archived=true.
+    """
+    result = await archive_closed_alerts(older_than_days, field_id)
+    return {"status": "success", **result}
+
+
+@router.post("/migrate-text", dependencies=[Depends(require_admin)])
+async def migrate_alerts_to_templates():
+    """
+    Convert alerts stored with rendered text to template ids plus metrics
     
-    return {"status": "success", "alert_id": alert_id}
+    Returns the number of alerts converted and the BSON bytes before and after.
+    """
+    result = await migrate_alert_text()
+    return {"status": "success", **result}
@@ -3,7 +3,9 @@ Canopy Coverage Endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
 from app.models.daily_data import DailyData
-from datetime import datetime, timedelta
+from app.services.grid_store import hydrate_daily_grids
+from app.utils.dates import trend_window
+from datetime import datetime
 
 router = APIRouter()
 
@@ -24,6 +26,8 @@ async def get_daily_canopy_data(
     if not data:
         raise HTTPException(status_code=404, detail="No data found")
     
+    data = await hydrate_daily_grids(data)
+    
     return {
         "date": data.date,
         "grid_data": data.heatmaps["canopy_grid"],
@@ -45,13 +49,13 @@ async def get_canopy_trend(
     days: int = Query(7, ge=1, le=30)
 ):
     """Get canopy trend over time"""
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
+    window = trend_window(days)
+    start_date, end_date = window[0], window[-1]
     
     daily_data = await DailyData.find(
         DailyData.field_id == field_id,
-        DailyData.timestamp >= start_date,
-        DailyData.timestamp <= end_date
+        DailyData.date >= start_date,
+        DailyData.date <= end_date
     ).sort("date").to_list()
     
     daily_averages = [
@@ -4,7 +4,11 @@ Dashboard KPI Endpoints
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime, timedelta
 from app.models.daily_data import DailyData
-from app.models.alert import Alert
+from app.services.dashboard_bundle import BUNDLE_SECTIONS, DEFAULT_SECTIONS, build_bundle, today_kpis
+from app.services.field_state import get_field_state
+from app.services.grid_changes import get_grid_changes
+from app.utils.dates import trend_window
+from app.utils.encoding import GRID_ENCODINGS, encode_grid
 
 router = APIRouter()
 
@@ -14,57 +18,25 @@ async def get_today_kpis(field_id: str = Query(...)):
     today = datetime.utcnow().strftime("%Y-%m-%d")
     yesterday = (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
     
-    today_data = await DailyData.find_one(
-        DailyData.field_id == field_id,
-        DailyData.date == today
-    )
-    
-    yesterday_data = await DailyData.find_one(
-        DailyData.field_id == field_id,
-        DailyData.date == yesterday
-    )
+    state = await get_field_state(field_id)
+    kpis = today_kpis(state, today, yesterday)
     
-    if not today_data:
+    if kpis is None:
         raise HTTPException(status_code=404, detail="No data for today")
     
-    # Calculate changes
-    pest_change = 0
-    canopy_change = 0
-    if yesterday_data:
-        pest_change = today_data.aggregates["pest_count"] - yesterday_data.aggregates["pest_count"]
-        canopy_change = today_data.aggregates["avg_canopy"] - yesterday_data.aggregates["avg_canopy"]
-    
-    # Check active alerts
-    active_alerts = await Alert.find(
-        Alert.field_id == field_id,
-        Alert.status == "active"
-    ).count()
-    
-    return {
-        "date": today,
-        "pest_count": today_data.aggregates["pest_count"],
-        "avg_canopy_cover": today_data.aggregates["avg_canopy"],
-        "change_vs_yesterday": {
-            "pest_change": pest_change,
-            "pest_change_pct": (pest_change / yesterday_data.aggregates["pest_count"] * 100) if yesterday_data else 0,
-            "canopy_change": canopy_change,
-            "canopy_change_pct": (canopy_change / yesterday_data.aggregates["avg_canopy"] * 100) if yesterday_data else 0
-        },
-        "status": "critical" if active_alerts > 0 else "healthy",
-        "active_alerts": active_alerts
-    }
+    return kpis
 
 
 @router.get("/kpis/weekly")
 async def get_weekly_kpis(field_id: str = Query(...)):
     """Get weekly KPIs and trends"""
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=7)
+    window = trend_window(7)
+    start_date, end_date = window[0], window[-1]
     
     daily_data = await DailyData.find(
         DailyData.field_id == field_id,
-        DailyData.timestamp >= start_date,
-        DailyData.timestamp <= end_date
+        DailyData.date >= start_date,
+        DailyData.date <= end_date
     ).sort("date").to_list()
     
     if not daily_data:
@@ -78,8 +50,8 @@ async def get_weekly_kpis(field_id: str = Query(...)):
     canopy_trend = "improving" if daily_canopy_avg[-1] > daily_canopy_avg[0] else "declining"
     
     return {
-        "week_start": start_date.strftime("%Y-%m-%d"),
-        "week_end": end_date.strftime("%Y-%m-%d"),
+        "week_start": start_date,
+        "week_end": end_date,
         "daily_pest_counts": daily_pest_counts,
         "daily_canopy_avg": daily_canopy_avg,
         "weekly_summary": {
@@ -89,3 +61,68 @@ async def get_weekly_kpis(field_id: str = Query(...)):
             "canopy_trend": canopy_trend
         }
     }
+
+
+@router.get("/bundle")
+async def get_dashboard_bundle(
+    field_id: str = Query(...),
+    sections: str = Query(",".join(DEFAULT_SECTIONS), description=f"Comma-separated sections: {', '.join(BUNDLE_SECTIONS)}"),
+    days: int = Query(7, ge=1, le=30, description="Trend window in days"),
+    alerts_limit: int = Query(50, ge=1, le=500, description="Maximum alerts in the alerts section")
+):
+    """
+    Get several dashboard sections in one response
+    
+    Each section has the same shape as its standalone endpoint and is null
+    when there is no data for it.
+    """
+    requested = [section.strip() for section in sections.split(",") if section.strip()]
+    unknown = [section for section in requested if section not in BUNDLE_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    
+    try:
+        bundle = await build_bundle(field_id, requested, days, alerts_limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building dashboard bundle: {str(e)}")
+    
+    return {"field_id": field_id, "sections": bundle}
+
+
+@router.get("/changes")
+async def get_grid_changes_between(
+    field_id: str = Query(...),
+    to_date: str = Query(None, description="Later date (defaults to today)"),
+    from_date: str = Query(None, description="Earlier date (defaults to the day before to_date)"),
+    encoding: str = Query("json", description="Grid encoding: json or binary")
+):
+    """Get per-cell canopy and pest change grids plus new and resolved hotspots between two dates"""
+    if encoding not in GRID_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(GRID_ENCODINGS)}")
+    
+    try:
+        later = datetime.strptime(to_date, "%Y-%m-%d") if to_date else datetime.utcnow()
+        earlier = datetime.strptime(from_date, "%Y-%m-%d") if from_date else later - timedelta(days=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from_date and to_date must be YYYY-MM-DD dates")
+    to_date, from_date = later.strftime("%Y-%m-%d"), earlier.strftime("%Y-%m-%d")
+    
+    try:
+        result = await get_grid_changes(field_id, from_date, to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if not result:
+        raise HTTPException(status_code=404, detail="No grid data for one or both dates")
+    
+    changes = result["changes"]
+    return {
+        "field_id": field_id,
+        "from_date": from_date,
+        "to_date": to_date,
+        "summary": result["summary"],
+        "canopy_delta": encode_grid(changes["canopy_delta"], encoding),
+        "pest_delta": encode_grid(changes["pest_delta"], encoding),
+        "new_hotspots": encode_grid(changes["new_hotspots"].astype("uint8"), encoding),
+        "resolved_hotspots": encode_grid(changes["resolved_hotspots"].astype("uint8"), encoding)
+    }
@@ -1,11 +1,27 @@
 """
 Drone status and flight history endpoints
 """
-from fastapi import APIRouter, HTTPException, Body
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, Field, ValidationError
+from beanie.odm.operators.update.general import Set
+from app.core.config import settings
+from app.core.security import require_admin
 from app.models.drone import DroneStatus, FlightRecord
+from app.services.flight_stats import (
+    backfill_flight_drone_ids,
+    count_flights,
+    create_drone,
+    flight_filter,
+    rebuild_flight_counters,
+    record_flight,
+    summarize_flights
+)
+from app.services.overview import FLEET_SORTS, fleet_overview
+from app.services.telemetry import get_downsampled_telemetry, ingest_telemetry
+from app.utils.dates import naive_utc
+from app.utils.pagination import encode_cursor, keyset_filter
 
 router = APIRouter()
 
@@ -26,29 +42,27 @@ async def get_drone_status(drone_id: str = "drone_001"):
         drone = await DroneStatus.find_one(DroneStatus.drone_id == drone_id)
         
         if not drone:
-            # Create default drone status if not found
+            # Create default drone status (with counters from its flight history) if not found
             now = datetime.utcnow()
-            drone = DroneStatus(
-                drone_id=drone_id,
+            drone = await create_drone(
+                drone_id,
                 last_maintenance=now - timedelta(days=60),  # Last maintenance 60 days ago
                 next_service_due=now + timedelta(days=30)   # Next service in 30 days
             )
-            await drone.insert()
         
-        # Get recent flight history
+        # Counters are kept current by log_flight and synced at startup; a legacy
+        # drone that has not been synced yet is totalled here without writing
+        if not drone.counters_synced:
+            counters = await count_flights(drone_id)
+            drone.total_flights = counters["total_flights"]
+            drone.total_flight_minutes = counters["total_flight_minutes"]
+        drone.total_flight_hours = round(drone.total_flight_minutes / 60, 1)
+        
+        # Get recent flight history (served by the (drone_id, date) index)
         flights = await FlightRecord.find(
-            FlightRecord.field_id == "field_001"
+            FlightRecord.drone_id == drone_id
         ).sort(-FlightRecord.date).limit(10).to_list()
         
-        # Calculate total flight statistics from all flight records
-        all_flights = await FlightRecord.find(
-            FlightRecord.field_id == "field_001"
-        ).to_list()
-        
-        # Update drone statistics with accurate calculations
-        drone.total_flights = len(all_flights)
-        drone.total_flight_hours = round(sum(f.duration for f in all_flights) / 60, 1) if all_flights else 0.0
-        
         # Calculate service due days
         if drone.next_service_due:
             days_until_service = (drone.next_service_due - datetime.utcnow()).days
@@ -63,53 +77,126 @@ async def get_drone_status(drone_id: str = "drone_001"):
         raise HTTPException(status_code=500, detail=f"Error fetching drone status: {str(e)}")
 
 
+def _parse_date_range(
+    start_date: Optional[str],
+    end_date: Optional[str]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Parse inclusive range bounds; a bare end date covers that whole day"""
+    try:
+        start = datetime.fromisoformat(start_date) if start_date else None
+        end = datetime.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        raise ValueError("Dates must be YYYY-MM-DD or ISO datetimes")
+    if end is not None and len(end_date) == 10:
+        end = end.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return start, end
+
+
+@router.get("/fleet")
+async def get_fleet_status(
+    sort_by: str = Query("risk", description="Sort: risk, drone_id, battery or service_due"),
+    operational_status: Optional[str] = Query(None, description="Filter: active, standby or offline"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Get status, last flight and service due for every drone
+    
+    Args:
+        sort_by: Sort order; risk puts drones needing attention first
+        operational_status: Optional status filter
+        skip: Number of drones to skip
+        limit: Page size
+    """
+    if sort_by not in FLEET_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {', '.join(FLEET_SORTS)}")
+    
+    try:
+        fleet = await fleet_overview(sort_by, skip, limit, operational_status)
+        return {"drones": fleet.pop("items"), **fleet}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching fleet status: {str(e)}")
+
+
 @router.get("/flights")
 async def get_flight_history(
     drone_id: str = "drone_001",
-    limit: int = 30,
-    field_id: Optional[str] = None
+    limit: int = Query(30, ge=1, le=500),
+    field_id: Optional[str] = None,
+    start_date: Optional[str] = Query(None, description="Inclusive start (YYYY-MM-DD or ISO datetime)"),
+    end_date: Optional[str] = Query(None, description="Inclusive end (YYYY-MM-DD or ISO datetime)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_summary: bool = True
 ):
     """
-    Get detailed flight history
+    Get detailed flight history, newest first, one page at a time
     
     Args:
         drone_id: Drone identifier
-        limit: Maximum number of flights to return
+        limit: Page size
         field_id: Optional field filter
+        start_date: Optional inclusive start of the date range
+        end_date: Optional inclusive end of the date range
+        cursor: Continue after the last flight of a previous page
+        include_summary: Include the summary over the whole filtered range
     """
     try:
-        query = {}
-        if field_id:
-            query["field_id"] = field_id
-            
+        start, end = _parse_date_range(start_date, end_date)
+        query = flight_filter(drone_id, field_id, start, end)
+        if cursor:
+            query = {"$and": [query, keyset_filter("date", cursor)]}
+        
         flights = await FlightRecord.find(query).sort(
-            -FlightRecord.date
-        ).limit(limit).to_list()
-        
-        # Calculate summary statistics
-        total_distance = sum(f.distance_covered for f in flights)
-        total_duration = sum(f.duration for f in flights)
-        total_images = sum(f.images_captured for f in flights)
-        success_rate = (
-            sum(1 for f in flights if f.status == "success") / len(flights) * 100
-            if flights else 0
-        )
+            [("date", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list()
         
-        return {
+        has_more = len(flights) > limit
+        flights = flights[:limit]
+        next_cursor = encode_cursor(flights[-1].date, flights[-1].id) if has_more else None
+        
+        response = {
             "flights": [flight.dict() for flight in flights],
-            "summary": {
-                "total_flights": len(flights),
-                "total_distance_km": round(total_distance, 2),
-                "total_flight_hours": round(total_duration / 60, 2),
-                "total_images": total_images,
-                "success_rate": round(success_rate, 1)
-            }
+            "next_cursor": next_cursor,
+            "has_more": has_more
         }
+        if include_summary:
+            response["summary"] = await summarize_flights(drone_id, field_id, start, end)
+        return response
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching flight history: {str(e)}")
 
 
+@router.get("/flights/summary")
+async def get_flight_summary(
+    drone_id: str = "drone_001",
+    field_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    """
+    Get flight totals over the whole filtered range
+    
+    Args:
+        drone_id: Drone identifier
+        field_id: Optional field filter
+        start_date: Optional inclusive start of the date range
+        end_date: Optional inclusive end of the date range
+    """
+    try:
+        start, end = _parse_date_range(start_date, end_date)
+        summary = await summarize_flights(drone_id, field_id, start, end)
+        return {"drone_id": drone_id, "field_id": field_id, "summary": summary}
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching flight summary: {str(e)}")
+
+
 @router.post("/update-status")
 class DroneStatusUpdate(BaseModel):
     battery_level: Optional[int] = None
@@ -136,16 +223,16 @@ async def update_drone_status(
         if not drone:
             raise HTTPException(status_code=404, detail="Drone not found")
         
-        # Update fields if provided
+        # Update fields if provided (partially, leaving the flight counters to $inc)
+        updates = {DroneStatus.last_updated: datetime.utcnow()}
         if payload.battery_level is not None:
-            drone.battery_level = payload.battery_level
+            updates[DroneStatus.battery_level] = payload.battery_level
         if payload.operational_status:
-            drone.operational_status = payload.operational_status
+            updates[DroneStatus.operational_status] = payload.operational_status
         if payload.health_status:
-            drone.health_status = payload.health_status
-            
-        drone.last_updated = datetime.utcnow()
-        await drone.save()
+            updates[DroneStatus.health_status] = payload.health_status
+        
+        await drone.update(Set(updates))
         
         return {
             "status": "success",
@@ -176,22 +263,18 @@ async def toggle_auto_flight(
         
         if not drone:
             # Create default drone if not found
-            drone = DroneStatus(drone_id=drone_id)
-            await drone.insert()
+            drone = await create_drone(drone_id)
         
-        # Update auto flight status
-        drone.auto_flight_enabled = enabled
-        drone.last_updated = datetime.utcnow()
-        
-        # Clear next scheduled flight if disabling
-        if not enabled:
-            drone.next_scheduled_flight = None
-        else:
-            # Set next scheduled flight to tomorrow if enabling
-            from datetime import timedelta
-            drone.next_scheduled_flight = datetime.utcnow() + timedelta(days=1)
+        # Clear next scheduled flight if disabling, set it to tomorrow if enabling
+        now = datetime.utcnow()
+        next_scheduled_flight = now + timedelta(days=1) if enabled else None
         
-        await drone.save()
+        # Partial update, so concurrent flight counter increments are never overwritten
+        await drone.update(Set({
+            DroneStatus.auto_flight_enabled: enabled,
+            DroneStatus.next_scheduled_flight: next_scheduled_flight,
+            DroneStatus.last_updated: now,
+        }))
         
         return {
             "status": "success",
@@ -214,17 +297,15 @@ async def upgrade_to_t50(drone_id: str = "drone_001"):
     try:
         drone = await DroneStatus.find_one(DroneStatus.drone_id == drone_id)
         
-        if not drone:
-            # Create new drone with T50 specs
-            drone = DroneStatus(drone_id=drone_id)
-        
         # Update to DJI AGRAS T50 specs
-        drone.model = "DJI AGRAS T50"
-        drone.serial_number = "T50-2024-001"
-        drone.firmware_version = "v3.2.1"
+        updates = {
+            "model": "DJI AGRAS T50",
+            "serial_number": "T50-2024-001",
+            "firmware_version": "v3.2.1",
+        }
         
         # Update camera to DJI Zenmuse P1
-        drone.camera = {
+        updates["camera"] = {
             "model": "DJI Zenmuse P1",
             "resolution": "45MP Full-Frame",
             "sensor_type": "CMOS Full-Frame",
@@ -236,7 +317,7 @@ async def upgrade_to_t50(drone_id: str = "drone_001"):
         }
         
         # Update technical specs
-        drone.specs = {
+        updates["specs"] = {
             "weight": "47.5 kg (with full tank)",
             "max_speed": "10 m/s",
             "max_altitude": "30 m AGL",
@@ -248,7 +329,7 @@ async def upgrade_to_t50(drone_id: str = "drone_001"):
         }
         
         # Update battery specs
-        drone.battery = {
+        updates["battery"] = {
             "type": "DB1560 Intelligent Battery",
             "capacity": "29,000 mAh",
             "voltage": "52.22 V",
@@ -258,17 +339,22 @@ async def upgrade_to_t50(drone_id: str = "drone_001"):
         }
         
         # Set image URL
-        drone.image_url = "/static/drone.png"
+        updates["image_url"] = "/static/drone.png"
         
         # Set maintenance dates if not already set
         now = datetime.utcnow()
-        if not drone.last_maintenance:
-            drone.last_maintenance = now - timedelta(days=60)  # Last maintenance 60 days ago
-        if not drone.next_service_due:
-            drone.next_service_due = now + timedelta(days=30)  # Next service in 30 days
+        if not drone or not drone.last_maintenance:
+            updates["last_maintenance"] = now - timedelta(days=60)  # Last maintenance 60 days ago
+        if not drone or not drone.next_service_due:
+            updates["next_service_due"] = now + timedelta(days=30)  # Next service in 30 days
+        updates["last_updated"] = now
         
-        drone.last_updated = now
-        await drone.save()
+        if not drone:
+            # Create new drone with T50 specs
+            drone = await create_drone(drone_id, **updates)
+        else:
+            # Partial update, so concurrent flight counter increments are never overwritten
+            await drone.update(Set(updates))
         
         return {
             "status": "success",
@@ -290,6 +376,7 @@ class FlightCreate(BaseModel):
     images_captured: int
     status: str = "success"
     field_id: str = "field_001"
+    drone_id: str = "drone_001"
 
 
 @router.post("/log-flight")
@@ -310,15 +397,12 @@ async def log_flight(flight: FlightCreate = Body(...)):
             images_captured=flight.images_captured,
             status=flight.status,
             field_id=flight.field_id,
+            drone_id=flight.drone_id,
         )
         await flight_doc.insert()
         
-        # Update drone statistics
-        drone = await DroneStatus.find_one(DroneStatus.drone_id == "drone_001")
-        if drone:
-            drone.total_flights += 1
-            drone.total_flight_hours += flight.duration / 60
-            await drone.save()
+        # Update drone statistics atomically
+        await record_flight(flight.drone_id, flight.duration)
         
         return {
             "status": "success",
@@ -328,3 +412,103 @@ async def log_flight(flight: FlightCreate = Body(...)):
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error logging flight: {str(e)}")
+
+
+@router.post("/rebuild-counters", dependencies=[Depends(require_admin)])
+async def rebuild_drone_counters(drone_id: str = "drone_001"):
+    """
+    Recompute a drone's total flights and flight hours from its flight records
+    
+    Args:
+        drone_id: Drone identifier
+    """
+    try:
+        drone = await DroneStatus.find_one(DroneStatus.drone_id == drone_id)
+        if not drone:
+            raise HTTPException(status_code=404, detail="Drone not found")
+        
+        await backfill_flight_drone_ids()
+        counters = await rebuild_flight_counters(drone_id)
+        
+        return {
+            "status": "success",
+            "drone_id": drone_id,
+            "total_flights": counters["total_flights"],
+            "total_flight_hours": round(counters["total_flight_minutes"] / 60, 1)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding flight counters: {str(e)}")
+
+
+class TelemetrySample(BaseModel):
+    drone_id: str
+    timestamp: datetime
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    altitude_m: float
+    speed_mps: float = Field(..., ge=0)
+    battery_level: float = Field(..., ge=0, le=100)
+    heading_deg: Optional[float] = Field(None, ge=0, lt=360)
+    signal_strength: Optional[int] = Field(None, ge=0, le=100)
+    field_id: Optional[str] = None
+
+
+class TelemetryBatch(BaseModel):
+    samples: List[TelemetrySample]
+
+
+@router.post("/telemetry")
+async def ingest_drone_telemetry(batch: TelemetryBatch = Body(...)):
+    """
+    Ingest a batch of in-flight telemetry samples (any mix of drones)
+    
+    Drones should buffer samples and post them every few seconds rather
+    than one request per sample.
+    """
+    if len(batch.samples) > settings.TELEMETRY_MAX_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.TELEMETRY_MAX_BATCH} samples"
+        )
+    
+    try:
+        result = await ingest_telemetry([
+            sample.model_dump(exclude_none=True) for sample in batch.samples
+        ])
+        return {"status": "success" if not result["failed"] else "partial", **result}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error ingesting telemetry: {str(e)}")
+
+
+@router.get("/telemetry/{drone_id}")
+async def get_drone_telemetry(
+    drone_id: str,
+    start: Optional[datetime] = Query(None, description="Window start (defaults to 30 minutes before end)"),
+    end: Optional[datetime] = Query(None, description="Window end (defaults to the latest sample)"),
+    max_points: int = Query(300, ge=10, le=settings.TELEMETRY_MAX_POINTS)
+):
+    """
+    Get downsampled telemetry for a drone
+    
+    Samples are averaged into at most max_points time buckets in MongoDB,
+    so a 30-minute flight at 10 Hz comes back as a few hundred points.
+    
+    Args:
+        drone_id: Drone identifier
+        start: Window start
+        end: Window end
+        max_points: Maximum number of buckets
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    try:
+        return await get_downsampled_telemetry(drone_id, start, end, max_points)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching telemetry: {str(e)}")
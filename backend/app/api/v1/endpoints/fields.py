@@ -0,0 +1,51 @@
+"""
+Field Overview Endpoints
+Cross-field summaries for operators managing many fields
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.security import require_admin
+from app.services.field_state import rebuild_all_field_states
+from app.services.overview import FIELD_SORTS, fields_overview
+
+router = APIRouter()
+
+
+@router.get("/overview")
+async def get_fields_overview(
+    sort_by: str = Query("risk", description="Sort: risk, field_id, pest_count or canopy"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Get the latest KPI summary and active alert counts for every field
+    
+    Args:
+        sort_by: Sort order; risk puts fields with critical alerts first
+        skip: Number of fields to skip
+        limit: Page size
+    """
+    if sort_by not in FIELD_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {', '.join(FIELD_SORTS)}")
+    
+    try:
+        overview = await fields_overview(sort_by, skip, limit)
+        return {"fields": overview.pop("items"), **overview}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching fields overview: {str(e)}")
+
+
+@router.post("/rebuild-state", dependencies=[Depends(require_admin)])
+async def rebuild_field_states():
+    """
+    Rebuild every field's live state from daily data and alerts
+    
+    Only needed once for fields ingested before field state existed, or
+    after editing daily_data or alerts directly in MongoDB.
+    """
+    try:
+        field_ids = await rebuild_all_field_states()
+        return {"status": "success", "fields": field_ids, "count": len(field_ids)}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding field state: {str(e)}")
@@ -0,0 +1,50 @@
+"""
+Grid Window Endpoints
+Region-of-interest reads served from chunked grid storage
+"""
+from fastapi import APIRouter, HTTPException, Query
+from app.services.grid_store import list_layers, read_window
+from app.utils.chunks import parse_bbox
+from app.utils.encoding import GRID_ENCODINGS, encode_grid
+
+router = APIRouter()
+
+@router.get("/{field_id}/{date}")
+async def get_grid_window(
+    field_id: str,
+    date: str,
+    bbox: str = Query(None, description="Window as x0,y0,x1,y1 in cells (end-exclusive); full grid if omitted"),
+    layer: str = Query("canopy", description="Layer: canopy, pest or pest:<crop_type>"),
+    encoding: str = Query("json", description="Response encoding: json or binary")
+):
+    """Get exact grid values for a window, reading only the overlapping chunks"""
+    if encoding not in GRID_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(GRID_ENCODINGS)}")
+    
+    window = None
+    if bbox:
+        try:
+            window = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    grid = await read_window(field_id, date, layer, window)
+    if grid is None:
+        available = await list_layers(field_id, date)
+        if not available:
+            raise HTTPException(status_code=404, detail="No grid data found")
+        if layer in available:
+            raise HTTPException(status_code=404, detail="bbox does not overlap the grid")
+        raise HTTPException(
+            status_code=404,
+            detail=f"Layer '{layer}' not found. Available layers: {', '.join(available)}"
+        )
+    
+    x0, y0 = window[:2] if window else (0, 0)
+    return {
+        "field_id": field_id,
+        "date": date,
+        "layer": layer,
+        "bbox": [x0, y0, x0 + grid.shape[1], y0 + grid.shape[0]],
+        "grid": encode_grid(grid, encoding)
+    }
@@ -7,13 +7,22 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Any
 from datetime import datetime
 import numpy as np
+from loguru import logger
 
 from app.models.daily_data import DailyData
-from app.models.alert import Alert
 from app.models.field_config import FieldConfig
 from app.utils.heatmap import bounding_boxes_to_heatmap, find_hotspots
 from app.utils.canopy import calculate_canopy_statistics, find_low_coverage_zones
+from app.services.grid_store import build_layers, write_layers
+from app.services.cell_stats import update_cell_stats
+from app.services.anomaly import detect_anomalies
+from app.services.history_cube import append_day
+from app.services.grid_changes import precompute_daily_changes
+from app.services.correlation import invalidate_correlation
+from app.services.alert_lifecycle import apply_detections
+from app.services.field_state import get_field_state, record_ingestion, refresh_alert_counts
 from app.core.config import settings
+from app.core.metrics import StageTimer
 
 router = APIRouter()
 
@@ -46,6 +55,7 @@ async def ingest_daily_data(request: IngestionRequest):
     - Generates alerts if needed
     - Stores in database
     """
+    stages = StageTimer("ingestion")
     try:
         # Get field configuration for thresholds
         field_config = await FieldConfig.find_one(FieldConfig.field_id == request.field_id)
@@ -84,6 +94,8 @@ async def ingest_daily_data(request: IngestionRequest):
                         crop_types.add(crop_type)
                         pest_counts_by_crop[crop_type] = pest_counts_by_crop.get(crop_type, 0) + count
         
+        stages.mark("decode")
+        
         # Initialize heatmaps for each crop type
         for crop_type in crop_types:
             heatmaps_by_crop[crop_type] = np.zeros((grid_height, grid_width), dtype=float)
@@ -100,6 +112,7 @@ async def ingest_daily_data(request: IngestionRequest):
         
         # Convert heatmaps to lists for storage
         heatmaps_by_crop_lists = {crop: hmap.tolist() for crop, hmap in heatmaps_by_crop.items()}
+        stages.mark("heatmaps")
         
         # Calculate canopy statistics
         canopy_array = np.array(request.canopy_cover)
@@ -138,6 +151,8 @@ async def ingest_daily_data(request: IngestionRequest):
                         "risk_level": "critical"
                     })
         
+        stages.mark("hotspots")
+        
         # Create aggregates
         total_pest_count = sum(pest_counts_by_crop.values())
         aggregates = {
@@ -158,31 +173,52 @@ async def ingest_daily_data(request: IngestionRequest):
             DailyData.date == date_str
         ).delete()
         
-        # Delete existing alerts for this date (to avoid duplicates when regenerating)
-        await Alert.find(
-            Alert.field_id == request.field_id,
-            Alert.date == date_str
-        ).delete()
+        # Large grids are stored only as chunks to stay under the 16 MB document limit
+        store_inline = grid_height * grid_width <= settings.INLINE_GRID_MAX_CELLS
         
         daily_data = DailyData(
             field_id=request.field_id,
             date=date_str,
             timestamp=request.timestamp,
-            pest_grid=request.pest_grid,
-            canopy_cover=request.canopy_cover,
+            pest_grid=request.pest_grid if store_inline else [],
+            canopy_cover=request.canopy_cover if store_inline else [],
+            grid_storage="inline" if store_inline else "chunked",
             field_dimensions=request.field_dimensions,
             aggregates=aggregates,
             heatmaps={
-                "pest_density_by_crop": heatmaps_by_crop_lists,
-                "canopy_grid": request.canopy_cover
+                "pest_density_by_crop": heatmaps_by_crop_lists if store_inline else {},
+                "canopy_grid": request.canopy_cover if store_inline else []
             },
             metadata=request.metadata
         )
         
         await daily_data.insert()
+        await record_ingestion(request.field_id, date_str, request.timestamp, aggregates)
+        stages.mark("db_write")
+        
+        layers = build_layers(canopy_array, heatmaps_by_crop)
+        
+        # Fold the day into per-cell running statistics (reads previous chunks on re-ingestion)
+        await update_cell_stats(request.field_id, date_str, layers)
+        
+        # Score cells against their own rolling baselines (also before chunks are replaced)
+        anomalies = await detect_anomalies(request.field_id, date_str, layers)
+        
+        # Persist chunked grid layers for region-of-interest reads
+        chunks_written = await write_layers(request.field_id, date_str, layers)
         
-        # Generate comprehensive recommendation alerts
-        alerts_created = 0
+        # Precompute change grids against the adjacent ingested days
+        await precompute_daily_changes(request.field_id, date_str, layers)
+        invalidate_correlation(request.field_id, date_str)
+        
+        # Append to the local time-series cube (locked, off the event loop); it can always be rebuilt from MongoDB
+        try:
+            await append_day(request.field_id, date_str, layers)
+        except OSError as e:
+            logger.warning(f"History cube update failed for {request.field_id}: {e}")
+        stages.mark("grid_layers")
+        
+        # Generate comprehensive recommendation alerts (text is rendered from app.utils.alert_templates on read)
         alerts_to_create = []
         
         # 1. Critical zones (high pest + low canopy combined risk)
@@ -198,8 +234,6 @@ async def ingest_daily_data(request: IngestionRequest):
                     "type": "combined_risk",
                     "severity": "critical",
                     "zone_id": zone_id,
-                    "message": f"⚠️ URGENT: {crop_type} crop under dual stress in {zone_id}",
-                    "recommendation": f"🎯 Immediate Action Required:\n1. Apply targeted pesticide for {crop_type} pests ({pest_count} detected)\n2. Increase irrigation immediately - canopy at {canopy_val:.1f}%\n3. Monitor daily for next 3-5 days\n4. Consider soil nutrient analysis",
                     "metrics": {
                         "pest_count": pest_count,
                         "pest_density": zone["pest_density"],
@@ -213,8 +247,6 @@ async def ingest_daily_data(request: IngestionRequest):
                     "type": "pest_outbreak",
                     "severity": "critical",
                     "zone_id": zone_id,
-                    "message": f"🐛 Pest Outbreak: {crop_type} zone {zone_id} needs attention",
-                    "recommendation": f"🎯 Pest Control Action:\n1. Apply {crop_type}-specific pesticide to {zone_id}\n2. Inspect neighboring zones for spread\n3. Document pest species if possible\n4. Re-scan in 48 hours to verify treatment effectiveness",
                     "metrics": {
                         "pest_count": pest_count,
                         "pest_density": zone["pest_density"],
@@ -228,8 +260,6 @@ async def ingest_daily_data(request: IngestionRequest):
                     "type": "canopy_stress",
                     "severity": "warning",
                     "zone_id": zone_id,
-                    "message": f"🌱 Canopy Stress: {crop_type} health declining in {zone_id}",
-                    "recommendation": f"🎯 Irrigation & Nutrition Action:\n1. Check irrigation coverage in {zone_id} (current: {canopy_val:.1f}%)\n2. Verify soil moisture levels\n3. Consider nitrogen/nutrient supplementation\n4. Inspect for disease or root issues",
                     "metrics": {
                         "pest_count": pest_count,
                         "canopy_cover": canopy_val,
@@ -250,8 +280,6 @@ async def ingest_daily_data(request: IngestionRequest):
                         "type": "pest_warning",
                         "severity": "warning",
                         "zone_id": zone_id,
-                        "message": f"👀 Monitor: {crop_type} pest activity increasing in {zone_id}",
-                        "recommendation": f"🎯 Monitoring Recommendation:\n1. Inspect {zone_id} for {crop_type} pests ({pest_count} detected)\n2. Prepare pesticide equipment if count increases\n3. Check this zone again in 2-3 days\n4. Document pest species and behavior",
                         "metrics": {
                             "pest_count": pest_count,
                             "pest_density": hotspot["density"],
@@ -271,8 +299,6 @@ async def ingest_daily_data(request: IngestionRequest):
                         "type": "irrigation_needed",
                         "severity": "warning",
                         "zone_id": zone_id,
-                        "message": f"💧 Irrigation Alert: Low canopy in {zone_id} ({canopy_val:.1f}%)",
-                        "recommendation": f"🎯 Irrigation Action:\n1. Increase water delivery to {zone_id}\n2. Current canopy: {canopy_val:.1f}% (target: >70%)\n3. Check for irrigation system blockages\n4. Monitor soil moisture daily",
                         "metrics": {
                             "canopy_cover": canopy_val,
                             "target_canopy": 70.0
@@ -282,13 +308,10 @@ async def ingest_daily_data(request: IngestionRequest):
         # 4. Crop-specific aggregate alerts (if one crop type is particularly affected)
         for crop_type, pest_count in pest_counts_by_crop.items():
             if pest_count > total_pest_count * 0.4:  # If one crop has >40% of all pests
-                crop_display = crop_type.capitalize()
                 alerts_to_create.append({
                     "type": "crop_outbreak",
                     "severity": "warning",
                     "zone_id": "field_wide",
-                    "message": f"🌾 {crop_display} Alert: Field-wide pest concentration detected",
-                    "recommendation": f"🎯 Field-Wide Strategy:\n1. {crop_display} crops are primary pest target ({pest_count} of {total_pest_count} total)\n2. Consider field-wide {crop_display}-specific treatment\n3. Review {crop_display} planting strategy for next season\n4. Monitor all {crop_display} zones closely",
                     "metrics": {
                         "crop_type": crop_type,
                         "pest_count": pest_count,
@@ -298,21 +321,34 @@ async def ingest_daily_data(request: IngestionRequest):
                 })
                 break  # Only one field-wide alert
         
-        # Create all alerts in database
-        for alert_data in alerts_to_create:
-            alert = Alert(
-                field_id=request.field_id,
-                date=date_str,
-                timestamp=datetime.utcnow(),
-                alert_type=alert_data["type"],
-                severity=alert_data["severity"],
-                zone_id=alert_data["zone_id"],
-                metrics=alert_data["metrics"],
-                message=alert_data["message"],
-                recommendation=alert_data["recommendation"]
-            )
-            await alert.insert()
-            alerts_created += 1
+        # 5. Cells deviating sharply from their own recent baseline
+        for cell in anomalies["top_cells"][:settings.ANOMALY_MAX_ALERTS]:
+            zone_id = cell["zone_id"]
+            alert_type = "canopy_anomaly" if cell["layer"] == "canopy" else "pest_anomaly"
+            
+            # Check if not already alerted
+            if any(a["zone_id"] == zone_id and a["type"] == alert_type for a in alerts_to_create):
+                continue
+            
+            alerts_to_create.append({
+                "type": alert_type,
+                "severity": "warning",
+                "zone_id": zone_id,
+                "metrics": {
+                    "value": cell["value"],
+                    "baseline": cell["baseline"],
+                    "z_score": cell["z_score"]
+                }
+            })
+        
+        # Fold detections into open alerts (dedup across days, auto-resolve cleared ones)
+        state = await get_field_state(request.field_id)
+        backfill = bool(state and state.latest_date and state.latest_date > date_str)
+        lifecycle = await apply_detections(request.field_id, date_str, alerts_to_create, backfill=backfill)
+        
+        # Recount the field's active set after the lifecycle changes
+        await refresh_alert_counts(request.field_id)
+        stages.mark("alerts")
         
         return IngestionResponse(
             status="success",
@@ -320,8 +356,14 @@ async def ingest_daily_data(request: IngestionRequest):
             processing_summary={
                 "pest_count": aggregates["pest_count"],
                 "avg_canopy": aggregates["avg_canopy"],
-                "alerts_generated": alerts_created,
-                "critical_zones": len(critical_zones)
+                "alerts_generated": len(alerts_to_create),
+                "alerts_created": lifecycle["created"],
+                "alerts_updated": lifecycle["updated"],
+                "alerts_resolved": lifecycle["resolved"],
+                "critical_zones": len(critical_zones),
+                "grid_chunks": chunks_written,
+                "anomalous_cells": anomalies["anomalous_cells"],
+                "stage_ms": {stage: round(seconds * 1000, 1) for stage, seconds in stages.durations.items()}
             }
         )
         
@@ -337,11 +379,9 @@ async def get_ingestion_status(field_id: str):
     """
     Get latest ingestion status for a field
     """
-    latest_data = await DailyData.find(
-        DailyData.field_id == field_id
-    ).sort("-timestamp").first_or_none()
+    state = await get_field_state(field_id)
     
-    if not latest_data:
+    if not state:
         return {
             "field_id": field_id,
             "status": "no_data",
@@ -351,8 +391,9 @@ async def get_ingestion_status(field_id: str):
     return {
         "field_id": field_id,
         "status": "active",
-        "latest_date": latest_data.date,
-        "latest_timestamp": latest_data.timestamp,
-        "pest_count": latest_data.aggregates.get("pest_count", 0),
-        "avg_canopy": latest_data.aggregates.get("avg_canopy", 0)
+        "latest_date": state.latest_date,
+        "latest_timestamp": state.latest_timestamp,
+        "pest_count": state.latest_aggregates.get("pest_count", 0),
+        "avg_canopy": state.latest_aggregates.get("avg_canopy", 0),
+        "data_version": state.data_version
     }
@@ -3,6 +3,13 @@ Field Insights Endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
 from app.models.daily_data import DailyData
+from app.services.grid_store import hydrate_daily_grids
+from app.services.cell_stats import STATS_LAYERS, load_cell_stats
+from app.services.anomaly import get_daily_anomalies, unpack_mask
+from app.services.correlation import get_correlation
+from app.core.tracing import span
+from app.utils.chunks import parse_bbox
+from app.utils.encoding import GRID_ENCODINGS, encode_grid
 from datetime import datetime
 import numpy as np
 
@@ -17,13 +24,17 @@ async def get_zone_insights(
     if not date:
         date = datetime.utcnow().strftime("%Y-%m-%d")
     
-    data = await DailyData.find_one(
-        DailyData.field_id == field_id,
-        DailyData.date == date
-    )
-    
-    if not data:
-        raise HTTPException(status_code=404, detail="No data found")
+    # Loading and Beanie validation of the full daily document, then chunked grids if any
+    with span("insights.zones.load", field_id=field_id, date=date):
+        data = await DailyData.find_one(
+            DailyData.field_id == field_id,
+            DailyData.date == date
+        )
+        
+        if not data:
+            raise HTTPException(status_code=404, detail="No data found")
+        
+        data = await hydrate_daily_grids(data)
     
     # Aggregate pest density across all crops (sum all crop heatmaps)
     pest_density_by_crop = data.heatmaps.get("pest_density_by_crop", {})
@@ -50,47 +61,48 @@ async def get_zone_insights(
     critical_count = 0
     
     height, width = pest_heatmap.shape
-    for y in range(height):
-        for x in range(width):
-            zone_id = f"grid_{x}_{y}"
-            pest_count_heatmap = float(pest_heatmap[y, x])  # Radial influence value
-            canopy = float(canopy_grid[y, x])
+    with span("insights.zones.cells", grid_height=height, grid_width=width):
+        for y in range(height):
+            for x in range(width):
+                zone_id = f"grid_{x}_{y}"
+                pest_count_heatmap = float(pest_heatmap[y, x])  # Radial influence value
+                canopy = float(canopy_grid[y, x])
             
-            # Check if this zone has critical data from ingestion
-            critical_zone_info = critical_zones_map.get(zone_id)
+                # Check if this zone has critical data from ingestion
+                critical_zone_info = critical_zones_map.get(zone_id)
             
-            if critical_zone_info:
-                # Use actual pest count from critical zone data
-                actual_pest_count = critical_zone_info.get("pest_count", pest_count_heatmap)
-                risk_level = "critical"
-                status = "critical"
-                critical_count += 1
-            elif canopy < 50:
-                # Low canopy is critical regardless of pest count
-                actual_pest_count = pest_count_heatmap
-                risk_level = "critical"
-                status = "critical"
-                critical_count += 1
-            elif pest_count_heatmap >= 5 or canopy < 60:
-                actual_pest_count = pest_count_heatmap
-                risk_level = "warning"
-                status = "warning"
-                warning_count += 1
-            else:
-                actual_pest_count = pest_count_heatmap
-                risk_level = "low"
-                status = "healthy"
-                healthy_count += 1
+                if critical_zone_info:
+                    # Use actual pest count from critical zone data
+                    actual_pest_count = critical_zone_info.get("pest_count", pest_count_heatmap)
+                    risk_level = "critical"
+                    status = "critical"
+                    critical_count += 1
+                elif canopy < 50:
+                    # Low canopy is critical regardless of pest count
+                    actual_pest_count = pest_count_heatmap
+                    risk_level = "critical"
+                    status = "critical"
+                    critical_count += 1
+                elif pest_count_heatmap >= 5 or canopy < 60:
+                    actual_pest_count = pest_count_heatmap
+                    risk_level = "warning"
+                    status = "warning"
+                    warning_count += 1
+                else:
+                    actual_pest_count = pest_count_heatmap
+                    risk_level = "low"
+                    status = "healthy"
+                    healthy_count += 1
             
-            grid_zones.append({
-                "zone_id": zone_id,
-                "position": {"x": x, "y": y},
-                "avg_canopy": round(canopy, 2),
-                "pest_density": round(actual_pest_count, 2),
-                "pest_count": int(actual_pest_count) if actual_pest_count >= 1 else 0,
-                "risk_level": risk_level,
-                "status": status
-            })
+                grid_zones.append({
+                    "zone_id": zone_id,
+                    "position": {"x": x, "y": y},
+                    "avg_canopy": round(canopy, 2),
+                    "pest_density": round(actual_pest_count, 2),
+                    "pest_count": int(actual_pest_count) if actual_pest_count >= 1 else 0,
+                    "risk_level": risk_level,
+                    "status": status
+                })
     
     return {
         "date": date,
@@ -101,3 +113,112 @@ async def get_zone_insights(
             "critical_zones": critical_count
         }
     }
+
+
+@router.get("/cell-stats")
+async def get_cell_statistics(
+    field_id: str = Query(...),
+    layer: str = Query("canopy", description="Layer: canopy or pest"),
+    bbox: str = Query(None, description="Window as x0,y0,x1,y1 in cells (end-exclusive)"),
+    encoding: str = Query("json", description="Response encoding: json or binary")
+):
+    """Get per-cell mean, standard deviation and trend slope across all ingested days"""
+    if layer not in STATS_LAYERS:
+        raise HTTPException(status_code=400, detail=f"layer must be one of {', '.join(STATS_LAYERS)}")
+    if encoding not in GRID_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(GRID_ENCODINGS)}")
+    
+    window = None
+    if bbox:
+        try:
+            window = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    stats = await load_cell_stats(field_id, layer, window)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No statistics found")
+    
+    slope = stats["slope"]
+    return {
+        "field_id": field_id,
+        "layer": layer,
+        "days": stats["days"],
+        "first_date": stats["first_date"],
+        "last_date": stats["last_date"],
+        "bbox": stats["bbox"],
+        "mean": encode_grid(stats["mean"], encoding),
+        "std": encode_grid(stats["std"], encoding),
+        "slope": encode_grid(stats["slope"], encoding, decimals=4),
+        "summary": {
+            "cells_increasing": int((slope > 0).sum()),
+            "cells_decreasing": int((slope < 0).sum()),
+            "mean_slope": round(float(slope.mean()), 4) if slope.size else 0.0
+        }
+    }
+
+
+@router.get("/anomalies")
+async def get_anomalies(
+    field_id: str = Query(...),
+    date: str = Query(None, description="Date (defaults to the latest with data)"),
+    include_masks: bool = Query(True, description="Include per-layer anomaly mask grids"),
+    encoding: str = Query("json", description="Mask encoding: json or binary")
+):
+    """Get cells deviating sharply from their own rolling baseline"""
+    if encoding not in GRID_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(GRID_ENCODINGS)}")
+    
+    record = await get_daily_anomalies(field_id, date)
+    if not record:
+        raise HTTPException(status_code=404, detail="No anomaly data found")
+    
+    layers = {}
+    for layer, result in record.layers.items():
+        layers[layer] = {
+            "anomalous_cells": result["anomalous_cells"],
+            "max_abs_z": result["max_abs_z"]
+        }
+        if include_masks:
+            layers[layer]["mask"] = encode_grid(unpack_mask(result), encoding)
+    
+    return {
+        "field_id": field_id,
+        "date": record.date,
+        "layers": layers,
+        "top_cells": record.top_cells
+    }
+
+
+@router.get("/correlation")
+async def get_pest_canopy_correlation(
+    field_id: str = Query(...),
+    date: str = Query(None),
+    window: int = Query(5, ge=3, le=51, description="Moving window edge length in cells"),
+    include_map: bool = Query(True, description="Include the local correlation grid"),
+    encoding: str = Query("json", description="Grid encoding: json or binary")
+):
+    """Get global and moving-window pest-canopy correlation, highlighting where pests suppress canopy"""
+    if encoding not in GRID_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(GRID_ENCODINGS)}")
+    if not date:
+        date = datetime.utcnow().strftime("%Y-%m-%d")
+    
+    result = await get_correlation(field_id, date, window)
+    if not result:
+        raise HTTPException(status_code=404, detail="No data found")
+    
+    response = {
+        "field_id": field_id,
+        "date": date,
+        "window": window,
+        "global": result["global"],
+        "summary": {
+            "cells_negative": result["cells_negative"],
+            "cells_positive": result["cells_positive"]
+        },
+        "suppression_zones": result["suppression_zones"]
+    }
+    if include_map:
+        response["local_correlation"] = encode_grid(result["local_correlation"], encoding, decimals=3)
+    return response
@@ -3,7 +3,9 @@ Pest Detection Endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
 from app.models.daily_data import DailyData
-from datetime import datetime, timedelta
+from app.services.grid_store import hydrate_daily_grids
+from app.utils.dates import trend_window
+from datetime import datetime
 
 router = APIRouter()
 
@@ -25,6 +27,8 @@ async def get_daily_pest_data(
     if not data:
         raise HTTPException(status_code=404, detail="No data found")
     
+    data = await hydrate_daily_grids(data)
+    
     # Get critical zones with actual pest counts
     critical_zones = data.aggregates.get("critical_zones", [])
     
@@ -72,13 +76,13 @@ async def get_pest_trend(
     crop_type: str = Query(None, description="Filter by crop type")
 ):
     """Get pest trend over time, optionally by crop type"""
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
+    window = trend_window(days)
+    start_date, end_date = window[0], window[-1]
     
     daily_data = await DailyData.find(
         DailyData.field_id == field_id,
-        DailyData.timestamp >= start_date,
-        DailyData.timestamp <= end_date
+        DailyData.date >= start_date,
+        DailyData.date <= end_date
     ).sort("date").to_list()
     
     if crop_type:
@@ -106,8 +110,8 @@ async def get_pest_trend(
         trend = "stable"
     
     return {
-        "start_date": start_date.strftime("%Y-%m-%d"),
-        "end_date": end_date.strftime("%Y-%m-%d"),
+        "start_date": start_date,
+        "end_date": end_date,
         "crop_type": crop_type,
         "daily_counts": daily_counts,
         "trend": trend,
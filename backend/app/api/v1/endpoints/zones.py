@@ -0,0 +1,73 @@
+"""
+Zone History Endpoints
+Per-cell time series served from local memory-mapped history cubes
+"""
+import re
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.security import require_admin
+from app.services.history_cube import CUBE_LAYERS, read_history, rebuild_cubes
+from app.utils.encoding import GRID_ENCODINGS, encode_grid
+
+router = APIRouter()
+
+ZONE_ID_PATTERN = re.compile(r"^grid_(\d+)_(\d+)$")
+
+
+@router.get("/{zone_id}/history")
+async def get_zone_history(
+    zone_id: str,
+    field_id: str = Query(...),
+    layer: str = Query("canopy", description="Layer: canopy or pest"),
+    radius: int = Query(0, ge=0, le=16, description="Window half-size in cells around the zone"),
+    start_date: str = Query(None, description="Inclusive start date (YYYY-MM-DD)"),
+    end_date: str = Query(None, description="Inclusive end date (YYYY-MM-DD)"),
+    include_window: bool = Query(False, description="Include the full window per day, not just its mean"),
+    encoding: str = Query("json", description="Window encoding: json or binary")
+):
+    """Get a zone's time series over the season without loading daily documents"""
+    match = ZONE_ID_PATTERN.match(zone_id)
+    if not match:
+        raise HTTPException(status_code=400, detail="zone_id must look like grid_<x>_<y>")
+    if layer not in CUBE_LAYERS:
+        raise HTTPException(status_code=400, detail=f"layer must be one of {', '.join(CUBE_LAYERS)}")
+    if encoding not in GRID_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(GRID_ENCODINGS)}")
+    
+    x, y = int(match.group(1)), int(match.group(2))
+    
+    try:
+        history = read_history(field_id, layer, x, y, radius, start_date, end_date)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    if history is None:
+        # Rebuilding rewrites cube files, so it is left to the explicit POST
+        raise HTTPException(
+            status_code=404,
+            detail="No history cube for this field on this instance; POST /zones/rebuild to build it"
+        )
+    
+    dates, window = history
+    if radius == 0:
+        values = window[:, 0, 0].astype(float)
+    else:
+        values = window.reshape(len(dates), -1).mean(axis=1)
+    
+    response = {
+        "field_id": field_id,
+        "zone_id": zone_id,
+        "layer": layer,
+        "radius": radius,
+        "dates": dates,
+        "values": [round(float(v), 2) for v in values]
+    }
+    if include_window:
+        response["window"] = encode_grid(window, encoding)
+    return response
+
+
+@router.post("/rebuild", dependencies=[Depends(require_admin)])
+async def rebuild_zone_history(field_id: str = Query(...)):
+    """Rebuild a field's local history cubes from MongoDB"""
+    written = await rebuild_cubes(field_id)
+    return {"status": "success", "field_id": field_id, "days_written": written}
@@ -12,7 +12,11 @@ from app.api.v1.endpoints import (
     insights,
     alerts,
     analytics,
-    drone
+    drone,
+    grids,
+    zones,
+    fields,
+    admin
 )
 
 api_router = APIRouter()
@@ -65,3 +69,27 @@ api_router.include_router(
     prefix="/drone",
     tags=["drone"]
 )
+
+api_router.include_router(
+    grids.router,
+    prefix="/grids",
+    tags=["grids"]
+)
+
+api_router.include_router(
+    zones.router,
+    prefix="/zones",
+    tags=["zones"]
+)
+
+api_router.include_router(
+    fields.router,
+    prefix="/fields",
+    tags=["fields"]
+)
+
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"]
+)
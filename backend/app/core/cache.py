@@ -0,0 +1,109 @@
+"""
+In-Process Caching
+Small LRU caches with per-entry expiry and hit/miss counters
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after ttl seconds
+
+    Caches are per process; every instance registers itself so hit ratios
+    can be reported in one place. Caches of large values can also be bounded
+    by max_bytes, with sizeof giving each value's size in bytes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 256,
+        ttl: float = 300.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value, or default on a miss or expired entry"""
+        entry = self._entries.get(key, _MISSING)
+        if entry is not _MISSING:
+            expires_at, value, _ = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._drop(key)
+
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries while over maxsize or max_bytes"""
+        size = self.sizeof(value) if self.sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, size)
+        self.bytes += size
+        while len(self._entries) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Hashable) -> None:
+        self.bytes -= self._entries.pop(key)[2]
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop entries
+
+        Args:
+            predicate: Called with each key; matching entries are dropped.
+                Drops everything when omitted.
+
+        Returns:
+            Number of entries dropped
+        """
+        if predicate is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+            return dropped
+
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_registry: Dict[str, TTLCache] = {}
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every cache created in this process"""
+    return {name: cache.stats() for name, cache in _registry.items()}
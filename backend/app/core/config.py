@@ -22,6 +22,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_TOKEN: str = ""  # X-Admin-Token for /admin, rebuild/migration endpoints and request profiling; empty disables them
     
     # CORS
     CORS_ORIGINS: Union[List[str], str] = Field(
@@ -43,6 +44,61 @@ class Settings(BaseSettings):
     CANOPY_WARNING_THRESHOLD: float = 60.0
     CANOPY_CRITICAL_THRESHOLD: float = 50.0
     
+    # Grid Storage
+    GRID_CHUNK_SIZE: int = 256  # cells per chunk edge
+    INLINE_GRID_MAX_CELLS: int = 250_000  # larger grids are stored only as chunks
+    HISTORY_CUBE_DIR: str = "data/cubes"  # local memory-mapped time-series cubes
+    
+    # Caching
+    CACHE_TTL_SECONDS: int = 300  # in-process result caches
+    CORRELATION_CACHE_MAX_MB: int = 128  # local correlation maps held per process
+    
+    # Anomaly Detection
+    ANOMALY_EWMA_ALPHA: float = 0.2
+    ANOMALY_Z_THRESHOLD: float = 3.0
+    ANOMALY_MIN_HISTORY: int = 5  # days before a cell's baseline is trusted
+    ANOMALY_MIN_STD_CANOPY: float = 2.0
+    ANOMALY_MIN_STD_PEST: float = 1.0
+    ANOMALY_MAX_ALERTS: int = 5
+    
+    # Drone Telemetry
+    TELEMETRY_RETENTION_DAYS: int = 90  # time-series documents expire after this
+    TELEMETRY_MAX_BATCH: int = 10_000  # samples per ingestion request
+    TELEMETRY_MAX_POINTS: int = 600  # downsampled points per query
+    
+    # Alert Archive
+    ALERT_ARCHIVE_AFTER_DAYS: int = 30  # closed alerts older than this leave the hot collection
+    ALERT_ARCHIVE_RETENTION_DAYS: int = 730  # archived alerts expire after this
+    ALERT_ARCHIVE_BATCH: int = 1000  # alerts moved per bulk write
+    
+    # Metrics
+    METRICS_ENABLED: bool = True  # /metrics, request middleware and MongoDB command listener
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5  # event-loop lag sampling period (0 disables)
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0  # stalls longer than this are logged with route and stack (0 disables)
+    
+    # Tracing (requires opentelemetry-sdk)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "jsonl"  # jsonl (local file) or otlp
+    TRACING_JSONL_PATH: str = "data/traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SERVICE_NAME: str = "agri-dashboard-api"
+    TRACING_SAMPLE_RATIO: float = 1.0
+    
+    # Request Profiling (admin only, X-Profile: 1)
+    PROFILE_SAMPLE_INTERVAL_MS: float = 2.0  # stack sampling period
+    PROFILE_STORE_SIZE: int = 20  # most recent profiles kept in memory
+    PROFILE_TOP_ALLOCATIONS: int = 20
+    
+    # Slow Query Log (served under /admin/slow-queries)
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 100.0  # commands at least this slow are logged by shape
+    SLOW_QUERY_MAX_SHAPES: int = 200  # distinct shapes kept in memory
+    
+    # Traffic Capture (for replay_traffic.py)
+    TRAFFIC_CAPTURE_ENABLED: bool = False
+    TRAFFIC_CAPTURE_PATH: str = "data/traffic.jsonl"
+    TRAFFIC_CAPTURE_FLUSH_EVERY: int = 100  # requests buffered between file appends
+    
     # Scheduling
     DAILY_FLIGHT_TIME: str = "07:00"
     
@@ -6,12 +6,22 @@ from beanie import init_beanie
 from loguru import logger
 
 from app.core.config import settings
+from app.core.metrics import MongoCommandMetrics
+from app.core.query_log import SlowQueryListener
+from app.core.tracing import MongoCommandTracing
 from app.models.daily_data import DailyData
 from app.models.field_config import FieldConfig
 from app.models.alert import Alert
+from app.models.alert_archive import ArchivedAlert
 from app.models.weekly_aggregate import WeeklyAggregate
 from app.models.monthly_aggregate import MonthlyAggregate
 from app.models.drone import DroneStatus, FlightRecord
+from app.models.grid_chunk import GridChunk
+from app.models.cell_stats import CellStatsChunk
+from app.models.anomaly import AnomalyBaselineChunk, DailyAnomaly
+from app.models.grid_change import GridChange
+from app.models.telemetry import TelemetryPoint
+from app.models.field_state import FieldState
 
 
 class Database:
@@ -26,7 +36,12 @@ db = Database()
 async def init_db():
     """Initialize database connection and Beanie ODM"""
     try:
-        db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        event_listeners = [MongoCommandMetrics()] if settings.METRICS_ENABLED else []
+        if settings.TRACING_ENABLED:
+            event_listeners.append(MongoCommandTracing())
+        if settings.SLOW_QUERY_LOG_ENABLED:
+            event_listeners.append(SlowQueryListener())
+        db.client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=event_listeners)
         db.db = db.client[settings.MONGODB_DB_NAME]
         
         # Initialize Beanie with document models
@@ -36,10 +51,18 @@ async def init_db():
                 DailyData,
                 FieldConfig,
                 Alert,
+                ArchivedAlert,
                 WeeklyAggregate,
                 MonthlyAggregate,
                 DroneStatus,
                 FlightRecord,
+                GridChunk,
+                CellStatsChunk,
+                AnomalyBaselineChunk,
+                DailyAnomaly,
+                GridChange,
+                TelemetryPoint,
+                FieldState,
             ]
         )
         
@@ -0,0 +1,259 @@
+"""
+Prometheus Metrics
+Request, ingestion stage, MongoDB command, cache and event-loop metrics for /metrics
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from pymongo import monitoring
+
+from app.core.cache import get_cache_stats
+from app.core.profiling import thread_stack
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+
+STAGE_LATENCY = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent in each stage of a processing pipeline",
+    ["pipeline", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+MONGO_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round-trip time as seen by the driver",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGO_FAILURES = Counter("mongodb_command_failures_total", "Failed MongoDB commands", ["command"])
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop callback was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKS = Counter("event_loop_blocks_total", "Event loop stalls beyond LOOP_BLOCK_THRESHOLD_MS", ["route"])
+LOOP_BLOCK_DURATION = Histogram(
+    "event_loop_block_duration_seconds",
+    "Length of event loop stalls beyond LOOP_BLOCK_THRESHOLD_MS",
+    ["route"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# Request task -> ASGI scope, so a stalled loop can be traced back to its route
+_task_scopes: Dict[asyncio.Task, Dict[str, Any]] = {}
+
+# Most recent stalls, for /admin/loop-blocks
+_recent_blocks: deque = deque(maxlen=50)
+
+# Innermost frames kept per captured stall
+BLOCK_STACK_DEPTH = 25
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request
+
+    Routes are labelled by their path template (e.g. /api/v1/alerts/resolve/{alert_id})
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._children = {}  # (method, route, status) -> histogram child, skips label resolution
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        task = asyncio.current_task()
+        _task_scopes[task] = scope
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _task_scopes.pop(task, None)
+            elapsed = time.perf_counter() - start
+            key = (scope["method"], getattr(scope.get("route"), "path", "unmatched"), status_code)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = REQUEST_LATENCY.labels(key[0], key[1], str(status_code))
+            child.observe(elapsed)
+            REQUESTS_IN_FLIGHT.dec()
+
+
+class StageTimer:
+    """
+    Records consecutive stage durations of one pipeline run
+
+    Call mark(stage) at the end of each stage; the time since the previous
+    mark (or creation) is observed under that stage name.
+    """
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.durations = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.durations[stage] = self.durations.get(stage, 0.0) + elapsed
+        STAGE_LATENCY.labels(self.pipeline, stage).observe(elapsed)
+        return elapsed
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the MongoDB latency histogram"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_LATENCY.labels(event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_FAILURES.labels(event.command_name).inc()
+
+
+class CacheCollector:
+    """Reads TTLCache counters at scrape time, so cache lookups stay untouched"""
+
+    def collect(self):
+        stats = get_cache_stats()
+        families = {
+            "hits": GaugeMetricFamily("cache_hits", "Cache hits since start", labels=["cache"]),
+            "misses": GaugeMetricFamily("cache_misses", "Cache misses since start", labels=["cache"]),
+            "hit_ratio": GaugeMetricFamily("cache_hit_ratio", "Cache hit ratio since start", labels=["cache"]),
+            "size": GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"]),
+        }
+        for name, cache_stats in stats.items():
+            for key, family in families.items():
+                family.add_metric([name], cache_stats[key])
+        return list(families.values())
+
+
+REGISTRY.register(CacheCollector())
+
+
+def _route_of(task: Optional[asyncio.Task]) -> str:
+    scope = _task_scopes.get(task)
+    if scope is None:
+        return "background" if task is not None else "none"
+    route = getattr(scope.get("route"), "path", None)
+    return f"{scope['method']} {route or scope['path']}"
+
+
+class LoopBlockDetector:
+    """
+    Watchdog thread catching the event loop stuck in one callback
+
+    The loop-lag task beats the detector on every wake-up. When no beat
+    arrives within the sampling interval plus the threshold, the watchdog
+    reads the loop thread's stack and the route of the task that is running,
+    while the blocking code is still on the stack; the next beat reports it.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float, threshold: float):
+        self.loop = loop
+        self.interval = interval
+        self.threshold = threshold
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.captured = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loop-block-watchdog", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.threshold / 2):
+            if self.captured is None and time.monotonic() - self.last_beat > self.interval + self.threshold:
+                self.captured = (_route_of(asyncio.current_task(self.loop)), thread_stack(self.loop_thread_id))
+
+    def beat(self, lag: float) -> None:
+        """Called from the loop after each sleep with how late it woke up"""
+        self.last_beat = time.monotonic()
+        captured, self.captured = self.captured, None
+        if lag < self.threshold:
+            return
+
+        route, stack = captured or ("unknown", [])
+        stack = stack[-BLOCK_STACK_DEPTH:]
+        LOOP_BLOCKS.labels(route).inc()
+        LOOP_BLOCK_DURATION.labels(route).observe(lag)
+        _recent_blocks.append({"at": datetime.utcnow(), "route": route, "duration_ms": round(lag * 1000, 1), "stack": stack})
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms in {route}" + "".join(f"\n    {label}" for label in stack))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+async def monitor_loop_lag(interval: float, block_threshold: float = 0.0) -> None:
+    """
+    Sleep for interval and record how late the loop woke us up, forever
+
+    With a block_threshold, stalls longer than it are attributed to a route
+    and stack by a LoopBlockDetector.
+    """
+    loop = asyncio.get_running_loop()
+    detector = LoopBlockDetector(loop, interval, block_threshold) if block_threshold > 0 else None
+    if detector:
+        detector.start()
+    try:
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - start - interval)
+            LOOP_LAG.observe(lag)
+            if detector:
+                detector.beat(lag)
+    finally:
+        if detector:
+            detector.stop()
+
+
+def start_loop_lag_monitor(interval: float, block_threshold: float = 0.0) -> Optional[asyncio.Task]:
+    """Start the loop lag sampler on the running loop (disabled when interval <= 0)"""
+    if interval <= 0:
+        return None
+    return asyncio.get_running_loop().create_task(monitor_loop_lag(interval, block_threshold))
+
+
+def recent_loop_blocks() -> List[Dict[str, Any]]:
+    """Captured event loop stalls, newest first"""
+    return list(reversed(_recent_blocks))
+
+
+def render_metrics() -> tuple:
+    """Exposition body and content type for the default registry"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
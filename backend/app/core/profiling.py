@@ -0,0 +1,204 @@
+"""
+Request Profiling
+Opt-in sampling profiler and tracemalloc capture for single requests (X-Profile: 1, admins only)
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.security import is_admin_token
+
+
+MAX_STACK_DEPTH = 128
+
+# X-Profile values: 1 samples stacks and traces allocations; cpu skips tracemalloc,
+# whose per-allocation hook slows allocation-heavy handlers several times over
+PROFILE_MODES = {"1": True, "cpu": False}
+
+_profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# The sampler and tracemalloc are process-wide, so profiled requests run one at a time
+_profile_lock = asyncio.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def thread_stack(thread_id: int) -> List[str]:
+    """Frame labels of another thread's current Python stack, outermost first"""
+    frame = sys._current_frames().get(thread_id)
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return labels[::-1]
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread
+
+    Stacks are kept in collapsed form ("outer;...;inner" -> samples), the
+    input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            labels = thread_stack(self.thread_id)
+            if labels:
+                self.stacks[";".join(labels)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _top_functions(stacks: Counter, limit: int = 30) -> List[Dict[str, Any]]:
+    """Self and total sample counts per function"""
+    self_samples: Counter = Counter()
+    total_samples: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_samples[frames[-1]] += count
+        for label in set(frames):
+            total_samples[label] += count
+    return [
+        {"function": label, "self_samples": self_samples[label], "total_samples": total}
+        for label, total in sorted(total_samples.items(), key=lambda item: (-self_samples[item[0]], -item[1]))[:limit]
+    ]
+
+
+def _top_allocations(snapshot, limit: int) -> List[Dict[str, Any]]:
+    return [
+        {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Runs a request under the stack sampler and tracemalloc when asked to
+
+    Requires both X-Profile (1 or cpu) and a valid X-Admin-Token; every other
+    request passes straight through. The stored profile's id is returned
+    in the X-Profile-Id response header and served under /admin/profiles.
+    Samples come from the event-loop thread, so requests running
+    concurrently with the profiled one can show up in its stacks.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = _header(scope, b"x-profile") if scope["type"] == "http" else None
+        if mode not in PROFILE_MODES or not is_admin_token(_header(scope, b"x-admin-token")):
+            await self.app(scope, receive, send)
+            return
+
+        async with _profile_lock:
+            await self._profile(scope, receive, send, trace_memory=PROFILE_MODES[mode])
+
+    async def _profile(self, scope, receive, send, trace_memory: bool):
+        profile_id = uuid.uuid4().hex[:12]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            duration = time.perf_counter() - start
+            memory = None
+            if trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                memory = {
+                    "peak_bytes": peak - baseline,
+                    "retained_bytes": current - baseline,
+                    "top_allocations": _top_allocations(tracemalloc.take_snapshot(), settings.PROFILE_TOP_ALLOCATIONS),
+                }
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+            store_profile({
+                "profile_id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "started_at": started_at,
+                "duration_ms": round(duration * 1000, 2),
+                "sample_interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+                "samples": sum(sampler.stacks.values()),
+                "top_functions": _top_functions(sampler.stacks),
+                "flame": [{"stack": stack, "samples": count} for stack, count in sampler.stacks.most_common()],
+                "memory": memory,
+            })
+
+
+def store_profile(profile: Dict[str, Any]) -> None:
+    """Keep a profile, dropping the oldest beyond PROFILE_STORE_SIZE"""
+    _profiles[profile["profile_id"]] = profile
+    while len(_profiles) > settings.PROFILE_STORE_SIZE:
+        _profiles.popitem(last=False)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Summaries of stored profiles, newest first"""
+    return [
+        {key: profile[key] for key in ("profile_id", "method", "path", "query", "status", "started_at", "duration_ms", "samples")}
+        | {"peak_bytes": profile["memory"]["peak_bytes"] if profile["memory"] else None}
+        for profile in reversed(_profiles.values())
+    ]
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    return _profiles.get(profile_id)
+
+
+def collapsed_stacks(profile: Dict[str, Any]) -> str:
+    """Flame data in collapsed-stack text format"""
+    return "".join(f"{entry['stack']} {entry['samples']}\n" for entry in profile["flame"])
@@ -0,0 +1,205 @@
+"""
+Slow Query Log
+Records MongoDB commands above SLOW_QUERY_MS by query shape, with explain() plans and index suggestions
+"""
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.utils.query_plans import index_covers, plan_summary, query_shape, shape_key, suggest_index
+
+
+# Commands that carry a query shape, and the keys explain() needs to re-plan them
+EXPLAINABLE_KEYS = {
+    "find": ("filter", "sort", "projection", "limit", "skip", "hint"),
+    "aggregate": ("pipeline", "hint"),
+    "count": ("query", "limit", "skip", "hint"),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort", "update", "remove", "new", "upsert", "fields"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+
+_shapes: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _filter_and_sort(command_name: str, command: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+    """The filter and sort a command asks the planner to serve"""
+    query: Dict[str, Any] = {}
+    sort: Dict[str, Any] = {}
+    if command_name == "find":
+        query, sort = command.get("filter") or {}, command.get("sort") or {}
+    elif command_name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        if pipeline and "$match" in pipeline[0]:
+            query = pipeline[0]["$match"]
+            pipeline = pipeline[1:]
+        if pipeline and "$sort" in pipeline[0]:
+            sort = pipeline[0]["$sort"]
+    elif command_name in ("count", "distinct", "findAndModify"):
+        query, sort = command.get("query") or {}, command.get("sort") or {}
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or []
+        query = statements[0].get("q", {}) if statements else {}
+    return query, list(sort.items())
+
+
+def _pipeline_shape(command: Dict[str, Any]) -> List[str]:
+    return [next(iter(stage), "?") for stage in command.get("pipeline") or []]
+
+
+def _sample(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The parts of a command explain() needs
+
+    Bulk updates and deletes keep only their first statement: that is the
+    shape being logged, and explain() rejects multi-statement commands.
+    """
+    sample = {name: command[name] for name in EXPLAINABLE_KEYS[command_name] if name in command}
+    for name in ("updates", "deletes"):
+        if sample.get(name):
+            sample[name] = [sample[name][0]]
+    return sample
+
+
+def record_slow_query(
+    command_name: str,
+    database: str,
+    command: Dict[str, Any],
+    duration_ms: float
+) -> None:
+    """Fold one slow command into the per-shape log"""
+    collection = command.get(command_name)
+    if not isinstance(collection, str):
+        return
+    query, sort = _filter_and_sort(command_name, command)
+    key = shape_key(collection, command_name, query_shape(query), sort, _pipeline_shape(command))
+
+    with _lock:
+        entry = _shapes.get(key)
+        if entry is None:
+            if len(_shapes) >= settings.SLOW_QUERY_MAX_SHAPES:
+                return
+            entry = _shapes[key] = {
+                "collection": collection,
+                "command": command_name,
+                "shape": query_shape(query),
+                "sort": sort,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "first_seen": datetime.utcnow(),
+                "plan": None,
+                "suggested_index": None,
+            }
+            logger.warning(f"Slow query shape on {collection}.{command_name}: {entry['shape']} ({duration_ms:.1f} ms)")
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_seen"] = datetime.utcnow()
+        entry["database"] = database
+        entry["sample"] = _sample(command_name, command)
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    pymongo command listener feeding the slow query log
+
+    Only a reference to the command is held while it is in flight; shapes
+    are computed for commands that turn out slower than SLOW_QUERY_MS.
+    """
+
+    def __init__(self, threshold_ms: Optional[float] = None):
+        self.threshold_ms = settings.SLOW_QUERY_MS if threshold_ms is None else threshold_ms
+        self._pending = {}
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE_KEYS:
+            self._pending[(event.request_id, event.connection_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        pending = self._pending.pop((event.request_id, event.connection_id), None)
+        duration_ms = event.duration_micros / 1000
+        if pending is not None and duration_ms >= self.threshold_ms:
+            record_slow_query(event.command_name, pending[0], pending[1], duration_ms)
+
+    def failed(self, event):
+        self._pending.pop((event.request_id, event.connection_id), None)
+
+
+def _explain_command(entry: Dict[str, Any]) -> Dict[str, Any]:
+    command = {entry["command"]: entry["collection"], **entry["sample"]}
+    if entry["command"] == "aggregate":
+        command["cursor"] = {}
+    return command
+
+
+async def _existing_indexes(database, collection: str) -> List[List[Tuple[str, int]]]:
+    info = await database[collection].index_information()
+    return [[(field, direction) for field, direction in index["key"]] for index in info.values()]
+
+
+async def explain_shape(client, entry: Dict[str, Any]) -> None:
+    """Attach a plan summary and, when the plan scans or sorts in memory, an index suggestion"""
+    database = client[entry["database"]]
+    try:
+        explain = await database.command({"explain": _explain_command(entry), "verbosity": "queryPlanner"})
+    except Exception as e:
+        entry["plan"] = {"error": str(e)}
+        return
+
+    entry["plan"] = plan_summary(explain)
+    entry["suggested_index"] = None
+    if entry["plan"]["collscan"] or entry["plan"]["in_memory_sort"]:
+        query, sort = _filter_and_sort(entry["command"], _explain_command(entry))
+        wanted = suggest_index(query, sort)
+        existing = await _existing_indexes(database, entry["collection"])
+        if wanted and not any(index_covers(index, wanted) for index in existing):
+            entry["suggested_index"] = [list(key) for key in wanted]
+
+
+async def get_slow_queries(client, explain: bool = True) -> List[Dict[str, Any]]:
+    """
+    Logged query shapes, by total time spent
+
+    Args:
+        client: Motor client to run explain() through
+        explain: Plan shapes that have not been explained yet
+    """
+    with _lock:
+        entries = sorted(_shapes.values(), key=lambda entry: -entry["total_ms"])
+    if explain:
+        for entry in entries:
+            if entry["plan"] is None:
+                await explain_shape(client, entry)
+
+    return [
+        {
+            "collection": entry["collection"],
+            "command": entry["command"],
+            "shape": entry["shape"],
+            "sort": entry["sort"],
+            "count": entry["count"],
+            "total_ms": round(entry["total_ms"], 2),
+            "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+            "max_ms": round(entry["max_ms"], 2),
+            "first_seen": entry["first_seen"],
+            "last_seen": entry["last_seen"],
+            "plan": entry["plan"],
+            "suggested_index": entry["suggested_index"],
+        }
+        for entry in entries
+    ]
+
+
+def reset_slow_queries() -> int:
+    """Forget every logged shape; returns how many there were"""
+    with _lock:
+        count = len(_shapes)
+        _shapes.clear()
+    return count
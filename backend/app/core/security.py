@@ -0,0 +1,31 @@
+"""
+Security Helpers
+Shared-secret admin access for operational endpoints and request profiling
+"""
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from app.core.config import settings
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether a token matches ADMIN_TOKEN (always False while ADMIN_TOKEN is unset)"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency restricting an endpoint to admins
+
+    Raises:
+        HTTPException: 403 when admin access is not configured or the
+            X-Admin-Token header is missing or wrong
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access is not configured")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -0,0 +1,241 @@
+"""
+Tracing
+Optional OpenTelemetry spans for API handlers, MongoDB commands, NumPy stages and response encoding
+"""
+import asyncio
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import bson
+import numpy as np
+from fastapi.responses import JSONResponse
+from loguru import logger
+from pymongo import monitoring
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # tracing is optional
+    trace = None
+    SpanExporter = object
+
+
+_tracer = None
+_provider = None
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a local JSON-lines file, one span per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, spans):
+        lines = [span.to_json(indent=None) + "\n" for span in spans]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def _exporter():
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    return JsonLinesSpanExporter(settings.TRACING_JSONL_PATH)
+
+
+def setup_tracing() -> bool:
+    """
+    Install the tracer provider if TRACING_ENABLED
+
+    Returns:
+        Whether spans are being recorded
+    """
+    global _tracer, _provider
+    if not settings.TRACING_ENABLED:
+        return False
+    if trace is None:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed; tracing is off")
+        return False
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBasedTraceIdRatio(settings.TRACING_SAMPLE_RATIO),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_exporter()))
+    trace.set_tracer_provider(_provider)
+    _tracer = _provider.get_tracer("agri-dashboard")
+    logger.info(f"Tracing enabled ({settings.TRACING_EXPORTER} exporter)")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush and stop the exporter"""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+def _attribute(value: Any) -> Any:
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a span around a block; yields None when tracing is off"""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes={k: _attribute(v) for k, v in attributes.items()}) as current:
+        yield current
+
+
+def _argument_attributes(names, args, kwargs) -> Dict[str, Any]:
+    """Shapes and sizes of array-like arguments"""
+    attributes = {}
+    for name, value in list(zip(names, args)) + list(kwargs.items()):
+        if isinstance(value, np.ndarray):
+            attributes[f"arg.{name}.shape"] = "x".join(map(str, value.shape))
+            attributes[f"arg.{name}.bytes"] = value.nbytes
+        elif isinstance(value, list) and value and isinstance(value[0], list):
+            attributes[f"arg.{name}.shape"] = f"{len(value)}x{len(value[0])}"
+    return attributes
+
+
+def traced(func: Optional[Callable] = None, *, name: Optional[str] = None):
+    """
+    Decorator recording a span per call, with array argument shapes as attributes
+
+    Costs one attribute check per call while tracing is off.
+    """
+    def decorate(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        names = func.__code__.co_varnames[:func.__code__.co_argcount]
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with _tracer.start_as_current_span(span_name, attributes=_argument_attributes(names, args, kwargs)):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(span_name, attributes=_argument_attributes(names, args, kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request, named after the route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as current:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    current.update_name(f"{scope['method']} {route}")
+                    current.set_attribute("http.route", route)
+                current.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    current.set_status(Status(StatusCode.ERROR))
+
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse recording response encoding as its own span"""
+
+    def render(self, content: Any) -> bytes:
+        with span("response.render") as current:
+            body = super().render(content)
+            if current is not None:
+                current.set_attribute("http.response_bytes", len(body))
+            return body
+
+
+class MongoCommandTracing(monitoring.CommandListener):
+    """
+    pymongo command listener recording a client span per MongoDB command
+
+    Motor copies the caller's context into its executor thread, so command
+    spans nest under the handler or stage span that issued them.
+    """
+
+    def __init__(self):
+        self._spans = {}
+
+    def started(self, event):
+        if _tracer is None:
+            return
+        collection = event.command.get(event.command_name)
+        self._spans[(event.request_id, event.connection_id)] = _tracer.start_span(
+            f"mongodb.{event.command_name}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": collection if isinstance(collection, str) else "",
+            },
+        )
+
+    def succeeded(self, event):
+        current = self._spans.pop((event.request_id, event.connection_id), None)
+        if current is None:
+            return
+        reply = event.reply or {}
+        batch = reply.get("cursor", {}).get("firstBatch", reply.get("cursor", {}).get("nextBatch"))
+        current.set_attribute("db.response_bytes", len(bson.encode(reply)))
+        if batch is not None:
+            current.set_attribute("db.documents", len(batch))
+        current.end()
+
+    def failed(self, event):
+        current = self._spans.pop((event.request_id, event.connection_id), None)
+        if current is None:
+            return
+        current.set_status(Status(StatusCode.ERROR, str(event.failure.get("errmsg", ""))))
+        current.end()
@@ -0,0 +1,107 @@
+"""
+Traffic Capture
+Opt-in log of sanitized request metadata (route, params, timing, response size) for replay_traffic.py
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl
+
+from app.core.config import settings
+
+
+# Never captured: scrapes, health checks and admin calls (which carry the admin token)
+EXCLUDED_PREFIXES = ("/metrics", "/health", "/docs", "/openapi.json", "/api/v1/admin")
+
+# Query parameters whose values are replaced by "***"
+REDACTED_PARAMS = {"token", "access_token", "api_key", "key", "password", "secret"}
+
+_buffer: List[str] = []
+_lock = threading.Lock()
+
+
+def _sanitize(query_string: bytes) -> List[List[str]]:
+    return [
+        [name, "***" if name.lower() in REDACTED_PARAMS else value]
+        for name, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    ]
+
+
+def _request_bytes(scope) -> int:
+    for key, value in scope["headers"]:
+        if key == b"content-length":
+            return int(value)
+    return 0
+
+
+def record(entry: Dict[str, Any]) -> None:
+    """Buffer one captured request, writing the buffer out every TRAFFIC_CAPTURE_FLUSH_EVERY"""
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    with _lock:
+        _buffer.append(line)
+        if len(_buffer) >= settings.TRAFFIC_CAPTURE_FLUSH_EVERY:
+            _write_locked()
+
+
+def _write_locked() -> None:
+    if not _buffer:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(settings.TRAFFIC_CAPTURE_PATH)), exist_ok=True)
+    with open(settings.TRAFFIC_CAPTURE_PATH, "a", encoding="utf-8") as f:
+        f.writelines(_buffer)
+    _buffer.clear()
+
+
+def flush_capture() -> None:
+    """Write out buffered requests (called on shutdown)"""
+    with _lock:
+        _write_locked()
+
+
+class TrafficCaptureMiddleware:
+    """
+    Pure ASGI middleware appending one compact JSON line per request
+
+    Line keys: t (unix time), m (method), r (route template), p (path),
+    q (query pairs, secrets redacted), s (status), ms (duration),
+    rb / b (request / response body bytes). Headers and bodies are never
+    recorded, so captured write requests replay without their payload.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"].startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record({
+                "t": round(started_at, 3),
+                "m": scope["method"],
+                "r": getattr(scope.get("route"), "path", None),
+                "p": scope["path"],
+                "q": _sanitize(scope.get("query_string", b"")),
+                "s": status_code,
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+                "rb": _request_bytes(scope),
+                "b": response_bytes,
+            })
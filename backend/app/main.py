@@ -2,7 +2,7 @@
 FastAPI Application Entry Point
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
@@ -10,6 +10,12 @@ import os
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.metrics import MetricsMiddleware, render_metrics, start_loop_lag_monitor
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracedJSONResponse, TracingMiddleware, setup_tracing, shutdown_tracing
+from app.core.traffic_capture import TrafficCaptureMiddleware, flush_capture
+from app.services.alert_archive import sync_archive_retention
+from app.services.flight_stats import migrate_flight_records
 from app.api.v1.router import api_router
 
 
@@ -21,15 +27,26 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting up Agricultural Dashboard API...")
+    setup_tracing()
     await init_db()
+    await sync_archive_retention()
+    await migrate_flight_records()
     logger.info("Database initialized successfully")
+    loop_lag_task = start_loop_lag_monitor(
+        settings.LOOP_LAG_INTERVAL_SECONDS,
+        settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+    )
     
     yield
     
     # Shutdown
     logger.info("Shutting down Agricultural Dashboard API...")
+    if loop_lag_task:
+        loop_lag_task.cancel()
     await close_db()
     logger.info("Database connections closed")
+    shutdown_tracing()
+    flush_capture()
 
 
 # Create FastAPI application
@@ -38,6 +55,7 @@ app = FastAPI(
     version="1.0.0",
     description="Backend API for Agricultural Dashboard - AI-powered pest detection and canopy monitoring",
     lifespan=lifespan,
+    default_response_class=TracedJSONResponse,
 )
 
 # Configure CORS
@@ -49,6 +67,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling for admins (innermost, so it only sees the handler)
+if settings.ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+# Sanitized request log for replay_traffic.py
+if settings.TRAFFIC_CAPTURE_ENABLED:
+    app.add_middleware(TrafficCaptureMiddleware)
+
+# Server span per request (inside the metrics middleware)
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# Request latency and in-flight metrics (outermost, so it times everything)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -78,6 +112,13 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -3,7 +3,7 @@ Alert Model
 Stores critical alerts for pest density and canopy issues
 """
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 from beanie import Document
 from pydantic import Field
 
@@ -15,7 +15,9 @@ class Alert(Document):
     Collection: alerts
     """
     field_id: str = Field(..., description="Field identifier")
-    date: str = Field(..., description="Alert date")
+    date: str = Field(..., description="Most recent date the condition was detected")
+    first_seen_date: Optional[str] = Field(default=None, description="Date the condition was first detected")
+    occurrences: int = Field(default=1, description="Number of days the condition was detected")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Alert timestamp")
     
     alert_type: str = Field(..., description="Type of alert (high_pest_density, low_canopy, etc.)")
@@ -27,12 +29,15 @@ class Alert(Document):
         description="Relevant metrics (numeric and string values)"
     )
     
-    message: str = Field(..., description="Human-readable alert message")
-    recommendation: str = Field(..., description="Recommended action")
+    template_id: Optional[str] = Field(default=None, description="Text template id, rendered with metrics as parameters")
+    message: Optional[str] = Field(default=None, description="Human-readable alert message (legacy alerts without a template)")
+    recommendation: Optional[str] = Field(default=None, description="Recommended action (legacy alerts without a template)")
     
     status: str = Field(default="active", description="Alert status: active, acknowledged, resolved")
     acknowledged: bool = Field(default=False, description="Whether alert has been acknowledged")
-    acknowledged_at: datetime | None = Field(default=None, description="Acknowledgement timestamp")
+    acknowledged_at: Optional[datetime] = Field(default=None, description="Acknowledgement timestamp")
+    resolved_at: Optional[datetime] = Field(default=None, description="Resolution timestamp")
+    auto_resolved: bool = Field(default=False, description="Whether the alert was resolved because its condition cleared")
     
     class Settings:
         name = "alerts"
@@ -40,7 +45,12 @@ class Alert(Document):
             "field_id",
             "date",
             "status",
-            [("field_id", 1), ("status", 1), ("date", -1)],
+            # Alert listings: equality filters first, then the (date, _id) sort key
+            [("field_id", 1), ("status", 1), ("date", -1), ("_id", -1)],
+            [("field_id", 1), ("status", 1), ("severity", 1), ("date", -1), ("_id", -1)],
+            [("field_id", 1), ("status", 1), ("alert_type", 1), ("date", -1), ("_id", -1)],
+            [("field_id", 1), ("status", 1), ("metrics.crop_type", 1), ("date", -1), ("_id", -1)],
+            [("field_id", 1), ("zone_id", 1), ("status", 1), ("date", -1), ("_id", -1)],
         ]
     
     class Config:
@@ -48,6 +58,8 @@ class Alert(Document):
             "example": {
                 "field_id": "field_001",
                 "date": "2025-10-03",
+                "first_seen_date": "2025-10-01",
+                "occurrences": 3,
                 "timestamp": "2025-10-03T07:15:00Z",
                 "alert_type": "high_pest_density",
                 "severity": "critical",
@@ -56,8 +68,7 @@ class Alert(Document):
                     "pest_density": 12.3,
                     "canopy_cover": 48.2
                 },
-                "message": "Critical pest density detected in Zone 3-5. Immediate action recommended.",
-                "recommendation": "Consider targeted pesticide application in this zone.",
+                "template_id": "pest_outbreak",
                 "status": "active",
                 "acknowledged": False
             }
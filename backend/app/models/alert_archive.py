@@ -0,0 +1,49 @@
+"""
+Alert Archive Model
+Compact storage for closed alerts moved out of the hot alerts collection
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from beanie import Document
+from pydantic import Field
+
+
+class ArchivedAlert(Document):
+    """
+    A resolved or acknowledged alert past the archive age
+
+    Keeps the original _id so archival can be retried safely. Text is kept
+    as a template id plus the alert's metrics (params) and rendered on read;
+    message and recommendation are only stored when no template reproduces
+    them. Documents expire ALERT_ARCHIVE_RETENTION_DAYS after archival; that
+    TTL index is managed by sync_archive_retention, not declared here.
+
+    Collection: alerts_archive
+    """
+    field_id: str = Field(..., description="Field identifier")
+    date: str = Field(..., description="Most recent date the condition was detected")
+    first_seen_date: Optional[str] = Field(None, description="Date the condition was first detected")
+    occurrences: int = Field(default=1, description="Number of days the condition was detected")
+
+    alert_type: str = Field(..., description="Type of alert")
+    severity: str = Field(..., description="Severity level: info, warning, critical")
+    zone_id: str = Field(..., description="Affected zone identifier")
+    status: str = Field(..., description="Status when archived: acknowledged or resolved")
+
+    template_id: Optional[str] = Field(None, description="Text template id (see app.utils.alert_templates)")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Alert metrics, also the template parameters")
+    message: Optional[str] = Field(None, description="Original message when no template matches")
+    recommendation: Optional[str] = Field(None, description="Original recommendation when no template matches")
+
+    timestamp: Optional[datetime] = Field(None, description="Alert timestamp")
+    acknowledged_at: Optional[datetime] = Field(None)
+    resolved_at: Optional[datetime] = Field(None)
+    auto_resolved: bool = Field(default=False)
+    archived_at: datetime = Field(default_factory=datetime.utcnow, description="Archival time (TTL anchor)")
+
+    class Settings:
+        name = "alerts_archive"
+        indexes = [
+            [("field_id", 1), ("status", 1), ("date", -1), ("_id", -1)],
+            [("field_id", 1), ("date", -1), ("_id", -1)],
+        ]
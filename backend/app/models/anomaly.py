@@ -0,0 +1,67 @@
+"""
+Anomaly Models
+Rolling per-cell baselines and daily anomaly masks
+"""
+from typing import Any, Dict, List, Optional
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class AnomalyBaselineChunk(Document):
+    """
+    EWMA baseline for one chunk of a field layer
+
+    Uses the same chunk geometry as grid_chunks; mean and variance are
+    packed float32 arrays.
+
+    Collection: anomaly_baselines
+    """
+    field_id: str = Field(..., description="Field identifier")
+    layer: str = Field(..., description="Grid layer name (canopy or pest)")
+
+    chunk_row: int = Field(..., description="Chunk row index")
+    chunk_col: int = Field(..., description="Chunk column index")
+    chunk_size: int = Field(..., description="Nominal chunk edge length in cells")
+    grid_shape: List[int] = Field(..., description="Full grid shape [height, width]")
+    shape: List[int] = Field(..., description="This chunk's shape [height, width]")
+
+    observations: int = Field(0, description="Days folded into the baseline")
+    last_date: Optional[str] = Field(None, description="Most recent date folded into the baseline")
+
+    mean: bytes = Field(..., description="Per-cell EWMA mean (float32)")
+    var: bytes = Field(..., description="Per-cell EWMA variance (float32)")
+
+    class Settings:
+        name = "anomaly_baselines"
+        indexes = [
+            IndexModel(
+                [("field_id", 1), ("layer", 1), ("chunk_row", 1), ("chunk_col", 1)],
+                unique=True,
+            ),
+        ]
+
+
+class DailyAnomaly(Document):
+    """
+    Anomaly mask and strongest anomalous cells for one field-day
+
+    Collection: daily_anomalies
+    """
+    field_id: str = Field(..., description="Field identifier")
+    date: str = Field(..., description="Date in YYYY-MM-DD format")
+
+    layers: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Per layer: packed bit mask, shape, anomalous cell count, max |z|"
+    )
+    top_cells: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Strongest anomalous cells across layers"
+    )
+
+    class Settings:
+        name = "daily_anomalies"
+        indexes = [
+            IndexModel([("field_id", 1), ("date", -1)], unique=True),
+        ]
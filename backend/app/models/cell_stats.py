@@ -0,0 +1,47 @@
+"""
+Cell Statistics Model
+Stores per-cell running accumulators (Welford) across all ingested days
+"""
+from typing import List
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class CellStatsChunk(Document):
+    """
+    Running per-cell statistics for one chunk of a field layer
+
+    Uses the same chunk geometry as grid_chunks. Per-cell arrays are packed
+    float64; the day-index moments are scalars shared by all cells.
+
+    Collection: cell_stats
+    """
+    field_id: str = Field(..., description="Field identifier")
+    layer: str = Field(..., description="Grid layer name (canopy or pest)")
+
+    chunk_row: int = Field(..., description="Chunk row index")
+    chunk_col: int = Field(..., description="Chunk column index")
+    chunk_size: int = Field(..., description="Nominal chunk edge length in cells")
+    grid_shape: List[int] = Field(..., description="Full grid shape [height, width]")
+    shape: List[int] = Field(..., description="This chunk's shape [height, width]")
+
+    origin_day: int = Field(..., description="Ordinal of day index 0")
+    dates: List[str] = Field(default_factory=list, description="Dates folded into the accumulator")
+
+    observations: int = Field(0, description="Number of observations")
+    mean_t: float = Field(0.0, description="Mean day index")
+    m2_t: float = Field(0.0, description="Sum of squared day-index deviations")
+
+    mean: bytes = Field(..., description="Per-cell running mean (float64)")
+    m2: bytes = Field(..., description="Per-cell sum of squared deviations (float64)")
+    c_ty: bytes = Field(..., description="Per-cell day-index/value co-moment (float64)")
+
+    class Settings:
+        name = "cell_stats"
+        indexes = [
+            IndexModel(
+                [("field_id", 1), ("layer", 1), ("chunk_row", 1), ("chunk_col", 1)],
+                unique=True,
+            ),
+        ]
@@ -72,6 +72,11 @@ class DailyData(Document):
         description="2D array of canopy cover percentages"
     )
     
+    grid_storage: str = Field(
+        default="inline",
+        description="Where grids live: inline (this document) or chunked (grid_chunks only)"
+    )
+    
     # Field information
     field_dimensions: Dict[str, Any] = Field(
         default_factory=dict,
@@ -10,6 +10,7 @@ from typing import Optional, List
 
 class FlightRecord(Document):
     """Individual flight record"""
+    drone_id: str = Field(default="drone_001")
     date: datetime
     duration: int  # minutes
     distance_covered: float  # km
@@ -20,6 +21,10 @@ class FlightRecord(Document):
     
     class Settings:
         name = "flight_records"
+        indexes = [
+            [("field_id", 1), ("date", -1)],
+            [("drone_id", 1), ("date", -1), ("_id", -1)],
+        ]
 
 
 class DroneStatus(Document):
@@ -40,9 +45,11 @@ class DroneStatus(Document):
     propeller_health: int = Field(default=92, ge=0, le=100)
     signal_strength: int = Field(default=88, ge=0, le=100)
     
-    # Flight Statistics
+    # Flight Statistics (maintained with atomic $inc when flights are logged)
     total_flights: int = Field(default=0)
-    total_flight_hours: float = Field(default=0.0)
+    total_flight_minutes: int = Field(default=0)
+    total_flight_hours: float = Field(default=0.0)  # derived from total_flight_minutes on read
+    counters_synced: bool = Field(default=False)  # False until rebuilt from flight_records
     
     # Flight Scheduling
     auto_flight_enabled: bool = Field(default=True)  # Enable/disable automatic scheduled flights
@@ -95,3 +102,4 @@ class DroneStatus(Document):
     
     class Settings:
         name = "drone_status"
+        indexes = ["drone_id"]
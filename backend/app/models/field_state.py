@@ -0,0 +1,47 @@
+"""
+Field State Model
+One small live-state document per field, maintained incrementally for hot reads
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+def empty_alert_counts() -> Dict[str, Any]:
+    """Active alert counters for a field with no active alerts"""
+    return {"total": 0, "by_severity": {}, "by_type": {}}
+
+
+class FieldState(Document):
+    """
+    Latest ingested day and active alert counters for a field
+
+    Written atomically by ingestion and alert transitions so dashboard
+    KPIs and ingestion status are a single indexed read.
+
+    Collection: field_state
+    """
+    field_id: str = Field(..., description="Field identifier")
+
+    latest_date: Optional[str] = Field(None, description="Newest ingested date (YYYY-MM-DD)")
+    latest_timestamp: Optional[datetime] = Field(None, description="Flight timestamp of the newest day")
+    latest_aggregates: Dict[str, Any] = Field(default_factory=dict, description="Scalar aggregates of the newest day")
+
+    previous_date: Optional[str] = Field(None, description="Newest ingested date before latest_date")
+    previous_aggregates: Dict[str, Any] = Field(default_factory=dict, description="Scalar aggregates of previous_date")
+
+    active_alerts: Dict[str, Any] = Field(
+        default_factory=empty_alert_counts,
+        description="Active alert counts: total, by_severity, by_type"
+    )
+
+    data_version: int = Field(default=0, description="Bumped on every change to the field's data or alerts")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "field_state"
+        indexes = [
+            IndexModel([("field_id", 1)], unique=True),
+        ]
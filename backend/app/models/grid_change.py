@@ -0,0 +1,42 @@
+"""
+Grid Change Model
+Caches per-cell change grids between two field-days
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class GridChange(Document):
+    """
+    Packed change grids for a (from_date, to_date) pair
+
+    Pairs of adjacent ingested days are precomputed at ingestion; other pairs are
+    computed on first request and cached here.
+
+    Collection: grid_changes
+    """
+    field_id: str = Field(..., description="Field identifier")
+    from_date: str = Field(..., description="Earlier date (YYYY-MM-DD)")
+    to_date: str = Field(..., description="Later date (YYYY-MM-DD)")
+    computed_at: datetime = Field(default_factory=datetime.utcnow, description="Computation timestamp")
+
+    shape: List[int] = Field(..., description="Grid shape [height, width]")
+    hotspot_threshold: float = Field(..., description="Pest count used to classify hotspots")
+
+    canopy_delta: bytes = Field(..., description="Per-cell canopy change (float32)")
+    pest_delta: bytes = Field(..., description="Per-cell pest count change (int16 or int32)")
+    pest_delta_dtype: str = Field("int32", description="dtype of pest_delta")
+    new_hotspots: bytes = Field(..., description="Bit-packed mask of new hotspots")
+    resolved_hotspots: bytes = Field(..., description="Bit-packed mask of resolved hotspots")
+
+    summary: Dict[str, Any] = Field(default_factory=dict, description="Scalar change KPIs")
+
+    class Settings:
+        name = "grid_changes"
+        indexes = [
+            IndexModel([("field_id", 1), ("from_date", 1), ("to_date", 1)], unique=True),
+            [("field_id", 1), ("to_date", 1)],
+        ]
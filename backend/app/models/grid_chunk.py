@@ -0,0 +1,39 @@
+"""
+Grid Chunk Model
+Stores field grids as fixed-size binary tiles for region-of-interest reads
+"""
+from typing import List
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class GridChunk(Document):
+    """
+    One fixed-size tile of a daily grid layer
+
+    Layers are "canopy", "pest" (total count) and "pest:<crop_type>".
+
+    Collection: grid_chunks
+    """
+    field_id: str = Field(..., description="Field identifier")
+    date: str = Field(..., description="Date in YYYY-MM-DD format")
+    layer: str = Field(..., description="Grid layer name")
+
+    chunk_row: int = Field(..., description="Chunk row index")
+    chunk_col: int = Field(..., description="Chunk column index")
+    chunk_size: int = Field(..., description="Nominal chunk edge length in cells")
+
+    grid_shape: List[int] = Field(..., description="Full grid shape [height, width]")
+    shape: List[int] = Field(..., description="This chunk's shape [height, width]")
+    dtype: str = Field(..., description="NumPy dtype of the packed data")
+    data: bytes = Field(..., description="Little-endian packed cell values")
+
+    class Settings:
+        name = "grid_chunks"
+        indexes = [
+            IndexModel(
+                [("field_id", 1), ("date", 1), ("layer", 1), ("chunk_row", 1), ("chunk_col", 1)],
+                unique=True,
+            ),
+        ]
@@ -0,0 +1,46 @@
+"""
+Drone Telemetry Model
+High-frequency in-flight samples stored in a MongoDB time-series collection
+"""
+from datetime import datetime
+from typing import Optional
+from beanie import Document, Granularity, TimeSeriesConfig
+from pydantic import Field
+
+from app.core.config import settings
+
+
+class TelemetryPoint(Document):
+    """
+    One telemetry sample (1-10 Hz per drone in flight)
+
+    MongoDB buckets samples per drone_id (the metaField) and time, so a
+    flight is stored as a handful of compressed buckets rather than one
+    document per sample.
+
+    Collection: drone_telemetry (time-series)
+    """
+    drone_id: str = Field(..., description="Drone identifier (time-series metaField)")
+    timestamp: datetime = Field(..., description="Sample time (UTC)")
+
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    altitude_m: float = Field(..., description="Altitude above ground level")
+    speed_mps: float = Field(..., ge=0, description="Ground speed")
+    battery_level: float = Field(..., ge=0, le=100, description="Battery percentage")
+
+    heading_deg: Optional[float] = Field(None, ge=0, lt=360)
+    signal_strength: Optional[int] = Field(None, ge=0, le=100)
+    field_id: Optional[str] = Field(None, description="Field being flown, if known")
+
+    class Settings:
+        name = "drone_telemetry"
+        timeseries = TimeSeriesConfig(
+            time_field="timestamp",
+            meta_field="drone_id",
+            granularity=Granularity.seconds,
+            expire_after_seconds=settings.TELEMETRY_RETENTION_DAYS * 86400,
+        )
+        indexes = [
+            [("drone_id", 1), ("timestamp", -1)],
+        ]
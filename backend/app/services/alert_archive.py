@@ -0,0 +1,136 @@
+"""
+Alert Archive Service
+Moves closed alerts past the archive age into the compact alerts_archive collection
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from pymongo import ReplaceOne
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.alert_archive import ArchivedAlert
+from app.utils.alert_templates import compact_alert_text
+
+
+# Closed statuses; active alerts are never archived
+ARCHIVABLE_STATUSES = ("acknowledged", "resolved")
+
+ARCHIVE_TTL_INDEX = "archived_at_1"
+
+
+def to_archived(alert: Dict[str, Any], archived_at: datetime) -> Dict[str, Any]:
+    """Compact archive document for a raw alert document"""
+    params = alert.get("metrics", {})
+    message = alert.get("message")
+    recommendation = alert.get("recommendation")
+    template_id = alert.get("template_id") or compact_alert_text(
+        alert["alert_type"], alert["zone_id"], params, message, recommendation
+    )
+
+    document = {
+        "_id": alert["_id"],
+        "field_id": alert["field_id"],
+        "date": alert["date"],
+        "first_seen_date": alert.get("first_seen_date") or alert["date"],
+        "occurrences": alert.get("occurrences", 1),
+        "alert_type": alert["alert_type"],
+        "severity": alert["severity"],
+        "zone_id": alert["zone_id"],
+        "status": alert["status"],
+        "template_id": template_id,
+        "params": params,
+        "timestamp": alert.get("timestamp"),
+        "acknowledged_at": alert.get("acknowledged_at"),
+        "resolved_at": alert.get("resolved_at"),
+        "auto_resolved": alert.get("auto_resolved", False),
+        "archived_at": archived_at,
+    }
+    if template_id is None:
+        document["message"] = message
+        document["recommendation"] = recommendation
+    return document
+
+
+async def archive_closed_alerts(
+    older_than_days: Optional[int] = None,
+    field_id: Optional[str] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Move acknowledged and resolved alerts older than the archive age
+
+    Works in batches: each batch is upserted into alerts_archive by _id,
+    then deleted from alerts, so an interrupted run can simply be repeated.
+
+    Args:
+        older_than_days: Archive alerts last seen more than this many days
+            ago (default ALERT_ARCHIVE_AFTER_DAYS)
+        field_id: Optional field to restrict the run to
+        batch_size: Alerts per bulk write (default ALERT_ARCHIVE_BATCH)
+
+    Returns:
+        Dictionary with the cutoff date and archived / templated counts
+    """
+    older_than_days = settings.ALERT_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ALERT_ARCHIVE_BATCH
+    cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+
+    query: Dict[str, Any] = {"status": {"$in": list(ARCHIVABLE_STATUSES)}, "date": {"$lt": cutoff}}
+    if field_id:
+        query["field_id"] = field_id
+
+    alerts = Alert.get_motor_collection()
+    archive = ArchivedAlert.get_motor_collection()
+    archived = templated = 0
+
+    while True:
+        batch = await alerts.find(query).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        now = datetime.utcnow()
+        documents = [to_archived(alert, now) for alert in batch]
+        await archive.bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents],
+            ordered=False
+        )
+        await alerts.delete_many({"_id": {"$in": [doc["_id"] for doc in documents]}})
+
+        archived += len(documents)
+        templated += sum(1 for doc in documents if doc["template_id"])
+
+    if archived:
+        logger.info(f"Archived {archived} closed alerts older than {cutoff}")
+
+    return {"cutoff_date": cutoff, "archived": archived, "templated": templated}
+
+
+async def sync_archive_retention() -> None:
+    """
+    Create the archived_at TTL index, or apply a changed ALERT_ARCHIVE_RETENTION_DAYS with collMod
+
+    The index is not among the model's Beanie indexes because createIndexes
+    refuses to change expireAfterSeconds on an existing index
+    (IndexOptionsConflict), which would stop the API from starting.
+    """
+    archive = ArchivedAlert.get_motor_collection()
+    expire_after = settings.ALERT_ARCHIVE_RETENTION_DAYS * 86400
+    existing = (await archive.index_information()).get(ARCHIVE_TTL_INDEX)
+
+    if existing is None:
+        await archive.create_index([("archived_at", 1)], name=ARCHIVE_TTL_INDEX, expireAfterSeconds=expire_after)
+        return
+    if existing.get("expireAfterSeconds") == expire_after:
+        return
+
+    try:
+        await archive.database.command({
+            "collMod": archive.name,
+            "index": {"name": ARCHIVE_TTL_INDEX, "expireAfterSeconds": expire_after},
+        })
+        logger.info(f"Alert archive retention set to {settings.ALERT_ARCHIVE_RETENTION_DAYS} days")
+    except OperationFailure as e:
+        logger.error(f"Could not apply ALERT_ARCHIVE_RETENTION_DAYS to {archive.name}; the previous retention still applies: {e}")
@@ -0,0 +1,137 @@
+"""
+Alert Lifecycle Service
+Matches each day's detections against open alerts instead of recreating them
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from pymongo import InsertOne, UpdateOne
+
+from app.models.alert import Alert
+
+
+# Alerts a new detection can attach to
+OPEN_STATUSES = ("active", "acknowledged")
+
+# Text stored by alerts created before templates; refreshed alerts drop it
+RENDERED_TEXT = {"message": "", "recommendation": ""}
+
+OPEN_PROJECTION = {"_id": 1, "zone_id": 1, "alert_type": 1, "date": 1, "first_seen_date": 1, "occurrences": 1}
+
+
+def _alert_key(zone_id: str, alert_type: str) -> Tuple[str, str]:
+    return zone_id, alert_type
+
+
+async def apply_detections(
+    field_id: str,
+    date: str,
+    detections: List[Dict[str, Any]],
+    backfill: bool = False
+) -> Dict[str, int]:
+    """
+    Reconcile one day's detections with the field's open alerts
+
+    An open alert with the same (zone, type) absorbs the detection: its
+    occurrence counter is bumped and its date moves to the newest day seen
+    (re-ingesting that day only refreshes the metrics). Detections without
+    a match open new alerts. Open alerts last seen on or before this day
+    that were not detected again are resolved automatically, as are
+    duplicates left from before alerts were deduplicated. Everything is
+    written with one unordered bulk_write.
+
+    A back-filled day (older than the field's latest) says nothing about
+    current conditions, so it only refreshes alerts last seen that day.
+
+    Args:
+        field_id: Field identifier
+        date: Detection date (YYYY-MM-DD)
+        detections: Alert candidates with type, severity, zone_id and
+            metrics (the type doubles as the text template id)
+        backfill: Whether a newer day has already been ingested
+
+    Returns:
+        Dictionary with created, updated and resolved counts
+    """
+    collection = Alert.get_motor_collection()
+    open_alerts = await collection.find(
+        {"field_id": field_id, "status": {"$in": list(OPEN_STATUSES)}},
+        OPEN_PROJECTION
+    ).sort([("date", -1), ("_id", -1)]).to_list(length=None)
+
+    # Newest open alert per key wins; older duplicates are superseded
+    matches: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    superseded = []
+    for alert in open_alerts:
+        key = _alert_key(alert["zone_id"], alert["alert_type"])
+        if key in matches:
+            superseded.append(alert["_id"])
+        else:
+            matches[key] = alert
+
+    now = datetime.utcnow()
+    operations = []
+    seen = set()
+    counts = {"created": 0, "updated": 0, "resolved": 0}
+
+    for detection in detections:
+        key = _alert_key(detection["zone_id"], detection["type"])
+        if key in seen:
+            continue
+        seen.add(key)
+
+        content = {
+            "severity": detection["severity"],
+            "metrics": detection["metrics"],
+            "template_id": detection["type"],
+        }
+        match = matches.get(key)
+
+        if match is None:
+            if backfill:
+                continue
+            operations.append(InsertOne({
+                "field_id": field_id,
+                "date": date,
+                "first_seen_date": date,
+                "occurrences": 1,
+                "timestamp": now,
+                "alert_type": detection["type"],
+                "zone_id": detection["zone_id"],
+                **content,
+                "status": "active",
+                "acknowledged": False,
+                "acknowledged_at": None,
+                "resolved_at": None,
+                "auto_resolved": False,
+            }))
+            counts["created"] += 1
+        elif date > match["date"]:
+            if "occurrences" in match:
+                update = {"$set": {**content, "date": date, "timestamp": now}, "$inc": {"occurrences": 1}}
+            else:
+                # Alerts raised before deduplication count as their first occurrence
+                update = {"$set": {**content, "date": date, "timestamp": now,
+                                   "first_seen_date": match["date"], "occurrences": 2}}
+            update["$unset"] = RENDERED_TEXT
+            operations.append(UpdateOne({"_id": match["_id"]}, update))
+            counts["updated"] += 1
+        elif date == match["date"]:
+            operations.append(UpdateOne({"_id": match["_id"]}, {"$set": content, "$unset": RENDERED_TEXT}))
+            counts["updated"] += 1
+        # An older back-filled day never rewinds a newer alert
+
+    resolve = {"$set": {"status": "resolved", "resolved_at": now, "auto_resolved": True}}
+    if not backfill:
+        for key, alert in matches.items():
+            if key not in seen and alert["date"] <= date:
+                operations.append(UpdateOne({"_id": alert["_id"]}, resolve))
+                counts["resolved"] += 1
+        for alert_id in superseded:
+            operations.append(UpdateOne({"_id": alert_id}, resolve))
+            counts["resolved"] += 1
+
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+
+    return counts
@@ -0,0 +1,341 @@
+"""
+Alert Service
+Filtered, keyset-paginated alert queries (live and archived) and bulk status transitions
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import bson
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+from app.models.alert import Alert
+from app.models.alert_archive import ArchivedAlert
+from app.services.field_state import adjust_alert_counts, refresh_alert_counts
+from app.utils.alert_templates import DEFAULT_LOCALE, compact_alert_text, render_alert_text
+from app.utils.pagination import encode_cursor, keyset_filter
+
+
+ALERT_STATUSES = ("active", "acknowledged", "resolved")
+
+# Statuses each transition applies to
+ALERT_TRANSITIONS = {
+    "acknowledge": ("active",),
+    "resolve": ("active", "acknowledged"),
+}
+
+# Listing order; every alerts index ends in (date, _id) so pages stream off the index
+ALERT_SORT = [("date", -1), ("_id", -1)]
+
+
+def alert_filter(
+    field_id: str,
+    status: Optional[str] = "active",
+    severity: Optional[str] = None,
+    alert_type: Optional[str] = None,
+    zone_id: Optional[str] = None,
+    crop_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the alerts query for a set of filters
+
+    Args:
+        field_id: Field identifier
+        status: active, acknowledged, resolved, or None for any status
+        severity: Optional severity (info, warning, critical)
+        alert_type: Optional alert type
+        zone_id: Optional zone identifier
+        crop_type: Optional crop type (matched against metrics.crop_type)
+        start_date: Optional inclusive start date (YYYY-MM-DD)
+        end_date: Optional inclusive end date (YYYY-MM-DD)
+    """
+    query: Dict[str, Any] = {"field_id": field_id}
+    if status:
+        query["status"] = status
+    if severity:
+        query["severity"] = severity
+    if alert_type:
+        query["alert_type"] = alert_type
+    if zone_id:
+        query["zone_id"] = zone_id
+    if crop_type:
+        query["metrics.crop_type"] = crop_type.lower()
+    if start_date or end_date:
+        query["date"] = {}
+        if start_date:
+            query["date"]["$gte"] = start_date
+        if end_date:
+            query["date"]["$lte"] = end_date
+    return query
+
+
+def format_alert(alert: Dict[str, Any], locale: str = DEFAULT_LOCALE) -> Dict[str, Any]:
+    """
+    API representation of a raw alert or archived alert document
+
+    Text is rendered from the alert's template in the requested locale;
+    legacy alerts without a template return their stored text.
+    """
+    metrics = alert["params"] if "archived_at" in alert else alert.get("metrics", {})
+    rendered = render_alert_text(alert["template_id"], alert["zone_id"], metrics, locale) if alert.get("template_id") else None
+    message, recommendation = rendered or (alert.get("message") or "", alert.get("recommendation") or "")
+
+    return {
+        "alert_id": str(alert["_id"]),
+        "date": alert["date"],
+        "first_seen_date": alert.get("first_seen_date") or alert["date"],
+        "occurrences": alert.get("occurrences", 1),
+        "type": alert["alert_type"],
+        "severity": alert["severity"],
+        "zone_id": alert["zone_id"],
+        "status": alert.get("status", "active"),
+        "acknowledged": alert.get("acknowledged", alert.get("acknowledged_at") is not None),
+        "archived": "archived_at" in alert,
+        "timestamp": alert["timestamp"],
+        "message": message,
+        "metrics": metrics,
+        "recommendation": recommendation
+    }
+
+
+def archive_query(query: Dict[str, Any]) -> Dict[str, Any]:
+    """The same filter against alerts_archive, where metrics are stored as params"""
+    return {
+        ("params." + key[len("metrics."):] if key.startswith("metrics.") else key): value
+        for key, value in query.items()
+    }
+
+
+def _fold_counts(groups: List[Dict[str, Any]]) -> Dict[str, int]:
+    return {group["_id"]: group["count"] for group in groups}
+
+
+async def _query_page(
+    collection,
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str],
+    include_counts: bool
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Up to limit + 1 documents after the cursor, plus facet counts if requested"""
+    if not include_counts:
+        page_query = {"$and": [query, keyset_filter("date", cursor)]} if cursor else query
+        docs = await collection.find(page_query).sort(ALERT_SORT).limit(limit + 1).to_list(length=limit + 1)
+        return docs, None
+
+    items_pipeline = [{"$match": keyset_filter("date", cursor)}] if cursor else []
+    items_pipeline.append({"$limit": limit + 1})
+    result = await collection.aggregate([
+        {"$match": query},
+        {"$sort": dict(ALERT_SORT)},
+        {"$facet": {
+            "items": items_pipeline,
+            "by_severity": [{"$group": {"_id": "$severity", "count": {"$sum": 1}}}],
+            "by_type": [{"$group": {"_id": "$alert_type", "count": {"$sum": 1}}}],
+            "total": [{"$count": "count"}],
+        }},
+    ]).to_list(length=1)
+    facets = result[0]
+    counts = {
+        "total": facets["total"][0]["count"] if facets["total"] else 0,
+        "by_severity": _fold_counts(facets["by_severity"]),
+        "by_type": _fold_counts(facets["by_type"]),
+    }
+    return facets["items"], counts
+
+
+def _merge_counts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    merged = {"total": a["total"] + b["total"], "by_severity": dict(a["by_severity"]), "by_type": dict(a["by_type"])}
+    for key in ("by_severity", "by_type"):
+        for name, count in b[key].items():
+            merged[key][name] = merged[key].get(name, 0) + count
+    return merged
+
+
+async def list_alerts(
+    query: Dict[str, Any],
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_counts: bool = True,
+    include_archived: bool = False,
+    locale: str = DEFAULT_LOCALE
+) -> Dict[str, Any]:
+    """
+    One page of alerts matching a query, optionally with facet counts
+
+    With counts, a single aggregation matches and sorts on an index, then
+    a $facet splits the stream into the page and the per-severity and
+    per-type counts over every matching alert (ignoring the cursor).
+    With include_archived the same query also runs against alerts_archive
+    and the two (date, _id)-ordered pages are merged, so cursors span both.
+    Alert text is rendered in `locale` for the returned page only.
+
+    Raises:
+        ValueError: If the cursor is malformed
+
+    Returns:
+        Dictionary with alerts, next_cursor, has_more and (optionally) counts
+    """
+    if include_archived:
+        (live_docs, live_counts), (archived_docs, archived_counts) = await asyncio.gather(
+            _query_page(Alert.get_motor_collection(), query, limit, cursor, include_counts),
+            _query_page(ArchivedAlert.get_motor_collection(), archive_query(query), limit, cursor, include_counts),
+        )
+        docs = sorted(live_docs + archived_docs, key=lambda doc: (doc["date"], doc["_id"]), reverse=True)
+        counts = _merge_counts(live_counts, archived_counts) if include_counts else None
+    else:
+        docs, counts = await _query_page(Alert.get_motor_collection(), query, limit, cursor, include_counts)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    response = {
+        "alerts": [format_alert(doc, locale) for doc in docs],
+        "next_cursor": encode_cursor(docs[-1]["date"], docs[-1]["_id"]) if has_more else None,
+        "has_more": has_more
+    }
+    if counts is not None:
+        response["counts"] = counts
+    return response
+
+
+def _transition_update(action: str, now: datetime) -> Dict[str, Any]:
+    if action == "acknowledge":
+        return {"status": "acknowledged", "acknowledged": True, "acknowledged_at": now}
+    return {"status": "resolved", "resolved_at": now}
+
+
+async def transition_alerts(
+    action: str,
+    query: Optional[Dict[str, Any]] = None,
+    alert_ids: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Acknowledge or resolve every matching alert with one update_many
+
+    Alerts already past the transition (e.g. acknowledging a resolved
+    alert) are left alone. Active alert counters of every affected field
+    are recounted afterwards, which also bumps their data_version.
+
+    Args:
+        action: acknowledge or resolve
+        query: Alert filter from alert_filter (status is overridden)
+        alert_ids: Explicit alert ids (used instead of query)
+
+    Raises:
+        ValueError: On an unknown action or malformed alert id
+
+    Returns:
+        Dictionary with matched and modified counts and the affected fields
+    """
+    if action not in ALERT_TRANSITIONS:
+        raise ValueError(f"action must be one of {', '.join(ALERT_TRANSITIONS)}")
+
+    if alert_ids is not None:
+        invalid = [alert_id for alert_id in alert_ids if not ObjectId.is_valid(alert_id)]
+        if invalid:
+            raise ValueError(f"Invalid alert ids: {', '.join(invalid[:5])}")
+        query = {"_id": {"$in": [ObjectId(alert_id) for alert_id in alert_ids]}}
+
+    query = {**query, "status": {"$in": list(ALERT_TRANSITIONS[action])}}
+    collection = Alert.get_motor_collection()
+
+    if "field_id" in query:
+        field_ids = [query["field_id"]]
+    else:
+        field_ids = await collection.distinct("field_id", query)
+
+    result = await collection.update_many(query, {"$set": _transition_update(action, datetime.utcnow())})
+
+    if result.modified_count:
+        for field_id in field_ids:
+            await refresh_alert_counts(field_id)
+
+    return {
+        "action": action,
+        "matched": result.matched_count,
+        "modified": result.modified_count,
+        "fields": field_ids
+    }
+
+
+async def transition_alert(action: str, alert_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Acknowledge or resolve a single alert atomically
+
+    Uses find_one_and_update so the previous status is known without a
+    separate read, and applies a -1 to the field's active counters when the
+    alert leaves the active set.
+
+    Returns:
+        The updated alert document, the unchanged one if the transition does
+        not apply to its status, or None if it does not exist
+    """
+    if not ObjectId.is_valid(alert_id):
+        return None
+
+    collection = Alert.get_motor_collection()
+    before = await collection.find_one_and_update(
+        {"_id": ObjectId(alert_id), "status": {"$in": list(ALERT_TRANSITIONS[action])}},
+        {"$set": _transition_update(action, datetime.utcnow())},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return await collection.find_one({"_id": ObjectId(alert_id)})
+
+    if before["status"] == "active":
+        await adjust_alert_counts(before["field_id"], before["severity"], before["alert_type"], -1)
+    return await collection.find_one({"_id": before["_id"]})
+
+
+async def migrate_alert_text(batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Replace stored message/recommendation strings with template ids
+
+    Only alerts whose text the template reproduces exactly are converted;
+    the rest keep their text. Sizes are measured as encoded BSON before and
+    after each converted document.
+
+    Returns:
+        Dictionary with converted / kept counts and bytes before and after
+    """
+    collection = Alert.get_motor_collection()
+    query = {"template_id": None, "message": {"$type": "string"}}
+    stats = {"converted": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = None
+
+    while True:
+        page_query = {**query, "_id": {"$gt": last_id}} if last_id else query
+        batch = await collection.find(page_query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for alert in batch:
+            template_id = compact_alert_text(
+                alert["alert_type"], alert["zone_id"], alert.get("metrics", {}),
+                alert["message"], alert.get("recommendation")
+            )
+            if template_id is None:
+                stats["kept"] += 1
+                continue
+
+            compact = {k: v for k, v in alert.items() if k not in ("message", "recommendation")}
+            compact["template_id"] = template_id
+            stats["converted"] += 1
+            stats["bytes_before"] += len(bson.encode(alert))
+            stats["bytes_after"] += len(bson.encode(compact))
+            operations.append(UpdateOne(
+                {"_id": alert["_id"]},
+                {"$set": {"template_id": template_id}, "$unset": {"message": "", "recommendation": ""}}
+            ))
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+
+    saved = stats["bytes_before"] - stats["bytes_after"]
+    stats["bytes_saved"] = saved
+    stats["reduction_pct"] = round(saved / stats["bytes_before"] * 100, 1) if stats["bytes_before"] else 0
+    return stats
@@ -0,0 +1,201 @@
+"""
+Anomaly Detection Service
+Scores each ingested day against per-cell rolling baselines kept as compact arrays
+"""
+from typing import Dict, Optional
+import numpy as np
+from loguru import logger
+from pymongo import ReplaceOne
+
+from app.core.config import settings
+from app.models.anomaly import AnomalyBaselineChunk, DailyAnomaly
+from app.services.grid_store import read_window
+from app.utils.anomaly import ewma_revert, ewma_update, ewma_zscore, top_anomalies
+from app.utils.chunks import split_into_chunks, stitch_chunks
+from app.utils.encoding import pack_array, unpack_array
+
+
+# Only deviations in the harmful direction are flagged:
+# canopy dropping below its baseline, pests rising above theirs
+ANOMALY_LAYERS = {
+    "canopy": -1,
+    "pest": 1,
+}
+
+
+def _min_std(layer: str) -> float:
+    """Baseline std floor for a layer"""
+    if layer == "canopy":
+        return settings.ANOMALY_MIN_STD_CANOPY
+    return settings.ANOMALY_MIN_STD_PEST
+
+
+async def detect_anomalies(
+    field_id: str,
+    date: str,
+    layers: Dict[str, np.ndarray]
+) -> Dict:
+    """
+    Score a field-day against per-cell EWMA baselines and update them
+
+    Must run before the day's grid chunks are overwritten: re-ingesting the
+    most recent date reverts its baseline update using the previous values.
+    Back-filled dates older than the baseline are scored but not folded in,
+    since an EWMA is order dependent. No historical DailyData is loaded.
+
+    Args:
+        field_id: Field identifier
+        date: Date in YYYY-MM-DD format
+        layers: Mapping of layer name -> 2D grid
+
+    Returns:
+        Dictionary with per-layer anomaly counts and the strongest cells
+    """
+    chunk_size = settings.GRID_CHUNK_SIZE
+    alpha = settings.ANOMALY_EWMA_ALPHA
+    threshold = settings.ANOMALY_Z_THRESHOLD
+    collection = AnomalyBaselineChunk.get_motor_collection()
+
+    layer_results = {}
+    top_cells = []
+
+    for layer, direction in ANOMALY_LAYERS.items():
+        grid = layers.get(layer)
+        if grid is None:
+            continue
+        grid = grid.astype(np.float64)
+
+        docs = await AnomalyBaselineChunk.find(
+            AnomalyBaselineChunk.field_id == field_id,
+            AnomalyBaselineChunk.layer == layer
+        ).to_list()
+
+        if docs and (docs[0].grid_shape != list(grid.shape) or docs[0].chunk_size != chunk_size):
+            logger.warning(f"Resetting anomaly baseline for {field_id}/{layer}: grid geometry changed")
+            await AnomalyBaselineChunk.find(
+                AnomalyBaselineChunk.field_id == field_id,
+                AnomalyBaselineChunk.layer == layer
+            ).delete()
+            docs = []
+
+        last_date = docs[0].last_date if docs else None
+        update = last_date is None or date >= last_date
+
+        previous = None
+        if docs and date == last_date:
+            previous = await read_window(field_id, date, layer)
+            if previous is None or previous.shape != grid.shape:
+                logger.warning(f"Cannot revert {date} baseline for {field_id}/{layer}; scoring only")
+                update = False
+                previous = None
+
+        existing = {(doc.chunk_row, doc.chunk_col): doc for doc in docs}
+        z_blocks, mask_blocks, baseline_blocks = {}, {}, {}
+        operations = []
+
+        for chunk_row, chunk_col, block in split_into_chunks(grid, chunk_size):
+            key = (chunk_row, chunk_col)
+            doc = existing.get(key)
+            if doc:
+                mean = unpack_array(doc.mean, "float32", doc.shape).astype(np.float64)
+                var = unpack_array(doc.var, "float32", doc.shape).astype(np.float64)
+                observations = doc.observations
+            else:
+                mean = np.zeros(block.shape)
+                var = np.zeros(block.shape)
+                observations = 0
+
+            if previous is not None and observations > 0:
+                y0, x0 = chunk_row * chunk_size, chunk_col * chunk_size
+                old_block = previous[y0:y0 + block.shape[0], x0:x0 + block.shape[1]].astype(np.float64)
+                if observations == 1:
+                    mean, var = np.zeros(block.shape), np.zeros(block.shape)
+                else:
+                    mean, var = ewma_revert(mean, var, old_block, alpha)
+                observations -= 1
+
+            z = ewma_zscore(block, mean, var, _min_std(layer))
+            warm = observations >= settings.ANOMALY_MIN_HISTORY
+            z_blocks[key] = z
+            mask_blocks[key] = (direction * z >= threshold) & warm
+            baseline_blocks[key] = mean
+
+            if not update:
+                continue
+
+            if observations == 0:
+                mean, var = block.copy(), np.zeros(block.shape)
+            else:
+                mean, var = ewma_update(mean, var, block, alpha)
+
+            filter_key = {"field_id": field_id, "layer": layer, "chunk_row": chunk_row, "chunk_col": chunk_col}
+            operations.append(ReplaceOne(filter_key, {
+                **filter_key,
+                "chunk_size": chunk_size,
+                "grid_shape": list(grid.shape),
+                "shape": list(block.shape),
+                "observations": observations + 1,
+                "last_date": date,
+                "mean": pack_array(mean.astype(np.float32)),
+                "var": pack_array(var.astype(np.float32)),
+            }, upsert=True))
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+
+        window = (0, 0, grid.shape[1], grid.shape[0])
+        zscores = stitch_chunks(z_blocks, window, chunk_size, dtype="float32")
+        mask = stitch_chunks(mask_blocks, window, chunk_size, dtype="bool")
+        baseline = stitch_chunks(baseline_blocks, window, chunk_size, dtype="float32")
+
+        cells = top_anomalies(zscores, mask, grid, baseline, limit=settings.ANOMALY_MAX_ALERTS)
+        for cell in cells:
+            cell["layer"] = layer
+        top_cells.extend(cells)
+
+        layer_results[layer] = {
+            "mask": np.packbits(mask).tobytes(),
+            "shape": list(mask.shape),
+            "anomalous_cells": int(mask.sum()),
+            "max_abs_z": round(float(np.abs(np.where(mask, zscores, 0)).max()), 2) if mask.size else 0.0
+        }
+
+    top_cells.sort(key=lambda c: abs(c["z_score"]), reverse=True)
+
+    await DailyAnomaly.find(
+        DailyAnomaly.field_id == field_id,
+        DailyAnomaly.date == date
+    ).delete()
+    await DailyAnomaly(
+        field_id=field_id,
+        date=date,
+        layers=layer_results,
+        top_cells=top_cells
+    ).insert()
+
+    return {
+        "anomalous_cells": {layer: result["anomalous_cells"] for layer, result in layer_results.items()},
+        "top_cells": top_cells
+    }
+
+
+def unpack_mask(layer_result: Dict) -> np.ndarray:
+    """Rebuild a stored anomaly mask as a uint8 0/1 grid"""
+    height, width = layer_result["shape"]
+    bits = np.frombuffer(layer_result["mask"], dtype=np.uint8)
+    return np.unpackbits(bits, count=height * width).reshape(height, width)
+
+
+async def get_daily_anomalies(
+    field_id: str,
+    date: Optional[str] = None
+) -> Optional[DailyAnomaly]:
+    """Fetch the anomaly record for a date, or the latest one"""
+    if date:
+        return await DailyAnomaly.find_one(
+            DailyAnomaly.field_id == field_id,
+            DailyAnomaly.date == date
+        )
+    return await DailyAnomaly.find(
+        DailyAnomaly.field_id == field_id
+    ).sort("-date").first_or_none()
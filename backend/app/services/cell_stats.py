@@ -0,0 +1,193 @@
+"""
+Cell Statistics Service
+Maintains per-cell running statistics incrementally at ingestion
+"""
+from datetime import date as date_cls
+from typing import Dict, Optional
+import numpy as np
+from loguru import logger
+from pymongo import ReplaceOne
+
+from app.core.config import settings
+from app.models.cell_stats import CellStatsChunk
+from app.services.grid_store import read_window
+from app.utils.cell_stats import (
+    add_observation,
+    finalize_accumulator,
+    init_accumulator,
+    remove_observation,
+)
+from app.utils.chunks import BBox, chunk_range, clip_bbox, split_into_chunks, stitch_chunks
+from app.utils.encoding import pack_array, unpack_array
+
+
+STATS_LAYERS = ("canopy", "pest")
+
+
+def day_ordinal(date: str) -> int:
+    """Convert a YYYY-MM-DD string to a proleptic Gregorian ordinal"""
+    return date_cls.fromisoformat(date).toordinal()
+
+
+def _to_accumulator(doc: CellStatsChunk) -> Dict:
+    """Unpack a stored chunk into an accumulator"""
+    return {
+        "count": doc.observations,
+        "mean_t": doc.mean_t,
+        "m2_t": doc.m2_t,
+        "mean": unpack_array(doc.mean, "float64", doc.shape).copy(),
+        "m2": unpack_array(doc.m2, "float64", doc.shape).copy(),
+        "c_ty": unpack_array(doc.c_ty, "float64", doc.shape).copy(),
+    }
+
+
+async def update_cell_stats(
+    field_id: str,
+    date: str,
+    layers: Dict[str, np.ndarray]
+) -> int:
+    """
+    Fold one field-day into the per-cell accumulators
+
+    Must run before the day's grid chunks are overwritten: when a date is
+    re-ingested, its previous values are read back from grid_chunks and
+    removed first so the day is never counted twice.
+
+    Args:
+        field_id: Field identifier
+        date: Date in YYYY-MM-DD format
+        layers: Mapping of layer name -> 2D grid (only STATS_LAYERS are used)
+
+    Returns:
+        Number of accumulator chunks written
+    """
+    chunk_size = settings.GRID_CHUNK_SIZE
+    day = day_ordinal(date)
+    collection = CellStatsChunk.get_motor_collection()
+    written = 0
+
+    for layer in STATS_LAYERS:
+        grid = layers.get(layer)
+        if grid is None:
+            continue
+
+        docs = await CellStatsChunk.find(
+            CellStatsChunk.field_id == field_id,
+            CellStatsChunk.layer == layer
+        ).to_list()
+
+        # A different grid shape or chunking cannot be merged; start over
+        if docs and (docs[0].grid_shape != list(grid.shape) or docs[0].chunk_size != chunk_size):
+            logger.warning(f"Resetting cell stats for {field_id}/{layer}: grid geometry changed")
+            await CellStatsChunk.find(
+                CellStatsChunk.field_id == field_id,
+                CellStatsChunk.layer == layer
+            ).delete()
+            docs = []
+
+        origin_day = docs[0].origin_day if docs else day
+        t = float(day - origin_day)
+        existing = {(doc.chunk_row, doc.chunk_col): doc for doc in docs}
+
+        previous = None
+        if docs and date in docs[0].dates:
+            previous = await read_window(field_id, date, layer)
+            if previous is None or previous.shape != grid.shape:
+                logger.warning(f"Cannot undo previous {date} values for {field_id}/{layer}; skipping stats update")
+                continue
+
+        operations = []
+        for chunk_row, chunk_col, block in split_into_chunks(grid, chunk_size):
+            doc = existing.get((chunk_row, chunk_col))
+            acc = _to_accumulator(doc) if doc else init_accumulator(block.shape)
+            dates = list(doc.dates) if doc else []
+
+            if previous is not None and doc:
+                y0, x0 = chunk_row * chunk_size, chunk_col * chunk_size
+                old_block = previous[y0:y0 + block.shape[0], x0:x0 + block.shape[1]]
+                remove_observation(acc, old_block, t)
+            else:
+                dates.append(date)
+
+            add_observation(acc, block, t)
+
+            key = {"field_id": field_id, "layer": layer, "chunk_row": chunk_row, "chunk_col": chunk_col}
+            operations.append(ReplaceOne(key, {
+                **key,
+                "chunk_size": chunk_size,
+                "grid_shape": list(grid.shape),
+                "shape": list(block.shape),
+                "origin_day": origin_day,
+                "dates": sorted(dates),
+                "observations": acc["count"],
+                "mean_t": acc["mean_t"],
+                "m2_t": acc["m2_t"],
+                "mean": pack_array(acc["mean"]),
+                "m2": pack_array(acc["m2"]),
+                "c_ty": pack_array(acc["c_ty"]),
+            }, upsert=True))
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+
+    return written
+
+
+async def load_cell_stats(
+    field_id: str,
+    layer: str,
+    bbox: Optional[BBox] = None
+) -> Optional[Dict]:
+    """
+    Read per-cell mean, std and slope grids in a single query
+
+    Cost is independent of how many days have been ingested.
+
+    Args:
+        field_id: Field identifier
+        layer: canopy or pest
+        bbox: Optional (x0, y0, x1, y1) window in cells
+
+    Returns:
+        Dictionary with mean, std, slope arrays and history metadata, or None
+    """
+    chunk_size = settings.GRID_CHUNK_SIZE
+    query = [
+        CellStatsChunk.field_id == field_id,
+        CellStatsChunk.layer == layer,
+    ]
+    if bbox is not None:
+        rows, cols = chunk_range(bbox, chunk_size)
+        query += [
+            CellStatsChunk.chunk_row >= rows.start,
+            CellStatsChunk.chunk_row < rows.stop,
+            CellStatsChunk.chunk_col >= cols.start,
+            CellStatsChunk.chunk_col < cols.stop,
+        ]
+
+    docs = await CellStatsChunk.find(*query).to_list()
+    if not docs:
+        return None
+
+    grid_shape = tuple(docs[0].grid_shape)
+    height, width = grid_shape
+    window = clip_bbox(bbox, grid_shape) if bbox is not None else (0, 0, width, height)
+
+    blocks = {"mean": {}, "std": {}, "slope": {}}
+    for doc in docs:
+        stats = finalize_accumulator(_to_accumulator(doc))
+        for name in blocks:
+            blocks[name][(doc.chunk_row, doc.chunk_col)] = stats[name]
+
+    dates = docs[0].dates
+    return {
+        "days": docs[0].observations,
+        "first_date": dates[0] if dates else None,
+        "last_date": dates[-1] if dates else None,
+        "bbox": list(window),
+        **{
+            name: stitch_chunks(chunk_blocks, window, docs[0].chunk_size, dtype="float32")
+            for name, chunk_blocks in blocks.items()
+        }
+    }
@@ -0,0 +1,62 @@
+"""
+Correlation Service
+Local pest-canopy correlation maps, cached per field-day and window
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.grid_store import read_window
+from app.utils.heatmap import calculate_correlation, find_suppression_zones, local_correlation
+
+
+# Entries are dominated by the local map, bounded in bytes rather than count
+correlation_cache = TTLCache(
+    "insights_correlation",
+    maxsize=64,
+    ttl=settings.CACHE_TTL_SECONDS,
+    max_bytes=settings.CORRELATION_CACHE_MAX_MB * 1024 * 1024,
+    sizeof=lambda result: result["local_correlation"].nbytes
+)
+
+
+async def get_correlation(
+    field_id: str,
+    date: str,
+    window: int = 5
+) -> Optional[Dict]:
+    """
+    Compute (or fetch from cache) global and local pest-canopy correlation
+
+    Returns:
+        Dictionary with the global summary, local correlation map and
+        suppression zones, or None if the day has no grid data
+    """
+    key = (field_id, date, window)
+    cached = correlation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    pest = await read_window(field_id, date, "pest")
+    canopy = await read_window(field_id, date, "canopy")
+    if pest is None or canopy is None:
+        return None
+
+    local_map = local_correlation(pest, canopy, window)
+    result = {
+        "global": calculate_correlation(pest.astype(float), canopy.astype(float)),
+        # Cached as float32: responses round it to 3 decimals, and it halves the footprint
+        "local_correlation": local_map.astype(np.float32),
+        "suppression_zones": find_suppression_zones(local_map, pest, canopy),
+        "cells_negative": int((local_map <= -0.5).sum()),
+        "cells_positive": int((local_map >= 0.5).sum())
+    }
+    correlation_cache.set(key, result)
+    return result
+
+
+def invalidate_correlation(field_id: str, date: str) -> None:
+    """Drop cached correlation results for a re-ingested field-day"""
+    correlation_cache.invalidate(lambda key: key[0] == field_id and key[1] == date)
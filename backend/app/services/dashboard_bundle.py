@@ -0,0 +1,246 @@
+"""
+Dashboard Bundle Service
+Builds several dashboard sections from one shared, concurrently fetched data set
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.daily_data import DailyData
+from app.services.alerts import alert_filter, list_alerts
+from app.services.field_state import get_field_state
+from app.services.grid_store import hydrate_daily_grids
+from app.utils.dates import trend_window
+
+
+BUNDLE_SECTIONS = (
+    "today",
+    "weekly",
+    "alerts",
+    "pest_trend",
+    "canopy_trend",
+    "pest_daily",
+    "canopy_daily",
+)
+
+DEFAULT_SECTIONS = ("today", "weekly", "alerts")
+
+# Scalar aggregates only; critical zone lists and grids are left in MongoDB
+TREND_PROJECTION = {
+    "_id": 0,
+    "date": 1,
+    "aggregates.pest_count": 1,
+    "aggregates.pest_counts_by_crop": 1,
+    "aggregates.avg_canopy": 1,
+}
+
+
+async def _fetch_days(field_id: str, dates: List[str]) -> List[Dict[str, Any]]:
+    """One $in query over (field_id, date) for every day a trend section needs"""
+    return await DailyData.get_motor_collection().find(
+        {"field_id": field_id, "date": {"$in": dates}},
+        TREND_PROJECTION
+    ).sort("date", 1).to_list(length=len(dates))
+
+
+async def _fetch_alerts(field_id: str, limit: int) -> Dict[str, Any]:
+    """Newest page of active alerts with counts, as served by GET /alerts/active"""
+    return await list_alerts(alert_filter(field_id, "active"), limit)
+
+
+async def _fetch_today(field_id: str, date: str) -> Optional[DailyData]:
+    """Today's full document with grids, only fetched for the daily sections"""
+    data = await DailyData.find_one(DailyData.field_id == field_id, DailyData.date == date)
+    return await hydrate_daily_grids(data) if data else None
+
+
+async def _none() -> None:
+    return None
+
+
+def today_kpis(state, today: str, yesterday: str) -> Optional[Dict[str, Any]]:
+    """Today's KPIs from a field state, served by GET /dashboard/kpis/today and the bundle's today section"""
+    if not state or state.latest_date != today:
+        return None
+
+    today_data = state.latest_aggregates
+    yesterday_data = state.previous_aggregates if state.previous_date == yesterday else None
+    pest_change = today_data["pest_count"] - yesterday_data["pest_count"] if yesterday_data else 0
+    canopy_change = today_data["avg_canopy"] - yesterday_data["avg_canopy"] if yesterday_data else 0
+    active_alerts = state.active_alerts.get("total", 0)
+
+    return {
+        "date": today,
+        "pest_count": today_data["pest_count"],
+        "avg_canopy_cover": today_data["avg_canopy"],
+        "change_vs_yesterday": {
+            "pest_change": pest_change,
+            "pest_change_pct": (pest_change / yesterday_data["pest_count"] * 100) if yesterday_data and yesterday_data["pest_count"] else 0,
+            "canopy_change": canopy_change,
+            "canopy_change_pct": (canopy_change / yesterday_data["avg_canopy"] * 100) if yesterday_data and yesterday_data["avg_canopy"] else 0
+        },
+        "status": "critical" if active_alerts > 0 else "healthy",
+        "active_alerts": active_alerts
+    }
+
+
+def _weekly_section(days: List[Dict[str, Any]], start: str, end: str) -> Optional[Dict[str, Any]]:
+    """Same shape as GET /dashboard/kpis/weekly"""
+    if not days:
+        return None
+
+    daily_pest_counts = [d["aggregates"]["pest_count"] for d in days]
+    daily_canopy_avg = [d["aggregates"]["avg_canopy"] for d in days]
+
+    return {
+        "week_start": start,
+        "week_end": end,
+        "daily_pest_counts": daily_pest_counts,
+        "daily_canopy_avg": daily_canopy_avg,
+        "weekly_summary": {
+            "total_pests": sum(daily_pest_counts),
+            "avg_canopy": sum(daily_canopy_avg) / len(daily_canopy_avg),
+            "pest_trend": "increasing" if daily_pest_counts[-1] > daily_pest_counts[0] else "decreasing",
+            "canopy_trend": "improving" if daily_canopy_avg[-1] > daily_canopy_avg[0] else "declining"
+        }
+    }
+
+
+def _alerts_section(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Same shape as GET /alerts/active"""
+    return {
+        "active_alerts": page["alerts"],
+        "total_active": page["counts"]["total"],
+        "counts": page["counts"],
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"]
+    }
+
+
+def _pest_trend_section(days: List[Dict[str, Any]], start: str, end: str) -> Dict[str, Any]:
+    """Same shape as GET /pests/trend"""
+    daily_counts = [{"date": d["date"], "count": d["aggregates"]["pest_count"]} for d in days]
+    if len(daily_counts) > 1 and daily_counts[0]["count"] > 0:
+        change_pct = (daily_counts[-1]["count"] - daily_counts[0]["count"]) / daily_counts[0]["count"] * 100
+    else:
+        change_pct = 0
+    trend = ("increasing" if change_pct > 0 else "decreasing") if len(daily_counts) > 1 else "stable"
+
+    return {
+        "start_date": start,
+        "end_date": end,
+        "crop_type": None,
+        "daily_counts": daily_counts,
+        "trend": trend,
+        "change_pct": round(change_pct, 2)
+    }
+
+
+def _canopy_trend_section(days: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Same shape as GET /canopy/trend"""
+    daily_averages = [{"date": d["date"], "avg_canopy": d["aggregates"]["avg_canopy"]} for d in days]
+    if len(daily_averages) > 1 and daily_averages[0]["avg_canopy"]:
+        change_pct = (daily_averages[-1]["avg_canopy"] - daily_averages[0]["avg_canopy"]) / daily_averages[0]["avg_canopy"] * 100
+        trend = "improving" if change_pct > 0 else "declining"
+    else:
+        change_pct = 0
+        trend = "stable"
+
+    return {
+        "daily_averages": daily_averages,
+        "trend": trend,
+        "change_pct": round(change_pct, 2)
+    }
+
+
+def _pest_daily_section(data: Optional[DailyData]) -> Optional[Dict[str, Any]]:
+    """Same shape as GET /pests/daily for today, without the raw pest grid"""
+    if not data:
+        return None
+
+    pest_counts_by_crop = data.aggregates.get("pest_counts_by_crop", {})
+    heatmaps_by_crop = data.heatmaps.get("pest_density_by_crop", {})
+    selected_crop = next(iter(pest_counts_by_crop), None)
+    critical_zones = data.aggregates.get("critical_zones", [])
+
+    return {
+        "date": data.date,
+        "total_count": data.aggregates["pest_count"],
+        "pest_counts_by_crop": pest_counts_by_crop,
+        "available_crop_types": list(pest_counts_by_crop),
+        "selected_crop_type": selected_crop,
+        "heatmap_grid": heatmaps_by_crop.get(selected_crop, []) if selected_crop else [],
+        "heatmaps_by_crop": heatmaps_by_crop,
+        "grid_dimensions": data.field_dimensions,
+        "hotspots": critical_zones,
+        "critical_zones_count": len(critical_zones)
+    }
+
+
+def _canopy_daily_section(data: Optional[DailyData]) -> Optional[Dict[str, Any]]:
+    """Same shape as GET /canopy/daily for today"""
+    if not data:
+        return None
+
+    return {
+        "date": data.date,
+        "grid_data": data.heatmaps.get("canopy_grid", []),
+        "statistics": {
+            "avg": data.aggregates["avg_canopy"],
+            "min": data.aggregates["min_canopy"],
+            "max": data.aggregates["max_canopy"]
+        },
+        "low_coverage_zones": [
+            zone for zone in data.aggregates.get("critical_zones", [])
+            if zone["canopy_cover"] < 60
+        ]
+    }
+
+
+async def build_bundle(
+    field_id: str,
+    sections: Iterable[str],
+    days: int = 7,
+    alerts_limit: int = 50
+) -> Dict[str, Any]:
+    """
+    Build the requested dashboard sections in one pass
+
+    Each distinct document set is fetched once (field state, the trend
+    window's aggregates via $in, a page of active alerts, today's grids) and the
+    fetches run concurrently; sections are then assembled in memory.
+
+    Args:
+        field_id: Field identifier
+        sections: Section names from BUNDLE_SECTIONS
+        days: Trend window in days
+        alerts_limit: Maximum alerts in the alerts section
+
+    Returns:
+        Mapping of section name -> payload (None when there is no data)
+    """
+    sections = set(sections)
+    now = datetime.utcnow()
+    today = now.strftime("%Y-%m-%d")
+    yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+    window = trend_window(days)
+    needs_days = sections & {"weekly", "pest_trend", "canopy_trend"}
+    needs_today_doc = sections & {"pest_daily", "canopy_daily"}
+
+    state, window_days, alerts, today_doc = await asyncio.gather(
+        get_field_state(field_id) if sections & {"today", "alerts"} else _none(),
+        _fetch_days(field_id, window) if needs_days else _none(),
+        _fetch_alerts(field_id, alerts_limit) if "alerts" in sections else _none(),
+        _fetch_today(field_id, today) if needs_today_doc else _none(),
+    )
+
+    builders = {
+        "today": lambda: today_kpis(state, today, yesterday),
+        "weekly": lambda: _weekly_section(window_days, window[0], window[-1]),
+        "alerts": lambda: _alerts_section(alerts),
+        "pest_trend": lambda: _pest_trend_section(window_days, window[0], window[-1]),
+        "canopy_trend": lambda: _canopy_trend_section(window_days),
+        "pest_daily": lambda: _pest_daily_section(today_doc),
+        "canopy_daily": lambda: _canopy_daily_section(today_doc),
+    }
+    return {name: builders[name]() for name in BUNDLE_SECTIONS if name in sections}
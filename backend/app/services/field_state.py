@@ -0,0 +1,180 @@
+"""
+Field State Service
+Atomic maintenance of per-field live state (latest day, active alert counters)
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.models.alert import Alert
+from app.models.daily_data import DailyData
+from app.models.field_state import FieldState, empty_alert_counts
+
+
+def state_aggregates(aggregates: Dict[str, Any]) -> Dict[str, Any]:
+    """Scalar subset of a day's aggregates kept in field state"""
+    return {
+        "pest_count": aggregates.get("pest_count", 0),
+        "pest_counts_by_crop": aggregates.get("pest_counts_by_crop", {}),
+        "avg_canopy": aggregates.get("avg_canopy", 0),
+        "min_canopy": aggregates.get("min_canopy", 0),
+        "max_canopy": aggregates.get("max_canopy", 0),
+        "critical_zone_count": len(aggregates.get("critical_zones", [])),
+    }
+
+
+def _bump_version() -> Dict[str, Any]:
+    return {"$add": [{"$ifNull": ["$data_version", 0]}, 1]}
+
+
+async def record_ingestion(
+    field_id: str,
+    date: str,
+    timestamp: datetime,
+    aggregates: Dict[str, Any]
+) -> None:
+    """
+    Fold an ingested day into the field's state with one pipeline update
+
+    A newer date becomes latest and shifts the old latest to previous;
+    re-ingesting latest replaces it in place; a back-filled date replaces
+    previous when it is closer to latest. All comparisons read the stored
+    values inside the update, so concurrent ingestions cannot interleave.
+    """
+    collection = FieldState.get_motor_collection()
+    values = {"$literal": state_aggregates(aggregates)}
+    latest = {"$ifNull": ["$latest_date", ""]}
+    previous = {"$ifNull": ["$previous_date", ""]}
+
+    is_newer = {"$gt": [date, latest]}
+    is_latest = {"$gte": [date, latest]}
+    is_previous = {"$and": [{"$lt": [date, latest]}, {"$gte": [date, previous]}]}
+
+    await collection.update_one(
+        {"field_id": field_id},
+        [{"$set": {
+            "field_id": field_id,
+            "previous_date": {"$switch": {"branches": [
+                {"case": is_newer, "then": "$latest_date"},
+                {"case": is_previous, "then": date},
+            ], "default": "$previous_date"}},
+            "previous_aggregates": {"$switch": {"branches": [
+                {"case": is_newer, "then": "$latest_aggregates"},
+                {"case": is_previous, "then": values},
+            ], "default": "$previous_aggregates"}},
+            "latest_date": {"$cond": [is_latest, date, "$latest_date"]},
+            "latest_timestamp": {"$cond": [is_latest, timestamp, "$latest_timestamp"]},
+            "latest_aggregates": {"$cond": [is_latest, values, "$latest_aggregates"]},
+            "active_alerts": {"$ifNull": ["$active_alerts", {"$literal": empty_alert_counts()}]},
+            "data_version": _bump_version(),
+            "updated_at": datetime.utcnow(),
+        }}],
+        upsert=True
+    )
+
+
+async def refresh_alert_counts(field_id: str) -> Dict[str, Any]:
+    """
+    Recount a field's active alerts by severity and type
+
+    Used after ingestion replaces a day's alerts; one grouped aggregation on
+    the (field_id, status) index.
+
+    Returns:
+        The new counters
+    """
+    groups = await Alert.aggregate([
+        {"$match": {"field_id": field_id, "status": "active"}},
+        {"$group": {"_id": {"severity": "$severity", "type": "$alert_type"}, "count": {"$sum": 1}}},
+    ]).to_list()
+
+    counts = empty_alert_counts()
+    for group in groups:
+        severity, alert_type = group["_id"]["severity"], group["_id"]["type"]
+        counts["total"] += group["count"]
+        counts["by_severity"][severity] = counts["by_severity"].get(severity, 0) + group["count"]
+        counts["by_type"][alert_type] = counts["by_type"].get(alert_type, 0) + group["count"]
+
+    await FieldState.get_motor_collection().update_one(
+        {"field_id": field_id},
+        [{"$set": {
+            "field_id": field_id,
+            "active_alerts": {"$literal": counts},
+            "data_version": _bump_version(),
+            "updated_at": datetime.utcnow(),
+        }}],
+        upsert=True
+    )
+    return counts
+
+
+async def adjust_alert_counts(
+    field_id: str,
+    severity: str,
+    alert_type: str,
+    delta: int
+) -> None:
+    """Atomically apply an alert entering (+1) or leaving (-1) the active set"""
+    await FieldState.get_motor_collection().update_one(
+        {"field_id": field_id},
+        {
+            "$inc": {
+                "active_alerts.total": delta,
+                f"active_alerts.by_severity.{severity}": delta,
+                f"active_alerts.by_type.{alert_type}": delta,
+                "data_version": 1,
+            },
+            "$set": {"updated_at": datetime.utcnow()},
+        }
+    )
+
+
+async def rebuild_field_state(field_id: str) -> Optional[FieldState]:
+    """
+    Recreate a field's state from daily_data and alerts
+
+    Reads the two newest days through the (field_id, date) index, projecting
+    only their aggregates.
+
+    Returns:
+        The rebuilt state, or None if the field has no data
+    """
+    days = await DailyData.get_motor_collection().find(
+        {"field_id": field_id},
+        {"date": 1, "timestamp": 1, "aggregates": 1}
+    ).sort("date", -1).limit(2).to_list(length=2)
+    if not days:
+        return None
+
+    latest = days[0]
+    previous = days[1] if len(days) > 1 else None
+    await FieldState.get_motor_collection().update_one(
+        {"field_id": field_id},
+        {"$set": {
+            "field_id": field_id,
+            "latest_date": latest["date"],
+            "latest_timestamp": latest.get("timestamp"),
+            "latest_aggregates": state_aggregates(latest.get("aggregates", {})),
+            "previous_date": previous["date"] if previous else None,
+            "previous_aggregates": state_aggregates(previous.get("aggregates", {})) if previous else {},
+            "updated_at": datetime.utcnow(),
+        }, "$inc": {"data_version": 1}},
+        upsert=True
+    )
+    await refresh_alert_counts(field_id)
+    return await FieldState.find_one(FieldState.field_id == field_id)
+
+
+async def get_field_state(field_id: str) -> Optional[FieldState]:
+    """Read a field's state, building it once for fields ingested before it existed"""
+    state = await FieldState.find_one(FieldState.field_id == field_id)
+    if state is None or state.latest_date is None:
+        state = await rebuild_field_state(field_id)
+    return state
+
+
+async def rebuild_all_field_states() -> List[str]:
+    """Rebuild state for every field with daily data; returns the field ids"""
+    field_ids = await DailyData.get_motor_collection().distinct("field_id")
+    for field_id in field_ids:
+        await rebuild_field_state(field_id)
+    return sorted(field_ids)
@@ -0,0 +1,178 @@
+"""
+Flight Statistics Service
+Maintains per-drone flight counters and filtered flight summaries
+without scanning flight history in Python
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from beanie.odm.operators.update.general import Set
+from loguru import logger
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.drone import DroneStatus, FlightRecord
+
+
+DEFAULT_DRONE_ID = "drone_001"
+
+flight_summary_cache = TTLCache("flight_summary", maxsize=128, ttl=settings.CACHE_TTL_SECONDS)
+
+
+async def create_drone(drone_id: str, **fields: Any) -> DroneStatus:
+    """
+    Insert a drone status document with counters totalled from its flight history
+
+    The one $group runs at creation, so polled status pages never scan
+    flight history afterwards.
+    """
+    counters = await count_flights(drone_id)
+    drone = DroneStatus(drone_id=drone_id, **fields, **counters, counters_synced=True)
+    await drone.insert()
+    return drone
+
+
+async def record_flight(drone_id: str, duration: int) -> None:
+    """
+    Atomically add one flight to a drone's counters
+
+    Upserts, so a flight logged for a drone without a status document still
+    counts; a newly created drone is then totalled from its full history.
+    """
+    defaults = DroneStatus(drone_id=drone_id).model_dump(
+        exclude={"id", "revision_id", "drone_id", "total_flights", "total_flight_minutes"}
+    )
+    result = await DroneStatus.get_motor_collection().update_one(
+        {"drone_id": drone_id},
+        {"$inc": {"total_flights": 1, "total_flight_minutes": duration}, "$setOnInsert": defaults},
+        upsert=True
+    )
+    if result.upserted_id is not None:
+        await rebuild_flight_counters(drone_id)
+    flight_summary_cache.invalidate(lambda key: key[0] == drone_id)
+
+
+async def backfill_flight_drone_ids() -> int:
+    """
+    Attribute flights logged before records carried a drone_id to the default drone
+
+    Matches how they were counted before; runs once at startup and before
+    counter rebuilds, never from a read.
+
+    Returns:
+        Number of flight records updated
+    """
+    result = await FlightRecord.get_motor_collection().update_many(
+        {"drone_id": {"$exists": False}},
+        {"$set": {"drone_id": DEFAULT_DRONE_ID}}
+    )
+    return result.modified_count
+
+
+async def count_flights(drone_id: str) -> dict:
+    """
+    Total a drone's flights from flight_records with one $group (read-only)
+
+    Returns:
+        Dictionary with total_flights and total_flight_minutes
+    """
+    totals = await FlightRecord.aggregate([
+        {"$match": {"drone_id": drone_id}},
+        {"$group": {"_id": None, "flights": {"$sum": 1}, "minutes": {"$sum": "$duration"}}},
+    ]).to_list()
+
+    return {
+        "total_flights": totals[0]["flights"] if totals else 0,
+        "total_flight_minutes": totals[0]["minutes"] if totals else 0,
+    }
+
+
+async def rebuild_flight_counters(drone_id: str) -> dict:
+    """
+    Recompute and store a drone's counters from flight_records
+
+    Returns:
+        Dictionary with total_flights and total_flight_minutes
+    """
+    counters = await count_flights(drone_id)
+    await DroneStatus.find_one(DroneStatus.drone_id == drone_id).update(
+        Set({
+            DroneStatus.total_flights: counters["total_flights"],
+            DroneStatus.total_flight_minutes: counters["total_flight_minutes"],
+            DroneStatus.counters_synced: True,
+        })
+    )
+    flight_summary_cache.invalidate()
+    return counters
+
+
+async def migrate_flight_records() -> None:
+    """Startup migration: backfill legacy drone_ids, then sync drones whose counters predate record_flight"""
+    backfilled = await backfill_flight_drone_ids()
+    if backfilled:
+        logger.info(f"Attributed {backfilled} legacy flight records to {DEFAULT_DRONE_ID}")
+
+    unsynced = await DroneStatus.find({"counters_synced": {"$ne": True}}).to_list()
+    for drone in unsynced:
+        await rebuild_flight_counters(drone.drone_id)
+    if unsynced:
+        logger.info(f"Rebuilt flight counters for {len(unsynced)} drones")
+
+
+def flight_filter(
+    drone_id: str,
+    field_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Build the flight_records query for a drone, optional field and date range"""
+    query: Dict[str, Any] = {"drone_id": drone_id}
+    if field_id:
+        query["field_id"] = field_id
+    if start_date or end_date:
+        query["date"] = {}
+        if start_date:
+            query["date"]["$gte"] = start_date
+        if end_date:
+            query["date"]["$lte"] = end_date
+    return query
+
+
+async def summarize_flights(
+    drone_id: str,
+    field_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Summarize every flight matching a filter with one $group, cached per filter
+
+    Returns:
+        Dictionary with flight count, distance, hours, images and success rate
+    """
+    key = (drone_id, field_id, start_date, end_date)
+    cached = flight_summary_cache.get(key)
+    if cached is not None:
+        return cached
+
+    totals = await FlightRecord.aggregate([
+        {"$match": flight_filter(drone_id, field_id, start_date, end_date)},
+        {"$group": {
+            "_id": None,
+            "flights": {"$sum": 1},
+            "distance": {"$sum": "$distance_covered"},
+            "minutes": {"$sum": "$duration"},
+            "images": {"$sum": "$images_captured"},
+            "successful": {"$sum": {"$cond": [{"$eq": ["$status", "success"]}, 1, 0]}},
+        }},
+    ]).to_list()
+    totals = totals[0] if totals else {"flights": 0, "distance": 0, "minutes": 0, "images": 0, "successful": 0}
+
+    summary = {
+        "total_flights": totals["flights"],
+        "total_distance_km": round(totals["distance"], 2),
+        "total_flight_hours": round(totals["minutes"] / 60, 2),
+        "total_images": totals["images"],
+        "success_rate": round(totals["successful"] / totals["flights"] * 100, 1) if totals["flights"] else 0
+    }
+    flight_summary_cache.set(key, summary)
+    return summary
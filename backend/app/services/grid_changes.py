@@ -0,0 +1,185 @@
+"""
+Grid Change Service
+Computes, caches and precomputes per-cell change grids between field-days
+"""
+from typing import Dict, Optional
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.models.daily_data import DailyData
+from app.models.field_config import FieldConfig
+from app.models.grid_change import GridChange
+from app.services.grid_store import read_window
+from app.utils.changes import compute_grid_changes, summarize_grid_changes
+from app.utils.encoding import pack_array, unpack_array
+
+
+CHANGE_LAYERS = ("canopy", "pest")
+
+# Change sets above this packed size are computed per request instead of cached
+MAX_CACHED_CHANGE_BYTES = 12 * 1024 * 1024
+
+
+async def _hotspot_threshold(field_id: str) -> float:
+    """Pest warning threshold for a field"""
+    field_config = await FieldConfig.find_one(FieldConfig.field_id == field_id)
+    if field_config:
+        return field_config.thresholds.get("pest_density_warning", settings.PEST_DENSITY_WARNING_THRESHOLD)
+    return settings.PEST_DENSITY_WARNING_THRESHOLD
+
+
+async def _load_layers(field_id: str, date: str) -> Optional[Dict[str, np.ndarray]]:
+    """Load the change layers for a field-day from grid chunks"""
+    layers = {}
+    for layer in CHANGE_LAYERS:
+        grid = await read_window(field_id, date, layer)
+        if grid is None:
+            return None
+        layers[layer] = grid
+    return layers
+
+
+async def _adjacent_date(field_id: str, date: str, later: bool) -> Optional[str]:
+    """Nearest ingested date before (or after) a date, served by the (field_id, date) index"""
+    doc = await DailyData.get_motor_collection().find_one(
+        {"field_id": field_id, "date": {"$gt": date} if later else {"$lt": date}},
+        {"_id": 0, "date": 1},
+        sort=[("date", 1 if later else -1)]
+    )
+    return doc["date"] if doc else None
+
+
+def _unpack(doc: GridChange) -> Dict[str, np.ndarray]:
+    """Rebuild change grids from a cached document"""
+    height, width = doc.shape
+    cells = height * width
+
+    def mask(data: bytes) -> np.ndarray:
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=cells).reshape(height, width).astype(bool)
+
+    return {
+        "canopy_delta": unpack_array(doc.canopy_delta, "float32", doc.shape),
+        "pest_delta": unpack_array(doc.pest_delta, doc.pest_delta_dtype, doc.shape),
+        "new_hotspots": mask(doc.new_hotspots),
+        "resolved_hotspots": mask(doc.resolved_hotspots),
+    }
+
+
+async def _store(
+    field_id: str,
+    from_date: str,
+    to_date: str,
+    changes: Dict[str, np.ndarray],
+    summary: dict,
+    threshold: float
+) -> None:
+    """Cache a change set, replacing any previous one for the pair"""
+    pest_delta = changes["pest_delta"]
+    limits = np.iinfo(np.int16)
+    if pest_delta.size and limits.min <= pest_delta.min() and pest_delta.max() <= limits.max:
+        pest_delta = pest_delta.astype(np.int16)
+
+    doc = GridChange(
+        field_id=field_id,
+        from_date=from_date,
+        to_date=to_date,
+        shape=list(changes["canopy_delta"].shape),
+        hotspot_threshold=threshold,
+        canopy_delta=pack_array(changes["canopy_delta"]),
+        pest_delta=pack_array(pest_delta),
+        pest_delta_dtype=pest_delta.dtype.name,
+        new_hotspots=np.packbits(changes["new_hotspots"]).tobytes(),
+        resolved_hotspots=np.packbits(changes["resolved_hotspots"]).tobytes(),
+        summary=summary
+    )
+
+    size = len(doc.canopy_delta) + len(doc.pest_delta) + len(doc.new_hotspots) + len(doc.resolved_hotspots)
+    if size > MAX_CACHED_CHANGE_BYTES:
+        return
+
+    # One upsert on the unique pair, so concurrent misses and ingestion-time
+    # precomputes overwrite each other instead of colliding
+    await GridChange.get_motor_collection().replace_one(
+        {"field_id": field_id, "from_date": from_date, "to_date": to_date},
+        doc.model_dump(exclude={"id", "revision_id"}),
+        upsert=True
+    )
+
+
+async def get_grid_changes(
+    field_id: str,
+    from_date: str,
+    to_date: str
+) -> Optional[Dict]:
+    """
+    Get change grids between two dates, computing and caching on a miss
+
+    Returns:
+        Dictionary with change arrays, summary and shape, or None if either day is missing
+    """
+    threshold = await _hotspot_threshold(field_id)
+    cached = await GridChange.find_one(
+        GridChange.field_id == field_id,
+        GridChange.from_date == from_date,
+        GridChange.to_date == to_date
+    )
+    if cached and cached.hotspot_threshold == threshold:
+        return {"changes": _unpack(cached), "summary": cached.summary, "cached": True}
+
+    previous = await _load_layers(field_id, from_date)
+    current = await _load_layers(field_id, to_date)
+    if previous is None or current is None:
+        return None
+    if previous["canopy"].shape != current["canopy"].shape:
+        raise ValueError("Grids for the two dates have different shapes")
+
+    changes = compute_grid_changes(previous, current, threshold)
+    summary = summarize_grid_changes(changes)
+    await _store(field_id, from_date, to_date, changes, summary, threshold)
+    return {"changes": changes, "summary": summary, "cached": False}
+
+
+async def precompute_daily_changes(
+    field_id: str,
+    date: str,
+    layers: Dict[str, np.ndarray]
+) -> int:
+    """
+    Refresh cached change sets touching a newly ingested day
+
+    Drops every cached pair involving the date, then computes the pairs
+    with the adjacent ingested days (previous flight -> date, and date ->
+    next flight when back-filling), so skipped days do not leave the
+    dashboard's default comparison uncached. Uses the in-memory layers for
+    this date.
+
+    Returns:
+        Number of change sets computed
+    """
+    await GridChange.find(
+        GridChange.field_id == field_id,
+        {"$or": [{"from_date": date}, {"to_date": date}]}
+    ).delete()
+
+    previous_date = await _adjacent_date(field_id, date, later=False)
+    next_date = await _adjacent_date(field_id, date, later=True)
+    threshold = await _hotspot_threshold(field_id)
+    current = {layer: layers[layer] for layer in CHANGE_LAYERS}
+
+    computed = 0
+    for from_date, to_date in ((previous_date, date), (date, next_date)):
+        other_date = from_date if to_date == date else to_date
+        if other_date is None:
+            continue
+        other = await _load_layers(field_id, other_date)
+        if other is None or other["canopy"].shape != current["canopy"].shape:
+            continue
+
+        pair = (other, current) if to_date == date else (current, other)
+        changes = compute_grid_changes(*pair, hotspot_threshold=threshold)
+        await _store(field_id, from_date, to_date, changes, summarize_grid_changes(changes), threshold)
+        computed += 1
+
+    logger.debug(f"Precomputed {computed} change sets for {field_id} {date}")
+    return computed
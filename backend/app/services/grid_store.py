@@ -0,0 +1,208 @@
+"""
+Grid Store Service
+Persists daily grid layers as fixed-size chunks and serves windowed reads
+"""
+from typing import Dict, List, Optional
+import numpy as np
+
+from app.core.config import settings
+from app.models.daily_data import DailyData
+from app.models.grid_chunk import GridChunk
+from app.utils.chunks import BBox, chunk_range, clip_bbox, split_into_chunks, stitch_chunks
+from app.utils.encoding import pack_array, smallest_uint_dtype, unpack_array
+
+
+PEST_LAYER_PREFIX = "pest:"
+
+
+def build_layers(
+    canopy_grid: np.ndarray,
+    heatmaps_by_crop: Dict[str, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """
+    Build the storable layers for one field-day
+
+    Args:
+        canopy_grid: 2D canopy percentages
+        heatmaps_by_crop: Per-crop 2D pest counts
+
+    Returns:
+        Mapping of layer name -> compact array ("canopy", "pest", "pest:<crop>")
+    """
+    total = np.zeros(canopy_grid.shape, dtype=np.uint32)
+    layers = {"canopy": canopy_grid.astype(np.float32)}
+
+    for crop_type, heatmap in heatmaps_by_crop.items():
+        counts = np.rint(heatmap).astype(np.uint32)
+        total += counts
+        layers[f"{PEST_LAYER_PREFIX}{crop_type}"] = counts
+
+    layers["pest"] = total
+
+    # Counts are stored in the narrowest unsigned dtype that fits
+    return {
+        name: array if array.dtype.kind != "u" else array.astype(smallest_uint_dtype(array))
+        for name, array in layers.items()
+    }
+
+
+async def write_layers(
+    field_id: str,
+    date: str,
+    layers: Dict[str, np.ndarray],
+    chunk_size: Optional[int] = None
+) -> int:
+    """
+    Replace all chunks stored for a field-day
+
+    Args:
+        field_id: Field identifier
+        date: Date in YYYY-MM-DD format
+        layers: Mapping of layer name -> 2D array
+        chunk_size: Chunk edge length (defaults to settings.GRID_CHUNK_SIZE)
+
+    Returns:
+        Number of chunks written
+    """
+    chunk_size = chunk_size or settings.GRID_CHUNK_SIZE
+
+    await GridChunk.find(
+        GridChunk.field_id == field_id,
+        GridChunk.date == date
+    ).delete()
+
+    chunks = []
+    for layer, grid in layers.items():
+        for chunk_row, chunk_col, block in split_into_chunks(grid, chunk_size):
+            chunks.append(GridChunk(
+                field_id=field_id,
+                date=date,
+                layer=layer,
+                chunk_row=chunk_row,
+                chunk_col=chunk_col,
+                chunk_size=chunk_size,
+                grid_shape=list(grid.shape),
+                shape=list(block.shape),
+                dtype=block.dtype.name,
+                data=pack_array(block)
+            ))
+
+    if chunks:
+        await GridChunk.insert_many(chunks)
+    return len(chunks)
+
+
+async def read_window(
+    field_id: str,
+    date: str,
+    layer: str,
+    bbox: Optional[BBox] = None
+) -> Optional[np.ndarray]:
+    """
+    Read a window of one layer, fetching only the overlapping chunks
+
+    Args:
+        field_id: Field identifier
+        date: Date in YYYY-MM-DD format
+        layer: Layer name
+        bbox: (x0, y0, x1, y1) window in cells, end-exclusive; None for the full grid
+
+    Returns:
+        2D array for the window, or None if the layer is not stored
+    """
+    query = [
+        GridChunk.field_id == field_id,
+        GridChunk.date == date,
+        GridChunk.layer == layer,
+    ]
+
+    if bbox is not None:
+        # Chunk rows/cols come from the chunk size the layer was written with,
+        # which GRID_CHUNK_SIZE may no longer match
+        stored = await GridChunk.get_motor_collection().find_one(
+            {"field_id": field_id, "date": date, "layer": layer},
+            {"_id": 0, "chunk_size": 1}
+        )
+        if stored is None:
+            return None
+        rows, cols = chunk_range(bbox, stored["chunk_size"])
+        query += [
+            GridChunk.chunk_row >= rows.start,
+            GridChunk.chunk_row < rows.stop,
+            GridChunk.chunk_col >= cols.start,
+            GridChunk.chunk_col < cols.stop,
+        ]
+
+    docs = await GridChunk.find(*query).to_list()
+    if not docs:
+        return None
+
+    grid_shape = tuple(docs[0].grid_shape)
+    chunk_size = docs[0].chunk_size
+    height, width = grid_shape
+    window = clip_bbox(bbox, grid_shape) if bbox is not None else (0, 0, width, height)
+
+    blocks = {
+        (doc.chunk_row, doc.chunk_col): unpack_array(doc.data, doc.dtype, doc.shape)
+        for doc in docs
+    }
+    return stitch_chunks(blocks, window, chunk_size, dtype=docs[0].dtype)
+
+
+async def list_layers(field_id: str, date: str) -> List[str]:
+    """List the layers stored for a field-day"""
+    layers = await GridChunk.distinct(
+        "layer",
+        {"field_id": field_id, "date": date}
+    )
+    return sorted(layers)
+
+
+async def hydrate_daily_grids(data: DailyData) -> DailyData:
+    """
+    Fill in the grids of a DailyData document stored in chunked mode
+
+    Large fields keep their grids only in grid_chunks so the daily document
+    stays under MongoDB's 16 MB limit. Endpoints that still expect inline
+    grids call this before reading them. Inline documents are returned as-is.
+    """
+    if data.grid_storage != "chunked":
+        return data
+
+    canopy = await read_window(data.field_id, data.date, "canopy")
+    heatmaps_by_crop = {}
+    for layer in await list_layers(data.field_id, data.date):
+        if layer.startswith(PEST_LAYER_PREFIX):
+            crop_type = layer[len(PEST_LAYER_PREFIX):]
+            heatmaps_by_crop[crop_type] = await read_window(data.field_id, data.date, layer)
+
+    canopy_list = canopy.astype(float).round(2).tolist() if canopy is not None else []
+    data.canopy_cover = canopy_list
+    data.heatmaps = {
+        "pest_density_by_crop": {crop: hmap.tolist() for crop, hmap in heatmaps_by_crop.items()},
+        "canopy_grid": canopy_list
+    }
+    data.pest_grid = _rebuild_pest_grid(heatmaps_by_crop, canopy.shape if canopy is not None else (0, 0))
+    return data
+
+
+def _rebuild_pest_grid(
+    heatmaps_by_crop: Dict[str, np.ndarray],
+    shape: tuple
+) -> List[List[Dict]]:
+    """Rebuild the per-cell {count, crop_type} grid from per-crop layers"""
+    if not heatmaps_by_crop:
+        return [[{"count": 0, "crop_type": "none"} for _ in range(shape[1])] for _ in range(shape[0])]
+
+    crops = list(heatmaps_by_crop.keys())
+    stacked = np.stack([heatmaps_by_crop[c] for c in crops])
+    dominant = stacked.argmax(axis=0)
+    counts = stacked.sum(axis=0)
+
+    return [
+        [
+            {"count": int(count), "crop_type": crops[idx] if count > 0 else "none"}
+            for count, idx in zip(count_row, idx_row)
+        ]
+        for count_row, idx_row in zip(counts.tolist(), dominant.tolist())
+    ]
@@ -0,0 +1,343 @@
+"""
+History Cube Service
+Local memory-mapped (days x H x W) cubes per field and layer for time-series zone queries
+"""
+import asyncio
+import json
+import os
+import uuid
+from bisect import bisect_left, bisect_right
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.models.daily_data import DailyData
+from app.services.grid_store import read_window
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized within one process only
+    fcntl = None
+
+
+# Cube dtype per layer; pest counts are clipped to the uint16 range
+CUBE_LAYERS = {
+    "canopy": np.float32,
+    "pest": np.uint16,
+}
+
+# Open read-only memmaps with the index file stamp they were opened at; dropped
+# when this process writes the cube, and reopened when another worker has
+_open_cubes: Dict[Tuple[str, str], Tuple[Tuple[int, int], dict, np.memmap]] = {}
+
+# In-process writer locks per (field, layer); the file lock covers other workers
+_cube_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+def _paths(field_id: str, layer: str) -> Tuple[str, str]:
+    """Default data and index file paths for a cube"""
+    directory = os.path.join(settings.HISTORY_CUBE_DIR, field_id)
+    return os.path.join(directory, f"{layer}.cube"), os.path.join(directory, f"{layer}.json")
+
+
+def _data_path(field_id: str, layer: str, index: dict) -> str:
+    """Data file an index points at (indexes written before generations use the default name)"""
+    default_path, _ = _paths(field_id, layer)
+    return os.path.join(os.path.dirname(default_path), index["file"]) if "file" in index else default_path
+
+
+def _read_index(field_id: str, layer: str) -> Optional[dict]:
+    """Load a cube's index ({dtype, shape, dates, file}) or None if absent"""
+    _, index_path = _paths(field_id, layer)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def _index_stamp(field_id: str, layer: str) -> Optional[Tuple[int, int]]:
+    """(inode, mtime) of a cube's index; every commit replaces the file, so both change"""
+    _, index_path = _paths(field_id, layer)
+    try:
+        stat = os.stat(index_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _write_index(field_id: str, layer: str, index: dict) -> None:
+    """Atomically replace a cube's index"""
+    _, index_path = _paths(field_id, layer)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+    _open_cubes.pop((field_id, layer), None)
+
+
+def _expected_bytes(index: dict) -> int:
+    return len(index["dates"]) * int(np.prod(index["shape"])) * np.dtype(index["dtype"]).itemsize
+
+
+@contextmanager
+def _file_lock(field_id: str, layer: str):
+    """Exclusive cube lock across worker processes (in-process only where fcntl is unavailable)"""
+    data_path, _ = _paths(field_id, layer)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    with open(f"{data_path}.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def cube_locks(field_id: str):
+    """Hold every layer's writer lock for a field, in this process and across workers"""
+    async with AsyncExitStack() as stack:
+        for layer in CUBE_LAYERS:
+            await stack.enter_async_context(_cube_locks.setdefault((field_id, layer), asyncio.Lock()))
+            await asyncio.to_thread(stack.enter_context, _file_lock(field_id, layer))
+        yield
+
+
+def _to_cube_dtype(grid: np.ndarray, layer: str) -> np.ndarray:
+    """Convert a grid to its layer's cube dtype"""
+    dtype = CUBE_LAYERS[layer]
+    if np.issubdtype(dtype, np.integer):
+        grid = np.clip(grid, 0, np.iinfo(dtype).max)
+    return np.ascontiguousarray(grid, dtype=dtype)
+
+
+def _write_generation(field_id: str, layer: str, index: dict, data: np.ndarray, old_path: Optional[str] = None) -> None:
+    """
+    Write a cube to a new data file, then switch the index to it
+
+    The index replace is the commit point, so a failure on the way leaves
+    the previous cube intact.
+    """
+    directory = os.path.dirname(_paths(field_id, layer)[0])
+    os.makedirs(directory, exist_ok=True)
+    data_path = os.path.join(directory, f"{layer}.{uuid.uuid4().hex[:8]}.cube")
+    tmp_path = f"{data_path}.tmp"
+    data.tofile(tmp_path)
+    os.replace(tmp_path, data_path)
+
+    _write_index(field_id, layer, {**index, "file": os.path.basename(data_path)})
+    if old_path and os.path.exists(old_path):
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass  # still mapped by a reader (Windows); the next rebuild clears it
+
+
+def _append_layer(field_id: str, layer: str, date: str, plane: np.ndarray) -> None:
+    index = _read_index(field_id, layer)
+    data_path = _data_path(field_id, layer, index) if index else None
+    fresh = {"dtype": plane.dtype.name, "shape": list(plane.shape), "dates": [date]}
+
+    if index is None or index["shape"] != list(plane.shape) or not os.path.exists(data_path):
+        if index is not None:
+            logger.warning(f"Restarting history cube for {field_id}/{layer}: grid shape changed or data missing")
+        _write_generation(field_id, layer, fresh, plane[np.newaxis], data_path)
+        return
+
+    dates = index["dates"]
+    position = bisect_left(dates, date)
+    expected = _expected_bytes(index)
+    size = os.path.getsize(data_path)
+    if size < expected:
+        logger.warning(f"History cube {field_id}/{layer} is shorter than its index; restarting it")
+        _write_generation(field_id, layer, fresh, plane[np.newaxis], data_path)
+        return
+    if size > expected:
+        # Leftover of an append whose index update never landed
+        os.truncate(data_path, expected)
+
+    if position < len(dates) and dates[position] == date:
+        cube = np.memmap(data_path, dtype=index["dtype"], mode="r+",
+                         shape=(len(dates), *index["shape"]))
+        cube[position] = plane
+        cube.flush()
+        del cube
+        _open_cubes.pop((field_id, layer), None)
+        return
+
+    if position == len(dates):
+        # Bytes past the indexed length are ignored by readers until the index lands
+        with open(data_path, "ab") as f:
+            f.write(plane.tobytes())
+        dates.append(date)
+        _write_index(field_id, layer, index)
+    else:
+        cube = np.fromfile(data_path, dtype=index["dtype"]).reshape(len(dates), *index["shape"])
+        cube = np.insert(cube, position, plane, axis=0)
+        dates.insert(position, date)
+        _write_generation(field_id, layer, index, cube, data_path)
+
+
+def _append_day(field_id: str, date: str, layers: Dict[str, np.ndarray]) -> None:
+    for layer in CUBE_LAYERS:
+        grid = layers.get(layer)
+        if grid is not None:
+            _append_layer(field_id, layer, date, _to_cube_dtype(grid, layer))
+
+
+async def append_day(field_id: str, date: str, layers: Dict[str, np.ndarray]) -> None:
+    """
+    Write one field-day into the cubes
+
+    Appending a newer date is a single sequential write; re-ingesting a date
+    overwrites its slice in place. Back-filling an older date rewrites the
+    cube into a new file, and a grid shape change starts a new cube. Writers
+    are serialized per field and layer; file I/O runs in a worker thread.
+
+    Args:
+        field_id: Field identifier
+        date: Date in YYYY-MM-DD format
+        layers: Mapping of layer name -> 2D grid
+    """
+    async with cube_locks(field_id):
+        await asyncio.to_thread(_append_day, field_id, date, layers)
+
+
+def open_cube(field_id: str, layer: str) -> Optional[Tuple[List[str], np.memmap]]:
+    """
+    Open a cube read-only
+
+    A cached memmap is reused only while the index on disk is unchanged, so
+    appends and rebuilds by other workers are picked up on the next read.
+
+    Returns:
+        (dates, memmap of shape (days, H, W)) or None if no consistent cube exists
+    """
+    stamp = _index_stamp(field_id, layer)
+    cached = _open_cubes.get((field_id, layer))
+    if cached and cached[0] == stamp:
+        _, index, cube = cached
+        return index["dates"], cube
+    _open_cubes.pop((field_id, layer), None)
+    if stamp is None:
+        return None
+
+    index = _read_index(field_id, layer)
+    if index is None or not index["dates"]:
+        return None
+    data_path = _data_path(field_id, layer, index)
+    if not os.path.exists(data_path):
+        return None
+    if os.path.getsize(data_path) < _expected_bytes(index):
+        logger.warning(f"History cube {field_id}/{layer} is shorter than its index; rebuild it")
+        return None
+
+    cube = np.memmap(data_path, dtype=index["dtype"], mode="r",
+                     shape=(len(index["dates"]), *index["shape"]))
+    _open_cubes[(field_id, layer)] = (stamp, index, cube)
+    return index["dates"], cube
+
+
+async def rebuild_cubes(field_id: str) -> Dict[str, int]:
+    """
+    Rebuild a field's cubes from MongoDB
+
+    Streams DailyData dates in order and reads each day's grids from
+    grid_chunks, falling back to the inline heatmaps of older documents.
+    Holds the field's cube locks throughout, so ingestion appends wait.
+
+    Returns:
+        Mapping of layer -> number of days written
+    """
+    collection = DailyData.get_motor_collection()
+    written = {layer: 0 for layer in CUBE_LAYERS}
+
+    async with cube_locks(field_id):
+        directory = os.path.dirname(_paths(field_id, next(iter(CUBE_LAYERS)))[0])
+        for name in os.listdir(directory):
+            if name.endswith((".cube", ".json", ".tmp")):
+                os.remove(os.path.join(directory, name))
+        for layer in CUBE_LAYERS:
+            _open_cubes.pop((field_id, layer), None)
+
+        cursor = collection.find(
+            {"field_id": field_id},
+            {"date": 1, "grid_storage": 1}
+        ).sort("date", 1)
+        async for doc in cursor:
+            date = doc["date"]
+            layers = {}
+            for layer in CUBE_LAYERS:
+                grid = await read_window(field_id, date, layer)
+                if grid is None and doc.get("grid_storage", "inline") == "inline":
+                    grid = await _inline_layer(collection, doc["_id"], layer)
+                if grid is not None:
+                    layers[layer] = grid
+                    written[layer] += 1
+
+            await asyncio.to_thread(_append_day, field_id, date, layers)
+
+    return written
+
+
+async def _inline_layer(collection, doc_id, layer: str) -> Optional[np.ndarray]:
+    """Read one layer from a pre-chunking DailyData document"""
+    projection = {"heatmaps.canopy_grid": 1} if layer == "canopy" else {"heatmaps.pest_density_by_crop": 1}
+    doc = await collection.find_one({"_id": doc_id}, projection)
+    heatmaps = (doc or {}).get("heatmaps", {})
+
+    if layer == "canopy":
+        grid = heatmaps.get("canopy_grid")
+        return np.array(grid, dtype=np.float32) if grid else None
+
+    by_crop = heatmaps.get("pest_density_by_crop", {})
+    if not by_crop:
+        return None
+    return np.sum([np.array(h) for h in by_crop.values()], axis=0)
+
+
+def read_history(
+    field_id: str,
+    layer: str,
+    x: int,
+    y: int,
+    radius: int = 0,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Optional[Tuple[List[str], np.ndarray]]:
+    """
+    Slice a cell's (or a small window's) time series out of a cube
+
+    Args:
+        field_id: Field identifier
+        layer: canopy or pest
+        x: Cell column
+        y: Cell row
+        radius: Window half-size in cells (0 for a single cell)
+        start_date: Inclusive start date
+        end_date: Inclusive end date
+
+    Returns:
+        (dates, view of shape (days, h, w)) or None if no cube exists
+
+    Raises:
+        IndexError: If the cell is outside the grid
+    """
+    opened = open_cube(field_id, layer)
+    if opened is None:
+        return None
+    dates, cube = opened
+
+    _, height, width = cube.shape
+    if not (0 <= x < width and 0 <= y < height):
+        raise IndexError(f"Cell ({x}, {y}) is outside the {width}x{height} grid")
+
+    d0 = bisect_left(dates, start_date) if start_date else 0
+    d1 = bisect_right(dates, end_date) if end_date else len(dates)
+
+    y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+    x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+    return dates[d0:d1], cube[d0:d1, y0:y1, x0:x1]
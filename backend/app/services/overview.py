@@ -0,0 +1,181 @@
+"""
+Overview Service
+Fleet-wide drone status and per-field KPI summaries, each from a single aggregation
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.drone import DroneStatus
+from app.models.field_state import FieldState
+
+
+FLEET_SORTS = {
+    "risk": {"risk_score": -1, "drone_id": 1},
+    "drone_id": {"drone_id": 1},
+    "battery": {"battery_level": 1, "drone_id": 1},
+    "service_due": {"service_due_days": 1, "drone_id": 1},
+}
+
+FIELD_SORTS = {
+    "risk": {"risk_score": -1, "field_id": 1},
+    "field_id": {"field_id": 1},
+    "pest_count": {"pest_count": -1, "field_id": 1},
+    "canopy": {"avg_canopy": 1, "field_id": 1},
+}
+
+
+def _paginate(sort: Dict[str, int], skip: int, limit: int) -> Dict[str, Any]:
+    """$facet stage returning one sorted page plus the total count"""
+    return {"$facet": {
+        "items": [{"$sort": sort}, {"$skip": skip}, {"$limit": limit}],
+        "total": [{"$count": "count"}],
+    }}
+
+
+def _unpack_page(result: List[Dict], skip: int, limit: int) -> Dict[str, Any]:
+    """Flatten the $facet output"""
+    page = result[0] if result else {"items": [], "total": []}
+    for item in page["items"]:
+        item.pop("_id", None)
+    return {
+        "items": page["items"],
+        "total": page["total"][0]["count"] if page["total"] else 0,
+        "skip": skip,
+        "limit": limit
+    }
+
+
+async def fleet_overview(
+    sort_by: str = "risk",
+    skip: int = 0,
+    limit: int = 50,
+    operational_status: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Status, last flight and service due for every drone in one pipeline
+
+    The last flight is joined per drone with a $lookup that walks the
+    (drone_id, date) index backwards and stops at one document.
+
+    Returns:
+        Dictionary with the page of drones and the total count
+    """
+    now = datetime.utcnow()
+    match = {"operational_status": operational_status} if operational_status else {}
+
+    pipeline = [
+        {"$match": match},
+        {"$lookup": {
+            "from": "flight_records",
+            "let": {"drone_id": "$drone_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$drone_id", "$$drone_id"]}}},
+                {"$sort": {"date": -1}},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "date": 1, "field_id": 1, "duration": 1, "status": 1}},
+            ],
+            "as": "last_flight",
+        }},
+        {"$addFields": {
+            "last_flight": {"$first": "$last_flight"},
+            "service_due_days": {"$cond": [
+                {"$ifNull": ["$next_service_due", False]},
+                {"$floor": {"$divide": [{"$subtract": ["$next_service_due", now]}, 86400000]}},
+                None,
+            ]},
+        }},
+        {"$addFields": {
+            "risk_score": {"$add": [
+                {"$cond": [{"$eq": ["$operational_status", "offline"]}, 3, 0]},
+                {"$switch": {"branches": [
+                    {"case": {"$eq": ["$health_status", "poor"]}, "then": 3},
+                    {"case": {"$eq": ["$health_status", "fair"]}, "then": 1},
+                ], "default": 0}},
+                {"$cond": [{"$lt": ["$battery_level", 30]}, 2, 0]},
+                {"$cond": [{"$lt": [{"$min": ["$motor_health", "$propeller_health"]}, 70]}, 2, 0]},
+                {"$switch": {"branches": [
+                    {"case": {"$eq": ["$service_due_days", None]}, "then": 0},
+                    {"case": {"$lt": ["$service_due_days", 0]}, "then": 3},
+                    {"case": {"$lte": ["$service_due_days", 7]}, "then": 1},
+                ], "default": 0}},
+            ]},
+        }},
+        {"$project": {
+            "drone_id": 1, "model": 1, "operational_status": 1, "health_status": 1,
+            "battery_level": 1, "motor_health": 1, "propeller_health": 1, "signal_strength": 1,
+            "total_flights": 1, "total_flight_minutes": 1, "auto_flight_enabled": 1,
+            "next_scheduled_flight": 1, "next_service_due": 1, "service_due_days": 1,
+            "last_flight": 1, "risk_score": 1,
+        }},
+        _paginate(FLEET_SORTS[sort_by], skip, limit),
+    ]
+
+    result = await DroneStatus.get_motor_collection().aggregate(pipeline).to_list(length=None)
+    page = _unpack_page(result, skip, limit)
+    for drone in page["items"]:
+        drone["total_flight_hours"] = round(drone.pop("total_flight_minutes", 0) / 60, 1)
+    return page
+
+
+async def fields_overview(
+    sort_by: str = "risk",
+    skip: int = 0,
+    limit: int = 50
+) -> Dict[str, Any]:
+    """
+    Latest KPI summary for every field in one pipeline
+
+    Reads the per-field state documents, which already hold the newest
+    day's aggregates and active alert counters, and joins field names.
+
+    Returns:
+        Dictionary with the page of fields and the total count
+    """
+    pipeline = [
+        {"$lookup": {
+            "from": "field_config",
+            "localField": "field_id",
+            "foreignField": "field_id",
+            "as": "config",
+        }},
+        {"$project": {
+            "_id": 0,
+            "field_id": 1,
+            "name": {"$first": "$config.name"},
+            "latest_date": 1,
+            "pest_count": "$latest_aggregates.pest_count",
+            "avg_canopy": "$latest_aggregates.avg_canopy",
+            "min_canopy": "$latest_aggregates.min_canopy",
+            "critical_zones": "$latest_aggregates.critical_zone_count",
+            "active_alerts": "$active_alerts.by_severity",
+            "critical_alerts": {"$ifNull": ["$active_alerts.by_severity.critical", 0]},
+            "warning_alerts": {"$ifNull": ["$active_alerts.by_severity.warning", 0]},
+            "data_version": 1,
+        }},
+        {"$addFields": {
+            "risk_score": {"$add": [
+                {"$multiply": ["$critical_alerts", 10]},
+                {"$multiply": ["$warning_alerts", 3]},
+                # null sorts below numbers, so only numeric canopy averages are compared
+                {"$switch": {"branches": [
+                    {"case": {"$and": [
+                        {"$isNumber": "$avg_canopy"},
+                        {"$lt": ["$avg_canopy", settings.CANOPY_CRITICAL_THRESHOLD]},
+                    ]}, "then": 5},
+                    {"case": {"$and": [
+                        {"$isNumber": "$avg_canopy"},
+                        {"$lt": ["$avg_canopy", settings.CANOPY_WARNING_THRESHOLD]},
+                    ]}, "then": 2},
+                ], "default": 0}},
+            ]},
+            "status": {"$switch": {"branches": [
+                {"case": {"$gt": ["$critical_alerts", 0]}, "then": "critical"},
+                {"case": {"$gt": ["$warning_alerts", 0]}, "then": "warning"},
+            ], "default": "healthy"}},
+        }},
+        _paginate(FIELD_SORTS[sort_by], skip, limit),
+    ]
+
+    result = await FieldState.get_motor_collection().aggregate(pipeline).to_list(length=None)
+    return _unpack_page(result, skip, limit)
@@ -0,0 +1,132 @@
+"""
+Telemetry Service
+Batched time-series ingestion and server-side downsampling of drone telemetry
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.models.telemetry import TelemetryPoint
+from app.utils.dates import naive_utc
+
+
+# Window returned when no range is requested: the last half hour of samples
+DEFAULT_WINDOW = timedelta(minutes=30)
+
+# Series returned per time bucket, and how each is reduced within a bucket
+SERIES = {
+    "latitude": "$last",
+    "longitude": "$last",
+    "altitude_m": "$avg",
+    "speed_mps": "$avg",
+    "battery_level": "$min",
+    "signal_strength": "$min",
+}
+
+
+async def ingest_telemetry(samples: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert a batch of samples with one unordered insert_many
+
+    Unordered inserts let MongoDB write the batch in parallel and keep going
+    past individual failures, which are counted rather than raised.
+
+    Args:
+        samples: Validated sample dictionaries (drone_id, timestamp, ...)
+
+    Returns:
+        Dictionary with inserted and failed counts
+    """
+    if not samples:
+        return {"inserted": 0, "failed": 0}
+
+    collection = TelemetryPoint.get_motor_collection()
+    try:
+        result = await collection.insert_many(samples, ordered=False)
+        return {"inserted": len(result.inserted_ids), "failed": 0}
+    except BulkWriteError as e:
+        inserted = e.details.get("nInserted", 0)
+        return {"inserted": inserted, "failed": len(samples) - inserted}
+
+
+async def latest_sample_time(drone_id: str) -> Optional[datetime]:
+    """Timestamp of a drone's most recent sample, or None"""
+    collection = TelemetryPoint.get_motor_collection()
+    doc = await collection.find_one(
+        {"drone_id": drone_id},
+        {"timestamp": 1},
+        sort=[("timestamp", -1)]
+    )
+    return doc["timestamp"] if doc else None
+
+
+async def get_downsampled_telemetry(
+    drone_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Downsample a drone's telemetry into at most max_points time buckets
+
+    Bucketing happens in the aggregation pipeline, so only the reduced
+    series leave the database regardless of the sample rate.
+
+    Args:
+        drone_id: Drone identifier
+        start: Inclusive window start (defaults to 30 minutes before end);
+            offset-aware values are converted to UTC
+        end: Inclusive window end (defaults to the latest sample)
+        max_points: Maximum buckets to return
+
+    Returns:
+        Dictionary with the window, bucket size and columnar series
+    """
+    max_points = max_points or settings.TELEMETRY_MAX_POINTS
+    start, end = naive_utc(start), naive_utc(end)
+    if end is None:
+        end = await latest_sample_time(drone_id)
+        if end is None:
+            return {"drone_id": drone_id, "start": start, "end": None, "bucket_seconds": 0,
+                    "samples": 0, "timestamps": [], "series": {name: [] for name in SERIES}}
+    if start is None:
+        start = end - DEFAULT_WINDOW
+
+    # MongoDB stores milliseconds; buckets are aligned to start, and a sample
+    # exactly at end is folded into the last bucket, so there are at most max_points
+    start = start.replace(microsecond=start.microsecond // 1000 * 1000)
+    span_ms = max(int((end - start).total_seconds() * 1000), 1)
+    bucket_ms = max(1000, math.ceil(span_ms / max_points))
+    last_bucket_ms = (math.ceil(span_ms / bucket_ms) - 1) * bucket_ms
+
+    # Date minus date is milliseconds in the aggregation language
+    offset_ms = {"$subtract": ["$timestamp", start]}
+    pipeline = [
+        {"$match": {"drone_id": drone_id, "timestamp": {"$gte": start, "$lte": end}}},
+        {"$sort": {"timestamp": 1}},
+        {"$group": {
+            "_id": {"$min": [{"$subtract": [offset_ms, {"$mod": [offset_ms, bucket_ms]}]}, last_bucket_ms]},
+            "samples": {"$sum": 1},
+            **{name: {op: f"${name}"} for name, op in SERIES.items()},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    buckets = await TelemetryPoint.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+    def rounded(value, digits):
+        return round(value, digits) if value is not None else None
+
+    return {
+        "drone_id": drone_id,
+        "start": start,
+        "end": end,
+        "bucket_seconds": bucket_ms / 1000,
+        "samples": sum(bucket["samples"] for bucket in buckets),
+        "timestamps": [start + timedelta(milliseconds=bucket["_id"]) for bucket in buckets],
+        "series": {
+            name: [rounded(bucket.get(name), 6 if name in ("latitude", "longitude") else 2) for bucket in buckets]
+            for name in SERIES
+        }
+    }
@@ -0,0 +1,104 @@
+"""
+Alert Text Templates
+Message and recommendation templates per alert type, rendered from alert metrics
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_LOCALE = "en"
+
+# template id -> (message, recommendation); placeholders are filled from
+# the alert's zone_id and metrics, plus `crop` (the capitalized crop type)
+ALERT_TEMPLATES: Dict[str, Dict[str, Tuple[str, str]]] = {
+    "en": {
+        "combined_risk": (
+            "⚠️ URGENT: {crop} crop under dual stress in {zone_id}",
+            "🎯 Immediate Action Required:\n1. Apply targeted pesticide for {crop} pests ({pest_count} detected)\n2. Increase irrigation immediately - canopy at {canopy_cover:.1f}%\n3. Monitor daily for next 3-5 days\n4. Consider soil nutrient analysis",
+        ),
+        "pest_outbreak": (
+            "🐛 Pest Outbreak: {crop} zone {zone_id} needs attention",
+            "🎯 Pest Control Action:\n1. Apply {crop}-specific pesticide to {zone_id}\n2. Inspect neighboring zones for spread\n3. Document pest species if possible\n4. Re-scan in 48 hours to verify treatment effectiveness",
+        ),
+        "canopy_stress": (
+            "🌱 Canopy Stress: {crop} health declining in {zone_id}",
+            "🎯 Irrigation & Nutrition Action:\n1. Check irrigation coverage in {zone_id} (current: {canopy_cover:.1f}%)\n2. Verify soil moisture levels\n3. Consider nitrogen/nutrient supplementation\n4. Inspect for disease or root issues",
+        ),
+        "pest_warning": (
+            "👀 Monitor: {crop} pest activity increasing in {zone_id}",
+            "🎯 Monitoring Recommendation:\n1. Inspect {zone_id} for {crop} pests ({pest_count} detected)\n2. Prepare pesticide equipment if count increases\n3. Check this zone again in 2-3 days\n4. Document pest species and behavior",
+        ),
+        "irrigation_needed": (
+            "💧 Irrigation Alert: Low canopy in {zone_id} ({canopy_cover:.1f}%)",
+            "🎯 Irrigation Action:\n1. Increase water delivery to {zone_id}\n2. Current canopy: {canopy_cover:.1f}% (target: >70%)\n3. Check for irrigation system blockages\n4. Monitor soil moisture daily",
+        ),
+        "crop_outbreak": (
+            "🌾 {crop} Alert: Field-wide pest concentration detected",
+            "🎯 Field-Wide Strategy:\n1. {crop} crops are primary pest target ({pest_count} of {total_pests} total)\n2. Consider field-wide {crop}-specific treatment\n3. Review {crop} planting strategy for next season\n4. Monitor all {crop} zones closely",
+        ),
+        "canopy_anomaly": (
+            "📉 Sudden Canopy Drop in {zone_id}: {value:.1f}% vs usual {baseline:.1f}%",
+            "🎯 Investigation Recommended:\n1. Inspect {zone_id} for hail, lodging or irrigation failure\n2. Compare with neighboring zones\n3. Check for disease onset\n4. Re-scan tomorrow to confirm the drop",
+        ),
+        "pest_anomaly": (
+            "📈 Unusual Pest Spike in {zone_id}: {value:.0f} vs usual {baseline:.1f}",
+            "🎯 Early Warning Action:\n1. Scout {zone_id} for new pest arrivals\n2. Check neighboring zones for spread\n3. Prepare targeted treatment if confirmed\n4. Re-scan in 24-48 hours",
+        ),
+    },
+}
+
+
+def template_context(zone_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Placeholder values for an alert's zone and metrics"""
+    return {**params, "zone_id": zone_id, "crop": str(params.get("crop_type", "unknown")).capitalize()}
+
+
+@lru_cache(maxsize=256)
+def get_template(template_id: str, locale: str = DEFAULT_LOCALE) -> Optional[Tuple[str, str]]:
+    """Templates for an id in a locale, falling back to the default locale"""
+    templates = ALERT_TEMPLATES.get(locale, {}).get(template_id)
+    if templates is None and locale != DEFAULT_LOCALE:
+        templates = ALERT_TEMPLATES[DEFAULT_LOCALE].get(template_id)
+    return templates
+
+
+def render_alert_text(
+    template_id: str,
+    zone_id: str,
+    params: Dict[str, Any],
+    locale: str = DEFAULT_LOCALE
+) -> Optional[Tuple[str, str]]:
+    """
+    Render an alert's message and recommendation
+
+    Returns:
+        (message, recommendation), or None if the template is unknown or
+        the parameters do not fill it
+    """
+    templates = get_template(template_id, locale)
+    if templates is None:
+        return None
+
+    context = template_context(zone_id, params)
+    try:
+        return templates[0].format(**context), templates[1].format(**context)
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+def compact_alert_text(
+    alert_type: str,
+    zone_id: str,
+    params: Dict[str, Any],
+    message: str,
+    recommendation: str
+) -> Optional[str]:
+    """
+    Template id that reproduces stored alert text exactly
+
+    Returns:
+        The template id, or None if the text must be kept as-is
+    """
+    if render_alert_text(alert_type, zone_id, params) == (message, recommendation):
+        return alert_type
+    return None
@@ -0,0 +1,109 @@
+"""
+Anomaly Detection Utilities
+Per-cell EWMA baselines and z-scores, vectorized over the whole grid
+"""
+import numpy as np
+from typing import Dict, List, Tuple
+
+from app.core.tracing import traced
+
+
+@traced
+def ewma_zscore(
+    values: np.ndarray,
+    mean: np.ndarray,
+    var: np.ndarray,
+    min_std: float = 1.0
+) -> np.ndarray:
+    """
+    Score each cell against its EWMA baseline
+
+    Args:
+        values: Today's grid
+        mean: Per-cell EWMA mean
+        var: Per-cell EWMA variance
+        min_std: Floor on the baseline std so flat cells do not explode
+
+    Returns:
+        Per-cell z-scores
+    """
+    std = np.maximum(np.sqrt(np.maximum(var, 0)), min_std)
+    return (values - mean) / std
+
+
+@traced
+def ewma_update(
+    mean: np.ndarray,
+    var: np.ndarray,
+    values: np.ndarray,
+    alpha: float = 0.2
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fold one observation into EWMA mean and variance
+
+    Returns:
+        (new_mean, new_var)
+    """
+    diff = values - mean
+    new_mean = mean + alpha * diff
+    new_var = (1 - alpha) * (var + alpha * diff * diff)
+    return new_mean, new_var
+
+
+@traced
+def ewma_revert(
+    mean: np.ndarray,
+    var: np.ndarray,
+    values: np.ndarray,
+    alpha: float = 0.2
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exactly undo the most recent ewma_update made with the same values
+
+    Returns:
+        (previous_mean, previous_var)
+    """
+    prev_mean = (mean - alpha * values) / (1 - alpha)
+    diff = values - prev_mean
+    prev_var = np.maximum(var / (1 - alpha) - alpha * diff * diff, 0)
+    return prev_mean, prev_var
+
+
+@traced
+def top_anomalies(
+    zscores: np.ndarray,
+    mask: np.ndarray,
+    values: np.ndarray,
+    baseline: np.ndarray,
+    limit: int = 10
+) -> List[Dict]:
+    """
+    List the strongest anomalous cells
+
+    Args:
+        zscores: Per-cell z-scores
+        mask: Boolean anomaly mask
+        values: Today's grid
+        baseline: Per-cell baseline mean
+        limit: Maximum number of cells to return
+
+    Returns:
+        Cells sorted by |z| descending
+    """
+    ys, xs = np.nonzero(mask)
+    if ys.size == 0:
+        return []
+
+    strength = np.abs(zscores[ys, xs])
+    order = np.argsort(-strength)[:limit]
+
+    return [
+        {
+            "zone_id": f"grid_{int(xs[i])}_{int(ys[i])}",
+            "position": {"x": int(xs[i]), "y": int(ys[i])},
+            "z_score": round(float(zscores[ys[i], xs[i]]), 2),
+            "value": round(float(values[ys[i], xs[i]]), 2),
+            "baseline": round(float(baseline[ys[i], xs[i]]), 2)
+        }
+        for i in order
+    ]
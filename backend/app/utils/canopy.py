@@ -5,7 +5,10 @@ Process canopy cover 2D arrays and calculate statistics
 import numpy as np
 from typing import List, Dict, Tuple
 
+from app.core.tracing import traced
 
+
+@traced
 def calculate_canopy_statistics(
     canopy_grid: List[List[float]]
 ) -> dict:
@@ -35,6 +38,7 @@ def calculate_canopy_statistics(
     }
 
 
+@traced
 def find_low_coverage_zones(
     canopy_grid: np.ndarray,
     warning_threshold: float = 60.0,
@@ -78,6 +82,7 @@ def find_low_coverage_zones(
     return low_zones
 
 
+@traced
 def calculate_coverage_distribution(
     canopy_grid: np.ndarray
 ) -> dict:
@@ -114,6 +119,7 @@ def calculate_coverage_distribution(
     return distribution
 
 
+@traced
 def identify_coverage_trends(
     historical_grids: List[np.ndarray]
 ) -> dict:
@@ -156,6 +162,7 @@ def identify_coverage_trends(
     }
 
 
+@traced
 def generate_canopy_heatmap_colors(
     canopy_grid: np.ndarray
 ) -> List[List[str]]:
@@ -194,6 +201,7 @@ def generate_canopy_heatmap_colors(
     return colors
 
 
+@traced
 def calculate_field_health_score(
     canopy_grid: np.ndarray,
     pest_heatmap: np.ndarray = None
@@ -243,6 +251,7 @@ def calculate_field_health_score(
     }
 
 
+@traced
 def compare_zones(
     canopy_grid: np.ndarray,
     zone1_coords: Tuple[int, int],
@@ -0,0 +1,106 @@
+"""
+Per-Cell Running Statistics Utilities
+Welford accumulators for per-cell mean, variance and trend slope across days
+"""
+import numpy as np
+from typing import Dict, Tuple
+
+from app.core.tracing import traced
+
+
+@traced
+def init_accumulator(shape: Tuple[int, ...]) -> Dict:
+    """
+    Create an empty accumulator for a grid
+
+    The day index t is shared by every cell, so its count, mean and M2 are
+    scalars; the value mean, M2 and the t/value co-moment are per-cell arrays.
+
+    Args:
+        shape: Grid (or chunk) shape
+
+    Returns:
+        Accumulator dictionary
+    """
+    return {
+        "count": 0,
+        "mean_t": 0.0,
+        "m2_t": 0.0,
+        "mean": np.zeros(shape, dtype=np.float64),
+        "m2": np.zeros(shape, dtype=np.float64),
+        "c_ty": np.zeros(shape, dtype=np.float64),
+    }
+
+
+@traced
+def add_observation(acc: Dict, values: np.ndarray, t: float) -> Dict:
+    """
+    Fold one day's grid into the accumulator (in place)
+
+    Args:
+        acc: Accumulator from init_accumulator
+        values: Grid of observed values, same shape as the accumulator
+        t: Day index of the observation
+
+    Returns:
+        The updated accumulator
+    """
+    values = values.astype(np.float64, copy=False)
+    acc["count"] += 1
+    n = acc["count"]
+
+    dt = t - acc["mean_t"]
+    dy = values - acc["mean"]
+    acc["mean_t"] += dt / n
+    acc["mean"] += dy / n
+
+    acc["m2_t"] += dt * (t - acc["mean_t"])
+    acc["m2"] += dy * (values - acc["mean"])
+    acc["c_ty"] += dt * (values - acc["mean"])
+    return acc
+
+
+@traced
+def remove_observation(acc: Dict, values: np.ndarray, t: float) -> Dict:
+    """
+    Undo a previous add_observation for the same values and day (in place)
+
+    Used when a day is re-ingested so it is not counted twice.
+    """
+    n = acc["count"]
+    if n <= 1:
+        fresh = init_accumulator(acc["mean"].shape)
+        acc.update(fresh)
+        return acc
+
+    values = values.astype(np.float64, copy=False)
+    mean_t_prev = (n * acc["mean_t"] - t) / (n - 1)
+    mean_prev = (n * acc["mean"] - values) / (n - 1)
+
+    acc["m2_t"] -= (t - mean_t_prev) * (t - acc["mean_t"])
+    acc["m2"] -= (values - mean_prev) * (values - acc["mean"])
+    acc["c_ty"] -= (t - mean_t_prev) * (values - acc["mean"])
+
+    acc["mean_t"] = mean_t_prev
+    acc["mean"] = mean_prev
+    acc["count"] = n - 1
+    return acc
+
+
+@traced
+def finalize_accumulator(acc: Dict) -> Dict[str, np.ndarray]:
+    """
+    Derive per-cell statistics from an accumulator
+
+    Returns:
+        Dictionary with mean, std (sample) and slope (value change per day)
+    """
+    n = acc["count"]
+    std = np.sqrt(np.maximum(acc["m2"], 0) / (n - 1)) if n > 1 else np.zeros_like(acc["mean"])
+    slope = acc["c_ty"] / acc["m2_t"] if acc["m2_t"] > 0 else np.zeros_like(acc["mean"])
+
+    return {
+        "mean": acc["mean"],
+        "std": std,
+        "slope": slope,
+    }
@@ -0,0 +1,67 @@
+"""
+Grid Change Utilities
+Vectorized per-cell differences between two field-days
+"""
+import numpy as np
+from typing import Dict
+
+from app.core.tracing import traced
+
+
+@traced
+def compute_grid_changes(
+    previous: Dict[str, np.ndarray],
+    current: Dict[str, np.ndarray],
+    hotspot_threshold: float = 5.0
+) -> Dict[str, np.ndarray]:
+    """
+    Compute per-cell change grids between two days
+
+    Args:
+        previous: Earlier day's layers ("canopy", "pest")
+        current: Later day's layers ("canopy", "pest")
+        hotspot_threshold: Pest count at which a cell counts as a hotspot
+
+    Returns:
+        Dictionary with canopy_delta, pest_delta, new_hotspots and resolved_hotspots
+    """
+    prev_pest = previous["pest"].astype(np.int32)
+    cur_pest = current["pest"].astype(np.int32)
+    prev_hot = prev_pest >= hotspot_threshold
+    cur_hot = cur_pest >= hotspot_threshold
+
+    return {
+        "canopy_delta": current["canopy"].astype(np.float32) - previous["canopy"].astype(np.float32),
+        "pest_delta": cur_pest - prev_pest,
+        "new_hotspots": cur_hot & ~prev_hot,
+        "resolved_hotspots": prev_hot & ~cur_hot,
+    }
+
+
+@traced
+def summarize_grid_changes(
+    changes: Dict[str, np.ndarray],
+    canopy_drop_threshold: float = 10.0
+) -> dict:
+    """
+    Summarize change grids into scalar KPIs
+
+    Args:
+        changes: Output of compute_grid_changes
+        canopy_drop_threshold: Canopy loss (percentage points) counted as a significant drop
+
+    Returns:
+        Dictionary of summary statistics
+    """
+    canopy_delta = changes["canopy_delta"]
+    pest_delta = changes["pest_delta"]
+
+    return {
+        "avg_canopy_change": round(float(canopy_delta.mean()), 2) if canopy_delta.size else 0.0,
+        "cells_canopy_dropped": int((canopy_delta <= -canopy_drop_threshold).sum()),
+        "total_pest_change": int(pest_delta.sum()),
+        "cells_pest_increased": int((pest_delta > 0).sum()),
+        "cells_pest_decreased": int((pest_delta < 0).sum()),
+        "new_hotspots": int(changes["new_hotspots"].sum()),
+        "resolved_hotspots": int(changes["resolved_hotspots"].sum()),
+    }
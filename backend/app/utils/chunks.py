@@ -0,0 +1,115 @@
+"""
+Grid Chunking Utilities
+Split field grids into fixed-size tiles and stitch windows back together
+"""
+import numpy as np
+from typing import Dict, Iterator, Tuple
+
+from app.core.tracing import traced
+
+
+BBox = Tuple[int, int, int, int]
+
+
+@traced
+def split_into_chunks(
+    grid: np.ndarray,
+    chunk_size: int = 256
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Split a 2D grid into fixed-size chunks
+
+    Edge chunks are smaller when the grid is not a multiple of chunk_size.
+
+    Args:
+        grid: 2D array (height x width)
+        chunk_size: Chunk edge length in cells
+
+    Yields:
+        (chunk_row, chunk_col, block) tuples
+    """
+    height, width = grid.shape
+    for chunk_row, y0 in enumerate(range(0, height, chunk_size)):
+        for chunk_col, x0 in enumerate(range(0, width, chunk_size)):
+            yield chunk_row, chunk_col, grid[y0:y0 + chunk_size, x0:x0 + chunk_size]
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """
+    Parse a "x0,y0,x1,y1" bounding box string (cell indices, end-exclusive)
+
+    Raises:
+        ValueError: If the string is malformed or the box is empty
+    """
+    parts = [p.strip() for p in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must have four comma-separated integers: x0,y0,x1,y1")
+
+    x0, y0, x1, y1 = (int(p) for p in parts)
+    if x0 < 0 or y0 < 0 or x1 <= x0 or y1 <= y0:
+        raise ValueError("bbox must satisfy 0 <= x0 < x1 and 0 <= y0 < y1")
+    return x0, y0, x1, y1
+
+
+def clip_bbox(bbox: BBox, shape: Tuple[int, int]) -> BBox:
+    """Clip a bounding box to the grid shape (height, width)"""
+    height, width = shape
+    x0, y0, x1, y1 = bbox
+    return min(x0, width), min(y0, height), min(x1, width), min(y1, height)
+
+
+def chunk_range(
+    bbox: BBox,
+    chunk_size: int = 256
+) -> Tuple[range, range]:
+    """
+    Chunk rows and columns overlapping a bounding box
+
+    Returns:
+        (chunk_rows, chunk_cols) ranges
+    """
+    x0, y0, x1, y1 = bbox
+    rows = range(y0 // chunk_size, (y1 - 1) // chunk_size + 1)
+    cols = range(x0 // chunk_size, (x1 - 1) // chunk_size + 1)
+    return rows, cols
+
+
+@traced
+def stitch_chunks(
+    chunks: Dict[Tuple[int, int], np.ndarray],
+    bbox: BBox,
+    chunk_size: int = 256,
+    dtype: str = "float32",
+    fill_value: float = 0
+) -> np.ndarray:
+    """
+    Assemble the window covered by bbox from its overlapping chunks
+
+    Args:
+        chunks: Mapping of (chunk_row, chunk_col) -> block
+        bbox: Window (x0, y0, x1, y1), already clipped to the grid
+        chunk_size: Chunk edge length used when splitting
+        dtype: Output dtype
+        fill_value: Value for cells whose chunk is missing
+
+    Returns:
+        2D array of shape (y1 - y0, x1 - x0)
+    """
+    x0, y0, x1, y1 = bbox
+    window = np.full((y1 - y0, x1 - x0), fill_value, dtype=dtype)
+
+    for (chunk_row, chunk_col), block in chunks.items():
+        cy0 = chunk_row * chunk_size
+        cx0 = chunk_col * chunk_size
+        cy1 = cy0 + block.shape[0]
+        cx1 = cx0 + block.shape[1]
+
+        # Intersection of the chunk with the requested window
+        iy0, iy1 = max(y0, cy0), min(y1, cy1)
+        ix0, ix1 = max(x0, cx0), min(x1, cx1)
+        if iy0 >= iy1 or ix0 >= ix1:
+            continue
+
+        window[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0] = block[iy0 - cy0:iy1 - cy0, ix0 - cx0:ix1 - cx0]
+
+    return window
@@ -0,0 +1,28 @@
+"""
+Date Utilities
+Trend windows and UTC normalisation shared across endpoints and services
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+
+def trend_window(days: int) -> List[str]:
+    """
+    The last `days` dates up to and including today (UTC), oldest first
+
+    The first and last entries are the window's start_date / end_date labels,
+    so every endpoint reports exactly the days it queried.
+    """
+    today = datetime.utcnow().date()
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert an offset-aware datetime to naive UTC, the form stored in MongoDB
+
+    Naive values are assumed to be UTC already and returned unchanged.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
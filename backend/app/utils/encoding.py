@@ -0,0 +1,94 @@
+"""
+Grid Encoding Utilities
+Compact binary packing of NumPy grids for storage and API responses
+"""
+import base64
+import numpy as np
+from typing import Any, Dict, Sequence, Union
+
+from app.core.tracing import traced
+
+
+GRID_ENCODINGS = ("json", "binary")
+
+
+@traced
+def pack_array(array: np.ndarray) -> bytes:
+    """
+    Pack a NumPy array into raw little-endian bytes
+
+    Args:
+        array: Array to pack
+
+    Returns:
+        Contiguous byte buffer (shape and dtype are stored separately)
+    """
+    array = np.ascontiguousarray(array)
+    return array.astype(array.dtype.newbyteorder("<"), copy=False).tobytes()
+
+
+@traced
+def unpack_array(
+    data: bytes,
+    dtype: str,
+    shape: Sequence[int]
+) -> np.ndarray:
+    """
+    Rebuild a NumPy array from bytes produced by pack_array
+
+    Args:
+        data: Raw byte buffer
+        dtype: NumPy dtype name (e.g. "float32")
+        shape: Array shape
+
+    Returns:
+        Read-only array view over the buffer
+    """
+    little_endian = np.dtype(dtype).newbyteorder("<")
+    return np.frombuffer(data, dtype=little_endian).reshape(tuple(shape))
+
+
+def smallest_uint_dtype(array: np.ndarray) -> str:
+    """
+    Pick the narrowest unsigned integer dtype able to hold an array of counts
+
+    Args:
+        array: Non-negative integer-valued array
+
+    Returns:
+        dtype name ("uint8", "uint16" or "uint32")
+    """
+    max_value = int(array.max()) if array.size else 0
+    for dtype in ("uint8", "uint16"):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return "uint32"
+
+
+@traced
+def encode_grid(
+    array: np.ndarray,
+    encoding: str = "json",
+    decimals: int = 2
+) -> Union[Dict[str, Any], list]:
+    """
+    Encode a grid for an API response
+
+    Args:
+        array: 2D grid to encode
+        encoding: "json" for nested lists, "binary" for base64 packed bytes
+        decimals: Rounding applied to float grids in JSON mode
+
+    Returns:
+        Nested list (json) or {"dtype", "shape", "data"} envelope (binary)
+    """
+    if encoding == "binary":
+        return {
+            "dtype": array.dtype.name,
+            "shape": list(array.shape),
+            "data": base64.b64encode(pack_array(array)).decode("ascii")
+        }
+
+    if np.issubdtype(array.dtype, np.floating):
+        return np.round(array.astype(np.float64), decimals).tolist()
+    return array.tolist()
@@ -3,9 +3,13 @@ Heatmap Generation Utilities
 Converts bounding boxes to pest density heatmap grids
 """
 import numpy as np
+from scipy.ndimage import gaussian_filter, uniform_filter
 from typing import List, Tuple
 
+from app.core.tracing import traced
 
+
+@traced
 def bounding_boxes_to_heatmap(
     bounding_boxes: List[List[float]],
     field_width: float,
@@ -70,6 +74,7 @@ def bounding_boxes_to_heatmap(
     return heatmap.tolist()
 
 
+@traced
 def calculate_pest_density(
     heatmap: np.ndarray,
     grid_size: float = 1.0
@@ -88,6 +93,7 @@ def calculate_pest_density(
     return heatmap / cell_area
 
 
+@traced
 def find_hotspots(
     heatmap: np.ndarray,
     threshold: float = 5.0,
@@ -125,6 +131,7 @@ def find_hotspots(
     return hotspots
 
 
+@traced
 def normalize_heatmap(
     heatmap: np.ndarray,
     max_value: float = None
@@ -148,6 +155,7 @@ def normalize_heatmap(
     return heatmap / max_value
 
 
+@traced
 def smooth_heatmap(
     heatmap: np.ndarray,
     kernel_size: int = 3
@@ -162,12 +170,11 @@ def smooth_heatmap(
     Returns:
         Smoothed 2D array
     """
-    from scipy.ndimage import gaussian_filter
-    
     sigma = kernel_size / 6.0
     return gaussian_filter(heatmap, sigma=sigma)
 
 
+@traced
 def get_zone_metrics(
     pest_heatmap: np.ndarray,
     canopy_grid: np.ndarray,
@@ -214,6 +221,7 @@ def get_zone_metrics(
     }
 
 
+@traced
 def calculate_correlation(
     pest_heatmap: np.ndarray,
     canopy_grid: np.ndarray
@@ -232,24 +240,22 @@ def calculate_correlation(
     pest_flat = pest_heatmap.flatten()
     canopy_flat = canopy_grid.flatten()
     
-    # Calculate correlation coefficient
-    correlation = np.corrcoef(pest_flat, canopy_flat)[0, 1]
+    # Calculate correlation coefficient (undefined when either grid is constant)
+    if pest_flat.std() == 0 or canopy_flat.std() == 0:
+        correlation = 0.0
+    else:
+        correlation = np.corrcoef(pest_flat, canopy_flat)[0, 1]
     
     # Find zones with high pest & low canopy (critical)
-    critical_zones = []
-    height, width = pest_heatmap.shape
-    
-    for y in range(height):
-        for x in range(width):
-            pest_density = pest_heatmap[y, x]
-            canopy = canopy_grid[y, x]
-            
-            if pest_density > 10 and canopy < 50:
-                critical_zones.append({
-                    "zone_id": f"grid_{x}_{y}",
-                    "pest_density": float(pest_density),
-                    "canopy_cover": float(canopy)
-                })
+    ys, xs = np.nonzero((pest_heatmap > 10) & (canopy_grid < 50))
+    critical_zones = [
+        {
+            "zone_id": f"grid_{x}_{y}",
+            "pest_density": float(pest_heatmap[y, x]),
+            "canopy_cover": float(canopy_grid[y, x])
+        }
+        for y, x in zip(ys.tolist(), xs.tolist())
+    ]
     
     return {
         "correlation_coefficient": round(float(correlation), 3),
@@ -257,3 +263,85 @@ def calculate_correlation(
         "critical_zones_count": len(critical_zones),
         "critical_zones": critical_zones[:10]  # Top 10
     }
+
+
+@traced
+def local_correlation(
+    pest_heatmap: np.ndarray,
+    canopy_grid: np.ndarray,
+    window: int = 5
+) -> np.ndarray:
+    """
+    Calculate moving-window Pearson correlation between pest counts and canopy
+    
+    Uses box filters on the values, their squares and their product, so the
+    cost is O(cells) regardless of window size.
+    
+    Args:
+        pest_heatmap: Pest count grid
+        canopy_grid: Canopy coverage grid
+        window: Window edge length in cells
+    
+    Returns:
+        2D array of local correlation coefficients in [-1, 1]
+        (0 where either variable is locally constant)
+    """
+    x = pest_heatmap.astype(np.float64)
+    y = canopy_grid.astype(np.float64)
+    
+    mean_x = uniform_filter(x, size=window, mode="nearest")
+    mean_y = uniform_filter(y, size=window, mode="nearest")
+    cov = uniform_filter(x * y, size=window, mode="nearest") - mean_x * mean_y
+    var_x = uniform_filter(x * x, size=window, mode="nearest") - mean_x ** 2
+    var_y = uniform_filter(y * y, size=window, mode="nearest") - mean_y ** 2
+    
+    denom = np.sqrt(np.maximum(var_x, 0) * np.maximum(var_y, 0))
+    valid = denom > 1e-9
+    
+    correlation = np.zeros_like(cov)
+    correlation[valid] = cov[valid] / denom[valid]
+    return np.clip(correlation, -1.0, 1.0)
+
+
+@traced
+def find_suppression_zones(
+    local_corr: np.ndarray,
+    pest_heatmap: np.ndarray,
+    canopy_grid: np.ndarray,
+    corr_threshold: float = -0.5,
+    limit: int = 10
+) -> List[dict]:
+    """
+    Find cells where pests appear to be suppressing canopy
+    
+    A cell qualifies when its local correlation is strongly negative and it
+    has pests; cells are ranked by correlation strength weighted by pest count.
+    
+    Args:
+        local_corr: Output of local_correlation
+        pest_heatmap: Pest count grid
+        canopy_grid: Canopy coverage grid
+        corr_threshold: Maximum (most negative) correlation to qualify
+        limit: Maximum number of zones to return
+    
+    Returns:
+        List of zone dictionaries, strongest first
+    """
+    mask = (local_corr <= corr_threshold) & (pest_heatmap > 0)
+    ys, xs = np.nonzero(mask)
+    if ys.size == 0:
+        return []
+    
+    score = -local_corr[ys, xs] * pest_heatmap[ys, xs]
+    order = np.argsort(-score)[:limit]
+    
+    return [
+        {
+            "zone_id": f"grid_{int(xs[i])}_{int(ys[i])}",
+            "position": {"x": int(xs[i]), "y": int(ys[i])},
+            "local_correlation": round(float(local_corr[ys[i], xs[i]]), 3),
+            "pest_count": float(pest_heatmap[ys[i], xs[i]]),
+            "canopy_cover": round(float(canopy_grid[ys[i], xs[i]]), 2)
+        }
+        for i in order
+    ]
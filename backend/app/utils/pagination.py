@@ -0,0 +1,72 @@
+"""
+Pagination Utilities
+Opaque keyset cursors over a (sort value, _id) pair
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Tuple, Union
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+SortValue = Union[datetime, str, int, float]
+
+
+def encode_cursor(value: SortValue, doc_id: ObjectId) -> str:
+    """
+    Encode the sort key of the last item on a page
+
+    Args:
+        value: Value of the sort field for the last item
+        doc_id: _id of the last item (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        payload = {"t": "datetime", "v": value.isoformat()}
+    else:
+        payload = {"t": "value", "v": value}
+    payload["id"] = str(doc_id)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[SortValue, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        (sort value, _id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        if payload["t"] == "datetime":
+            value = datetime.fromisoformat(value)
+        return value, ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def keyset_filter(field: str, cursor: str, descending: bool = True) -> Dict[str, Any]:
+    """
+    Build the query clause selecting items after a cursor
+
+    Matches the sort order ({field: -1, _id: -1} when descending), so the
+    clause and the sort can be served by one compound index ending in _id.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    value, doc_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {op: doc_id}},
+    ]}
@@ -0,0 +1,119 @@
+"""
+Query Plan Utilities
+Query shape normalization, explain() plan summaries and index suggestions
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+IndexKeys = List[Tuple[str, int]]
+
+# Operators that pin a field to one value or a set of values (the E in ESR)
+EQUALITY_OPERATORS = {"$eq", "$in"}
+
+
+def query_shape(value: Any) -> Any:
+    """A filter with every literal replaced by "?", so equal shapes compare equal"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        return [query_shape(item) for item in value]
+    return "?"
+
+
+def shape_key(*parts: Any) -> str:
+    """Stable string key for a query shape"""
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+def plan_stages(plan: Any) -> List[str]:
+    """Every stage name in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+def _index_names(plan: Any) -> List[str]:
+    names = []
+    if isinstance(plan, dict):
+        if plan.get("stage") == "IXSCAN" and "indexName" in plan:
+            names.append(plan["indexName"])
+        for value in plan.values():
+            names.extend(_index_names(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            names.extend(_index_names(item))
+    return names
+
+
+def winning_plan(explain: Dict[str, Any]) -> Any:
+    """Winning plan of a find or aggregate explain"""
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"]["winningPlan"]
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"]["queryPlanner"]["winningPlan"]
+    return explain
+
+
+def plan_summary(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Stages, indexes used and the two red flags of a winning plan"""
+    plan = winning_plan(explain)
+    stages = plan_stages(plan)
+    return {
+        "stages": stages,
+        "indexes": sorted(set(_index_names(plan))),
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+
+
+def _collect_fields(query: Dict[str, Any], equality: List[str], ranges: List[str]) -> None:
+    for key, value in query.items():
+        if key == "$and":
+            for clause in value:
+                _collect_fields(clause, equality, ranges)
+        elif key.startswith("$"):
+            continue  # $or / $expr cannot be served by one compound index prefix
+        elif isinstance(value, dict) and any(op.startswith("$") for op in value):
+            target = equality if set(value) <= EQUALITY_OPERATORS else ranges
+            if key not in target:
+                target.append(key)
+        elif key not in equality:
+            equality.append(key)
+
+
+def suggest_index(query: Dict[str, Any], sort: Optional[List[Tuple[str, int]]] = None) -> IndexKeys:
+    """
+    Compound index for a filter and sort, by the equality-sort-range rule
+
+    Returns:
+        Index keys, or an empty list if the query has no indexable fields
+    """
+    equality: List[str] = []
+    ranges: List[str] = []
+    _collect_fields(query or {}, equality, ranges)
+
+    keys: IndexKeys = [(field, 1) for field in equality]
+    for field, direction in sort or []:
+        if field not in equality:
+            keys.append((field, direction))
+    for field in ranges:
+        if all(field != existing for existing, _ in keys):
+            keys.append((field, 1))
+    return keys
+
+
+def index_covers(existing: IndexKeys, wanted: IndexKeys) -> bool:
+    """Whether an existing index starts with the wanted keys (either direction)"""
+    if len(existing) < len(wanted):
+        return False
+    forward = all(e == w for e, w in zip(existing, wanted))
+    backward = all(e[0] == w[0] and e[1] == -w[1] for e, w in zip(existing, wanted))
+    return forward or backward
@@ -0,0 +1,91 @@
+"""
+Dashboard Page-Load Benchmark
+Compares the per-endpoint request fan-out with the single /dashboard/bundle call
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+API_BASE_URL = "http://localhost:8000/api/v1"
+FIELD_ID = "field_001"
+
+# Standalone endpoint for each bundle section
+SECTION_ENDPOINTS = {
+    "today": "/dashboard/kpis/today",
+    "weekly": "/dashboard/kpis/weekly",
+    "alerts": "/alerts/active",
+    "pest_trend": "/pests/trend",
+    "canopy_trend": "/canopy/trend",
+    "pest_daily": "/pests/daily",
+    "canopy_daily": "/canopy/daily",
+}
+
+
+def load_fanout(session, pool, sections):
+    """Fetch each section from its own endpoint in parallel, like the browser does"""
+    def fetch(section):
+        response = session.get(f"{API_BASE_URL}{SECTION_ENDPOINTS[section]}", params={"field_id": FIELD_ID}, timeout=30)
+        return len(response.content)
+
+    start = time.perf_counter()
+    sizes = list(pool.map(fetch, sections))
+    return time.perf_counter() - start, sum(sizes)
+
+
+def load_bundle(session, sections):
+    """Fetch every section with one bundle request"""
+    start = time.perf_counter()
+    response = session.get(
+        f"{API_BASE_URL}/dashboard/bundle",
+        params={"field_id": FIELD_ID, "sections": ",".join(sections), "alerts_limit": 500},
+        timeout=30
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start, len(response.content)
+
+
+def summarize(name, timings, sizes):
+    """Print latency percentiles in milliseconds"""
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"   {name:<8} p50 {statistics.median(ms):7.1f} ms   p95 {p95:7.1f} ms   "
+          f"mean {statistics.mean(ms):7.1f} ms   {sizes[-1] / 1024:7.1f} KB/page")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--sections", default="today,weekly,alerts",
+                        help=f"Comma-separated sections ({', '.join(SECTION_ENDPOINTS)})")
+    parser.add_argument("--connections", type=int, default=6, help="Parallel connections for the fan-out (browsers use 6)")
+    args = parser.parse_args()
+    sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+
+    print("📊 Dashboard page-load benchmark")
+    print(f"   Field: {FIELD_ID}, sections: {', '.join(sections)}, iterations: {args.iterations}\n")
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=args.connections) as pool:
+        # Warm up connections and server-side caches for both paths
+        load_fanout(session, pool, sections)
+        load_bundle(session, sections)
+
+        results = {"fan-out": ([], []), "bundle": ([], [])}
+        for _ in range(args.iterations):
+            for name, load in (("fan-out", lambda: load_fanout(session, pool, sections)),
+                               ("bundle", lambda: load_bundle(session, sections))):
+                elapsed, size = load()
+                results[name][0].append(elapsed)
+                results[name][1].append(size)
+
+    for name, (timings, sizes) in results.items():
+        summarize(name, timings, sizes)
+
+    fanout = statistics.median(results["fan-out"][0])
+    bundle = statistics.median(results["bundle"][0])
+    print(f"\n   {len(sections)} requests -> 1, median page load {fanout / bundle:.2f}x faster with the bundle")
+
+
+if __name__ == "__main__":
+    main()
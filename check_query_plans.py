@@ -0,0 +1,165 @@
+"""
+Query Plan Checker for Agricultural Dashboard
+Runs explain() on the API's hot query shapes and fails if any needs a collection scan
+
+    python check_query_plans.py            # known alert and trend shapes
+    python check_query_plans.py --routes   # every query issued by every GET route
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.alerts import ALERT_SORT, alert_filter  # noqa: E402
+from app.utils.pagination import encode_cursor, keyset_filter  # noqa: E402
+from app.utils.query_plans import plan_stages, winning_plan  # noqa: E402
+
+MONGODB_URL = os.environ.get("MONGODB_URL", "mongodb://localhost:27017")
+MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "agri_dashboard")
+FIELD_ID = "field_001"
+ZONE_ID = "grid_3_5"
+
+# Routes that need an admin token or never touch MongoDB
+SKIPPED_ROUTES = ("/", "/health", "/metrics")
+SKIPPED_PREFIXES = ("/api/v1/admin",)
+
+
+def alert_shapes(db):
+    """(name, explain) for each alert listing shape"""
+    collection = db.alerts
+    sample = collection.find_one({"field_id": FIELD_ID, "status": "active"}, sort=ALERT_SORT)
+    cursor = encode_cursor(sample["date"], sample["_id"]) if sample else None
+
+    shapes = {
+        "alerts: active": alert_filter(FIELD_ID),
+        "alerts: active + severity": alert_filter(FIELD_ID, severity="critical"),
+        "alerts: active + type": alert_filter(FIELD_ID, alert_type="pest_outbreak"),
+        "alerts: active + zone": alert_filter(FIELD_ID, zone_id="grid_3_5"),
+        "alerts: active + crop": alert_filter(FIELD_ID, crop_type="wheat"),
+        "alerts: active + date range": alert_filter(FIELD_ID, start_date="2025-01-01", end_date="2025-12-31"),
+        "alerts: any status": alert_filter(FIELD_ID, status=None),
+    }
+    for name, query in shapes.items():
+        yield name, collection.find(query).sort(ALERT_SORT).limit(51).explain()
+        if cursor:
+            page_query = {"$and": [query, keyset_filter("date", cursor)]}
+            yield f"{name} (next page)", collection.find(page_query).sort(ALERT_SORT).limit(51).explain()
+
+    yield "alerts: facet counts", db.command(
+        "aggregate", "alerts",
+        pipeline=[{"$match": alert_filter(FIELD_ID)}, {"$sort": dict(ALERT_SORT)}, {"$facet": {"total": [{"$count": "count"}]}}],
+        explain=True
+    )
+
+
+def trend_shapes(db):
+    """(name, explain) for the daily trend and flight history shapes"""
+    end = datetime.utcnow()
+    start = end - timedelta(days=7)
+    yield "daily_data: trend window", db.daily_data.find({
+        "field_id": FIELD_ID,
+        "date": {"$gte": start.strftime("%Y-%m-%d"), "$lte": end.strftime("%Y-%m-%d")},
+    }).sort("date", 1).explain()
+    yield "flight_records: by field", db.flight_records.find({"field_id": FIELD_ID}).sort("date", -1).limit(50).explain()
+
+
+def sample_path_params(db):
+    """Values for the path parameters GET routes take"""
+    latest = db.daily_data.find_one({"field_id": FIELD_ID}, {"date": 1}, sort=[("date", -1)])
+    drone = db.drone_status.find_one({}, {"drone_id": 1})
+    return {
+        "field_id": FIELD_ID,
+        "date": latest["date"] if latest else datetime.utcnow().strftime("%Y-%m-%d"),
+        "drone_id": drone["drone_id"] if drone else "drone_001",
+        "zone_id": ZONE_ID,
+    }
+
+
+async def route_shapes(params):
+    """
+    Call every GET route in-process with a zero slow-query threshold
+
+    Every query the routes issue lands in the slow query log, which is then
+    explained shape by shape.
+    """
+    from fastapi.routing import APIRoute
+    import httpx
+    from app.core.config import settings
+    from app.core.database import db
+    from app.core.query_log import get_slow_queries, reset_slow_queries
+    from app.main import app
+
+    settings.SLOW_QUERY_LOG_ENABLED = True
+    settings.SLOW_QUERY_MS = 0.0
+    settings.SLOW_QUERY_MAX_SHAPES = 10_000
+
+    async with app.router.lifespan_context(app):
+        reset_slow_queries()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=120) as client:
+            for route in app.routes:
+                if not isinstance(route, APIRoute) or "GET" not in route.methods:
+                    continue
+                if route.path in SKIPPED_ROUTES or route.path.startswith(SKIPPED_PREFIXES):
+                    continue
+                path = route.path.format(**{p.name: params[p.name] for p in route.dependant.path_params})
+                query = {p.name: params[p.name] for p in route.dependant.query_params if p.required}
+                response = await client.get(path, params=query)
+                print(f"   {response.status_code}  GET {route.path}")
+        return await get_slow_queries(db.client)
+
+
+def check_routes(params):
+    """Explained query shapes of every GET route, as (name, stages, suggested index)"""
+    print("   Calling GET routes:")
+    shapes = asyncio.run(route_shapes(params))
+    print()
+    for shape in shapes:
+        name = f"{shape['collection']}.{shape['command']} {shape['shape']}"
+        plan = shape["plan"] or {}
+        if "error" in plan:
+            print(f"   ⚠️  explain failed for {name}: {plan['error']}")
+            continue
+        yield name, plan.get("stages", []), shape["suggested_index"]
+
+
+def main():
+    client = MongoClient(MONGODB_URL, serverSelectionTimeoutMS=5000)
+    db = client[MONGODB_DB_NAME]
+
+    print("🔍 Query plan check")
+    print(f"   Database: {MONGODB_DB_NAME}\n")
+
+    if "--routes" in sys.argv[1:]:
+        checked = check_routes(sample_path_params(db))
+    else:
+        checked = (
+            (name, plan_stages(winning_plan(explain)), None)
+            for name, explain in [*alert_shapes(db), *trend_shapes(db)]
+        )
+
+    failures = 0
+    for name, stages, suggested_index in checked:
+        if "COLLSCAN" in stages:
+            status = "❌ COLLSCAN"
+            failures += 1
+        elif "SORT" in stages:
+            status = "⚠️  in-memory sort"
+        else:
+            status = "✅"
+        print(f"   {status:<18} {name:<40} {' <- '.join(stages)}")
+        if suggested_index:
+            print(f"   {'':<18} suggested index: {suggested_index}")
+
+    client.close()
+    if failures:
+        print(f"\n❌ {failures} query shape(s) scan a whole collection")
+        sys.exit(1)
+    print("\n✅ No collection scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,16 @@ export const useWeeklyKPIs = (fieldId) => {
   })
 }
 
+// One request for the whole dashboard page
+export const useDashboardBundle = (fieldId, sections = ['today', 'weekly', 'alerts']) => {
+  return useQuery({
+    queryKey: ['dashboard', 'bundle', fieldId, sections.join(',')],
+    queryFn: () => dashboardAPI.getBundle(fieldId, sections).then(res => res.data.sections),
+    enabled: !!fieldId,
+    refetchInterval: 60000, // Refetch every minute
+  })
+}
+
 // Pest hooks
 export const usePestDaily = (fieldId, date, cropType) => {
   return useQuery({
@@ -95,3 +105,11 @@ export const useFlightHistory = (droneId = 'drone_001', limit = 30, fieldId) =>
     queryFn: () => droneAPI.getFlightHistory(droneId, limit, fieldId).then(res => res.data),
   })
 }
+
+export const useDroneTelemetry = (droneId = 'drone_001', maxPoints = 300) => {
+  return useQuery({
+    queryKey: ['drone', 'telemetry', droneId, maxPoints],
+    queryFn: () => droneAPI.getTelemetry(droneId, maxPoints).then(res => res.data),
+    refetchInterval: 10000,
+  })
+}
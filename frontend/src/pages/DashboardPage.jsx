@@ -1,4 +1,4 @@
-import { useTodayKPIs, useWeeklyKPIs, useActiveAlerts } from '../hooks/useApi'
+import { useDashboardBundle } from '../hooks/useApi'
 import AlertBanner from '../components/dashboard/AlertBanner'
 import KPICard from '../components/dashboard/KPICard'
 import PestTrendChart from '../components/charts/PestTrendChart'
@@ -8,11 +8,12 @@ import { Bug, Leaf, TrendingUp, Activity } from 'lucide-react'
 export default function DashboardPage() {
   const fieldId = 'field_001' // This would come from context/state
   
-  const { data: todayData, isLoading: loadingToday } = useTodayKPIs(fieldId)
-  const { data: weeklyData, isLoading: loadingWeekly } = useWeeklyKPIs(fieldId)
-  const { data: alertsData } = useActiveAlerts(fieldId)
+  const { data: bundle, isLoading } = useDashboardBundle(fieldId)
+  const todayData = bundle?.today
+  const weeklyData = bundle?.weekly
+  const alertsData = bundle?.alerts
 
-  if (loadingToday || loadingWeekly) {
+  if (isLoading) {
     return (
       <div className="flex items-center justify-center h-96">
         <div className="text-center">
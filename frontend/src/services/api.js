@@ -13,6 +13,8 @@ const apiClient = axios.create({
 export const dashboardAPI = {
   getTodayKPIs: (fieldId) => apiClient.get(`/dashboard/kpis/today?field_id=${fieldId}`),
   getWeeklyKPIs: (fieldId) => apiClient.get(`/dashboard/kpis/weekly?field_id=${fieldId}`),
+  getBundle: (fieldId, sections = ['today', 'weekly', 'alerts']) =>
+    apiClient.get(`/dashboard/bundle?field_id=${fieldId}&sections=${sections.join(',')}`),
 }
 
 // Pest API
@@ -54,6 +56,8 @@ export const insightsAPI = {
 export const alertsAPI = {
   getActive: (fieldId) => apiClient.get(`/alerts/active?field_id=${fieldId}`),
   acknowledge: (alertId) => apiClient.post(`/alerts/acknowledge/${alertId}`),
+  resolve: (alertId) => apiClient.post(`/alerts/resolve/${alertId}`),
+  bulkTransition: (action, selection) => apiClient.post(`/alerts/bulk/${action}`, selection),
 }
 
 // Analytics API
@@ -84,6 +88,8 @@ export const droneAPI = {
     apiClient.post(`/drone/update-status?drone_id=${droneId}`, data),
   logFlight: (data) => 
     apiClient.post('/drone/log-flight', data),
+  getTelemetry: (droneId = 'drone_001', maxPoints = 300) =>
+    apiClient.get(`/drone/telemetry/${droneId}?max_points=${maxPoints}`),
 }
 
 export default apiClient
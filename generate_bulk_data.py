@@ -0,0 +1,402 @@
+"""
+Bulk Data Generator for Agricultural Dashboard
+Seeded, vectorized field-day generator that bulk-loads MongoDB or writes ingestion files, one process per field
+
+    python generate_bulk_data.py --fields 500 --days 365 --grid 1000x1000 --workers 16
+    python generate_bulk_data.py --mode files --fields 5 --days 30 --grid 200x200 --out data/bulk
+    python generate_bulk_data.py --mode post --out data/bulk
+
+direct writes daily_data, grid_chunks and field_state in the format ingestion
+stores them. Alerts, cell statistics, anomaly baselines and change grids are
+derived by the ingestion pipeline and are not generated; use files + post to
+get those too.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.models.field_state import empty_alert_counts  # noqa: E402
+from app.services.field_state import state_aggregates  # noqa: E402
+from app.services.grid_store import build_layers  # noqa: E402
+from app.utils.chunks import split_into_chunks  # noqa: E402
+from app.utils.encoding import pack_array  # noqa: E402
+
+API_BASE_URL = "http://localhost:8000/api/v1"
+MONGODB_URL = os.environ.get("MONGODB_URL", "mongodb://localhost:27017")
+MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "agri_dashboard")
+CROP_TYPES = ["wheat", "corn", "soy"]
+GRID_RESOLUTION = 1.0
+DAILY_BATCH = 50  # daily_data documents per insert_many
+
+_db = None
+
+
+def field_id_for(index, prefix):
+    return f"{prefix}{index:04d}"
+
+
+def _bumps(rng, count, height, width, radius, strength):
+    """(cy, cx, radius, strength, vy, vx) rows for Gaussian features that drift a little each day"""
+    scale = min(height, width)
+    return np.column_stack([
+        rng.uniform(0, height, count),
+        rng.uniform(0, width, count),
+        rng.uniform(*radius, count) * scale,
+        rng.uniform(*strength, count),
+        rng.normal(0, scale * 0.002, count),
+        rng.normal(0, scale * 0.002, count),
+    ])
+
+
+def field_layout(seed, field_index, width, height):
+    """Everything that stays fixed for a field across the season"""
+    rng = np.random.default_rng([seed, field_index])
+
+    # One to three crop strips, split along a random axis
+    crop_count = int(rng.integers(1, 4))
+    crops = list(rng.choice(CROP_TYPES, size=crop_count, replace=False))
+    vertical = rng.random() < 0.5
+    length = width if vertical else height
+    bounds = np.sort(rng.integers(length // 5, max(length // 5 + 1, length * 4 // 5), size=crop_count - 1))
+    strip = np.searchsorted(bounds, np.arange(length), side="right").astype(np.uint8)
+    crop_index = np.broadcast_to(strip[None, :] if vertical else strip[:, None], (height, width))
+
+    return {
+        "field_index": field_index,
+        "crops": crops,
+        "crop_index": crop_index,
+        "pest_pressure": rng.uniform(0.5, 1.5),
+        "hotspots": _bumps(rng, int(rng.integers(2, 6)), height, width, (0.01, 0.05), (8.0, 25.0)),
+        "stress": _bumps(rng, int(rng.integers(1, 4)), height, width, (0.03, 0.10), (15.0, 35.0)),
+        "canopy_level": rng.uniform(65.0, 80.0),
+        "canopy_texture": rng.normal(0.0, 5.0, (max(2, height // 32), max(2, width // 32))),
+        "edge_drop": rng.uniform(5.0, 15.0),
+        "edge_width": rng.uniform(0.01, 0.04) * min(height, width),
+    }
+
+
+def _upsample(coarse, height, width):
+    """Bilinear upsampling of a coarse noise grid"""
+    rows, cols = coarse.shape
+    yi, xi = np.linspace(0, rows - 1, height), np.linspace(0, cols - 1, width)
+    y0, x0 = yi.astype(int), xi.astype(int)
+    y1, x1 = np.minimum(y0 + 1, rows - 1), np.minimum(x0 + 1, cols - 1)
+    fy, fx = (yi - y0)[:, None], (xi - x0)[None, :]
+    top = coarse[y0][:, x0] * (1 - fx) + coarse[y0][:, x1] * fx
+    bottom = coarse[y1][:, x0] * (1 - fx) + coarse[y1][:, x1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def _gaussian_sum(bumps, day, height, width, scale):
+    """Sum of separable Gaussian bumps at their day-shifted positions"""
+    ys = np.arange(height, dtype=np.float64)
+    xs = np.arange(width, dtype=np.float64)
+    total = np.zeros((height, width))
+    for cy, cx, radius, strength, vy, vx in bumps:
+        gy = np.exp(-((ys - (cy + vy * day) % height) ** 2) / (2 * radius ** 2))
+        gx = np.exp(-((xs - (cx + vx * day) % width) ** 2) / (2 * radius ** 2))
+        total += strength * scale * np.outer(gy, gx)
+    return total
+
+
+def generate_day(layout, seed, day, days, height, width):
+    """
+    One field-day: pest counts per cell (uint32) and canopy cover (rounded to 0.1)
+
+    Seeded by (seed, field, day), so any day can be regenerated on its own.
+    """
+    rng = np.random.default_rng([seed, layout["field_index"], day + 1])
+    season = np.sin(np.pi * (day + 0.5) / days)
+
+    intensity = rng.uniform(0.6, 1.4) * season * layout["pest_pressure"]
+    rate = 0.2 + intensity + _gaussian_sum(layout["hotspots"], day, height, width, intensity)
+    counts = rng.poisson(rate).astype(np.uint32)
+
+    edge = np.minimum.outer(
+        np.minimum(np.arange(height), np.arange(height)[::-1]),
+        np.minimum(np.arange(width), np.arange(width)[::-1]),
+    )
+    canopy = (
+        layout["canopy_level"] * (0.8 + 0.2 * season)
+        + _upsample(layout["canopy_texture"], height, width)
+        - layout["edge_drop"] * np.exp(-edge / layout["edge_width"])
+        - _gaussian_sum(layout["stress"], day, height, width, season)
+        + rng.normal(0.0, 1.5, (height, width))
+    )
+    return counts, np.clip(canopy, 15.0, 95.0).round(1)
+
+
+def critical_zones(counts, crop_index, crops, canopy):
+    """Ingestion's critical zone rule (warning-level hotspots that are pest- or canopy-critical), vectorized"""
+    zones = []
+    for i, crop in enumerate(crops):
+        ys, xs = np.nonzero((crop_index == i) & (counts >= settings.PEST_DENSITY_WARNING_THRESHOLD))
+        cell_counts = counts[ys, xs]
+        critical = (cell_counts >= settings.PEST_DENSITY_CRITICAL_THRESHOLD) | (canopy[ys, xs] < settings.CANOPY_CRITICAL_THRESHOLD)
+        ys, xs, cell_counts = ys[critical], xs[critical], cell_counts[critical]
+        for j in np.argsort(-cell_counts.astype(np.int64), kind="stable")[:10]:
+            zones.append({
+                "zone_id": f"grid_{xs[j]}_{ys[j]}",
+                "pest_density": round(float(cell_counts[j]) / GRID_RESOLUTION ** 2, 2),
+                "pest_count": int(cell_counts[j]),
+                "crop_type": crop,
+                "canopy_cover": float(canopy[ys[j], xs[j]]),
+                "risk_level": "critical",
+            })
+    return zones[:10]
+
+
+def day_products(layout, counts, canopy):
+    """Per-crop heatmaps and the aggregates ingestion stores"""
+    crops, crop_index = layout["crops"], layout["crop_index"]
+    totals = np.bincount(crop_index.ravel(), weights=counts.ravel(), minlength=len(crops))
+    heatmaps = {
+        crop: np.where(crop_index == i, counts, 0).astype(np.uint32)
+        for i, crop in enumerate(crops) if totals[i] > 0
+    }
+    pest_counts_by_crop = {crop: int(totals[i]) for i, crop in enumerate(crops) if totals[i] > 0}
+    aggregates = {
+        "pest_count": sum(pest_counts_by_crop.values()),
+        "pest_counts_by_crop": pest_counts_by_crop,
+        "avg_canopy": round(float(canopy.mean()), 2),
+        "min_canopy": round(float(canopy.min()), 2),
+        "max_canopy": round(float(canopy.max()), 2),
+        "critical_zones": critical_zones(counts, crop_index, crops, canopy),
+    }
+    return heatmaps, aggregates
+
+
+def pest_grid_json(counts, crop_index, crops):
+    """pest_grid as JSON text, built with array string ops instead of a list of dicts"""
+    suffixes = np.array([f',"crop_type":"{crop}"}}' for crop in crops])[crop_index]
+    cells = np.char.add(np.char.add('{"count":', counts.astype(str)), suffixes)
+    return "[" + ",".join("[" + ",".join(row) + "]" for row in cells.tolist()) + "]"
+
+
+def _init_worker(mongodb_url, db_name):
+    global _db
+    if mongodb_url:
+        from pymongo import MongoClient
+        _db = MongoClient(mongodb_url)[db_name]
+
+
+def _daily_document(field_id, date, timestamp, layout, counts, canopy, heatmaps, aggregates, dimensions):
+    height, width = counts.shape
+    inline = height * width <= settings.INLINE_GRID_MAX_CELLS
+    document = {
+        "field_id": field_id,
+        "date": date,
+        "timestamp": timestamp,
+        "pest_grid": [],
+        "canopy_cover": [],
+        "grid_storage": "inline" if inline else "chunked",
+        "field_dimensions": dimensions,
+        "aggregates": aggregates,
+        "heatmaps": {"pest_density_by_crop": {}, "canopy_grid": []},
+        "metadata": {"generator": "generate_bulk_data"},
+    }
+    if inline:
+        canopy_list = canopy.tolist()
+        document["pest_grid"] = json.loads(pest_grid_json(counts, layout["crop_index"], layout["crops"]))
+        document["canopy_cover"] = canopy_list
+        document["heatmaps"] = {
+            "pest_density_by_crop": {crop: heatmap.astype(float).tolist() for crop, heatmap in heatmaps.items()},
+            "canopy_grid": canopy_list,
+        }
+    return document
+
+
+def _chunk_documents(field_id, date, layers):
+    """grid_chunks documents, as write_layers stores them"""
+    chunk_size = settings.GRID_CHUNK_SIZE
+    return [
+        {
+            "field_id": field_id,
+            "date": date,
+            "layer": layer,
+            "chunk_row": chunk_row,
+            "chunk_col": chunk_col,
+            "chunk_size": chunk_size,
+            "grid_shape": list(grid.shape),
+            "shape": list(block.shape),
+            "dtype": block.dtype.name,
+            "data": pack_array(block),
+        }
+        for layer, grid in layers.items()
+        for chunk_row, chunk_col, block in split_into_chunks(grid, chunk_size)
+    ]
+
+
+def _write_field_state(field_id, latest, previous):
+    _db.field_state.update_one(
+        {"field_id": field_id},
+        {
+            "$set": {
+                "field_id": field_id,
+                "latest_date": latest["date"],
+                "latest_timestamp": latest["timestamp"],
+                "latest_aggregates": state_aggregates(latest["aggregates"]),
+                "previous_date": previous["date"] if previous else None,
+                "previous_aggregates": state_aggregates(previous["aggregates"]) if previous else {},
+                "updated_at": datetime.utcnow(),
+            },
+            "$setOnInsert": {"active_alerts": empty_alert_counts()},
+            "$inc": {"data_version": 1},
+        },
+        upsert=True,
+    )
+
+
+def generate_field(job):
+    """Generate (and store or write out) every day of one field; returns a summary"""
+    args, field_index = job
+    width, height = args["width"], args["height"]
+    field_id = field_id_for(field_index, args["prefix"])
+    start_date = datetime.strptime(args["start_date"], "%Y-%m-%d")
+    dates = [(start_date + timedelta(days=day)).strftime("%Y-%m-%d") for day in range(args["days"])]
+    dimensions = {"width_m": width * GRID_RESOLUTION, "height_m": height * GRID_RESOLUTION, "grid_resolution": GRID_RESOLUTION}
+    layout = field_layout(args["seed"], field_index, width, height)
+
+    started = time.perf_counter()
+    written_bytes = chunks = 0
+    pending, recent = [], []
+    out = None
+
+    if args["mode"] == "direct":
+        # Make reruns idempotent for the generated date range
+        date_range = {"field_id": field_id, "date": {"$gte": dates[0], "$lte": dates[-1]}}
+        _db.daily_data.delete_many(date_range)
+        _db.grid_chunks.delete_many(date_range)
+    else:
+        os.makedirs(args["out"], exist_ok=True)
+        out = gzip.open(os.path.join(args["out"], f"{field_id}.jsonl.gz"), "wt", encoding="utf-8", compresslevel=3)
+
+    try:
+        for day, date in enumerate(dates):
+            counts, canopy = generate_day(layout, args["seed"], day, args["days"], height, width)
+            timestamp = datetime.strptime(date, "%Y-%m-%d").replace(hour=7)
+
+            if args["mode"] == "files":
+                line = (
+                    f'{{"field_id":"{field_id}","timestamp":"{timestamp.isoformat()}",'
+                    f'"pest_grid":{pest_grid_json(counts, layout["crop_index"], layout["crops"])},'
+                    f'"canopy_cover":{json.dumps(canopy.tolist())},'
+                    f'"field_dimensions":{json.dumps(dimensions)},"metadata":{{"generator":"generate_bulk_data"}}}}\n'
+                )
+                out.write(line)
+                written_bytes += len(line)
+                continue
+
+            heatmaps, aggregates = day_products(layout, counts, canopy)
+            layer_docs = _chunk_documents(field_id, date, build_layers(canopy, heatmaps))
+            _db.grid_chunks.insert_many(layer_docs, ordered=False)
+            chunks += len(layer_docs)
+            written_bytes += sum(len(doc["data"]) for doc in layer_docs)
+
+            pending.append(_daily_document(field_id, date, timestamp, layout, counts, canopy, heatmaps, aggregates, dimensions))
+            recent = (recent + [{"date": date, "timestamp": timestamp, "aggregates": aggregates}])[-2:]
+            if len(pending) >= DAILY_BATCH:
+                _db.daily_data.insert_many(pending, ordered=False)
+                pending = []
+
+        if pending:
+            _db.daily_data.insert_many(pending, ordered=False)
+        if recent:
+            _write_field_state(field_id, recent[-1], recent[0] if len(recent) > 1 else None)
+    finally:
+        if out is not None:
+            out.close()
+
+    return {"field_id": field_id, "days": len(dates), "chunks": chunks,
+            "bytes": written_bytes, "seconds": time.perf_counter() - started}
+
+
+async def post_files(out_dir, base_url, concurrency, timeout):
+    """POST every written body to /ingestion/daily, fields in parallel and each field's days in order"""
+    import httpx
+
+    paths = sorted(os.path.join(out_dir, name) for name in os.listdir(out_dir) if name.endswith(".jsonl.gz"))
+    semaphore = asyncio.Semaphore(concurrency)
+    posted = failed = 0
+
+    async def post_field(client, path):
+        nonlocal posted, failed
+        async with semaphore:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    response = await client.post("/ingestion/daily", content=line.encode(),
+                                                 headers={"Content-Type": "application/json"})
+                    if response.status_code == 201:
+                        posted += 1
+                    else:
+                        failed += 1
+                        print(f"   ❌ {os.path.basename(path)}: {response.status_code} {response.text[:120]}")
+            print(f"   ✅ {os.path.basename(path)}")
+
+    print(f"📤 Posting {len(paths)} field files to {base_url}/ingestion/daily")
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        await asyncio.gather(*(post_field(client, path) for path in paths))
+    print(f"\n✅ {posted} days ingested, {failed} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["direct", "files", "post"], default="direct")
+    parser.add_argument("--fields", type=int, default=10)
+    parser.add_argument("--first-field", type=int, default=1, help="Index of the first generated field")
+    parser.add_argument("--prefix", default="bulk_field_", help="Field id prefix")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start-date", help="First day (default: --days before today)")
+    parser.add_argument("--grid", default="1000x1000", help="Grid size, WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="data/bulk", help="Directory for files / post mode")
+    parser.add_argument("--mongodb-url", default=MONGODB_URL)
+    parser.add_argument("--db", default=MONGODB_DB_NAME)
+    parser.add_argument("--base-url", default=API_BASE_URL, help="API for post mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Fields posted in parallel in post mode")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    if args.mode == "post":
+        asyncio.run(post_files(args.out, args.base_url, args.concurrency, args.timeout))
+        return
+
+    width, height = (int(v) for v in args.grid.lower().split("x"))
+    start_date = args.start_date or (datetime.utcnow() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+    job = {"mode": args.mode, "width": width, "height": height, "days": args.days, "start_date": start_date,
+           "seed": args.seed, "prefix": args.prefix, "out": args.out}
+    jobs = [(job, index) for index in range(args.first_field, args.first_field + args.fields)]
+
+    print("🌾 Bulk data generator")
+    print(f"   {args.fields} fields x {args.days} days from {start_date}, grid {width}x{height}, seed {args.seed}")
+    print(f"   Mode: {args.mode} ({args.db if args.mode == 'direct' else args.out}), {args.workers} workers\n")
+
+    mongodb_url = args.mongodb_url if args.mode == "direct" else None
+    started = time.perf_counter()
+    total_days = total_bytes = 0
+    with Pool(args.workers, initializer=_init_worker, initargs=(mongodb_url, args.db)) as pool:
+        for done, summary in enumerate(pool.imap_unordered(generate_field, jobs), start=1):
+            total_days += summary["days"]
+            total_bytes += summary["bytes"]
+            print(f"   [{done}/{len(jobs)}] {summary['field_id']}: {summary['days']} days, "
+                  f"{summary['bytes'] / 1e6:.1f} MB in {summary['seconds']:.1f} s")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {total_days} field-days, {total_bytes / 1e9:.2f} GB in {elapsed:.0f} s "
+          f"({total_days / elapsed:.1f} field-days/s)")
+
+
+if __name__ == "__main__":
+    main()
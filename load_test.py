@@ -0,0 +1,223 @@
+"""
+Load Test for Agricultural Dashboard
+Replays the 07:00 ingestion burst, polling dashboards and alert acknowledgements concurrently
+
+    python load_test.py --fields 20 --grid 200x200 --users 50 --duration 300
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+import numpy as np
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+API_BASE_URL = "http://localhost:8000/api/v1"
+MONGODB_URL = "mongodb://localhost:27017"
+CROP_TYPES = ["wheat", "corn"]
+
+# Requests a dashboard tab makes on first load, then on every poll
+PAGE_LOAD = [
+    ("GET /pests/trend", "/pests/trend", {"days": 7}),
+    ("GET /canopy/trend", "/canopy/trend", {"days": 7}),
+    ("GET /insights/zones", "/insights/zones", {}),
+]
+POLL = [
+    ("GET /dashboard/bundle", "/dashboard/bundle", {"sections": "today,weekly,alerts"}),
+    ("GET /alerts/active", "/alerts/active", {}),
+    ("GET /drone/status", "/drone/status", {"drone_id": "drone_001"}),
+]
+
+
+def field_ids(count):
+    return [f"load_field_{i:03d}" for i in range(1, count + 1)]
+
+
+def ingestion_body(field_id, width, height, timestamp, rng):
+    """Encoded /ingestion/daily body: Poisson pest counts with one hotspot, noisy canopy with one weak patch"""
+    counts = rng.poisson(2, (height, width))
+    y, x = rng.integers(0, max(1, height - 5)), rng.integers(0, max(1, width - 5))
+    counts[y:y + 5, x:x + 5] += 15
+    crops = np.where(np.arange(width) < width // 2, CROP_TYPES[0], CROP_TYPES[1])
+    canopy = np.clip(rng.normal(70, 10, (height, width)), 0, 100).round(1)
+    canopy[y:y + 4, x:x + 4] = 40.0
+
+    pest_grid = [
+        [{"count": int(c), "crop_type": crop} for c, crop in zip(row, crops)]
+        for row in counts.tolist()
+    ]
+    return json.dumps({
+        "field_id": field_id,
+        "timestamp": timestamp.isoformat(),
+        "pest_grid": pest_grid,
+        "canopy_cover": canopy.tolist(),
+        "field_dimensions": {"width_m": width, "height_m": height, "grid_resolution": 1.0},
+    }).encode()
+
+
+class Stats:
+    """Latencies and failures per route"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    async def call(self, client, route, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.latencies[route].append(time.perf_counter() - start)
+            self.errors[route] += 1
+            self.error_samples.setdefault(route, repr(e))
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+            self.error_samples.setdefault(route, f"{response.status_code} {response.text[:120]}")
+            return None
+        return response
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+async def ingestion_burst(client, stats, bodies, concurrency):
+    """All fields' morning flights arriving at once, at most concurrency in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ingest(body):
+        async with semaphore:
+            await stats.call(client, "POST /ingestion/daily", "POST", "/ingestion/daily",
+                             content=body, headers={"Content-Type": "application/json"})
+
+    await asyncio.gather(*(ingest(body) for body in bodies))
+
+
+async def dashboard_user(client, stats, field_id, deadline, args, rng):
+    """One agronomist tab: page load, then a poll every poll-min..poll-max seconds"""
+    await asyncio.sleep(rng.uniform(0, args.ramp))
+    for route, path, params in PAGE_LOAD:
+        await stats.call(client, route, "GET", path, params={"field_id": field_id, **params})
+
+    while time.monotonic() < deadline:
+        responses = await asyncio.gather(*(
+            stats.call(client, route, "GET", path, params={"field_id": field_id, **params})
+            for route, path, params in POLL
+        ))
+        alerts = responses[1].json().get("active_alerts", []) if responses[1] is not None else []
+        if alerts and rng.random() < args.ack_probability:
+            alert_id = rng.choice(alerts)["alert_id"]
+            await stats.call(client, "POST /alerts/acknowledge/{alert_id}", "POST", f"/alerts/acknowledge/{alert_id}")
+
+        await asyncio.sleep(min(rng.uniform(args.poll_min, args.poll_max), max(0.0, deadline - time.monotonic())))
+
+
+def opcounters(mongo):
+    """serverStatus opcounters, or None if mongod is unreachable"""
+    if mongo is None:
+        return None
+    try:
+        return dict(mongo.admin.command("serverStatus")["opcounters"])
+    except PyMongoError as e:
+        print(f"⚠️  Could not read serverStatus: {e}")
+        return None
+
+
+def report(stats, elapsed, ops_before, ops_after):
+    total = sum(len(v) for v in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"\n📊 {total} requests in {elapsed:.1f} s ({total / elapsed:.1f} req/s), "
+          f"{errors} errors ({errors / max(total, 1):.2%})\n")
+
+    print(f"   {'route':<38} {'count':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>7}")
+    for route in sorted(stats.latencies):
+        ms = sorted(t * 1000 for t in stats.latencies[route])
+        print(f"   {route:<38} {len(ms):>6} {len(ms) / elapsed:>7.2f} {statistics.median(ms):>6.1f}ms "
+              f"{percentile(ms, 95):>6.1f}ms {percentile(ms, 99):>6.1f}ms {ms[-1]:>6.1f}ms "
+              f"{stats.errors[route] / len(ms):>7.1%}")
+
+    for route, sample in stats.error_samples.items():
+        print(f"   ❌ {route}: {sample}")
+
+    if ops_before and ops_after:
+        print("\n   MongoDB operations (serverStatus opcounters):")
+        for op in ops_after:
+            delta = ops_after[op] - ops_before.get(op, 0)
+            print(f"   {op:<10} {delta:>9}   {delta / elapsed:>8.1f}/s   {delta / max(total, 1):>6.2f}/request")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    width, height = (int(v) for v in args.grid.lower().split("x"))
+    fields = field_ids(args.fields)
+    timestamp = datetime.utcnow().replace(hour=7, minute=0, second=0, microsecond=0)
+
+    print(f"   Encoding {len(fields)} ingestion bodies ({width}x{height})...")
+    np_rng = np.random.default_rng(args.seed)
+    bodies = [ingestion_body(field_id, width, height, timestamp, np_rng) for field_id in fields]
+    print(f"   {sum(map(len, bodies)) / len(bodies) / 1024:.0f} KB per body\n")
+
+    mongo = MongoClient(args.mongodb_url, serverSelectionTimeoutMS=3000) if args.mongodb_url else None
+    ops_before = opcounters(mongo)
+
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        start = time.monotonic()
+        deadline = start + args.duration
+        users = [
+            dashboard_user(client, stats, rng.choice(fields), deadline, args, random.Random(rng.random()))
+            for _ in range(args.users)
+        ]
+        await asyncio.gather(ingestion_burst(client, stats, bodies, args.burst_concurrency), *users)
+        elapsed = time.monotonic() - start
+
+    ops_after = opcounters(mongo)
+    if mongo is not None:
+        mongo.close()
+    report(stats, elapsed, ops_before, ops_after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=API_BASE_URL)
+    parser.add_argument("--mongodb-url", default=MONGODB_URL, help="For opcounters; empty to skip")
+    parser.add_argument("--fields", type=int, default=10, help="Fields ingesting in the morning burst")
+    parser.add_argument("--grid", default="50x50", help="Ingestion grid size, WIDTHxHEIGHT")
+    parser.add_argument("--burst-concurrency", type=int, default=10, help="Ingestions in flight at once")
+    parser.add_argument("--users", type=int, default=20, help="Dashboard users polling")
+    parser.add_argument("--duration", type=float, default=120.0, help="Seconds the users keep polling")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which users open their dashboard")
+    parser.add_argument("--poll-min", type=float, default=30.0)
+    parser.add_argument("--poll-max", type=float, default=60.0)
+    parser.add_argument("--ack-probability", type=float, default=0.1, help="Chance per poll that a user acknowledges an alert")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("🚜 Load test")
+    print(f"   Target: {args.base_url}")
+    print(f"   {args.fields} fields ingesting {args.grid}, {args.users} users polling every "
+          f"{args.poll_min:g}-{args.poll_max:g} s for {args.duration:g} s")
+
+    try:
+        httpx.get(args.base_url.rsplit("/api/", 1)[0] + "/health", timeout=5).raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"❌ API not reachable: {e}")
+        return
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Traffic Replay for Agricultural Dashboard
+Re-issues a captured request log (TRAFFIC_CAPTURE_ENABLED) against a test instance at original or scaled speed
+
+    python replay_traffic.py backend/data/traffic.jsonl --speed 4 --output release_a.json
+    python replay_traffic.py backend/data/traffic.jsonl --speed 4 --compare release_a.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+API_BASE_URL = "http://localhost:8000"
+READ_METHODS = ("GET", "HEAD")
+
+
+def load_capture(path, include_writes, limit):
+    """Captured requests in time order, and how many were skipped"""
+    entries, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            # Bodies are never captured, so only body-less writes can be replayed
+            if entry["m"] not in READ_METHODS and (not include_writes or entry.get("rb")):
+                skipped += 1
+                continue
+            entries.append(entry)
+    entries.sort(key=lambda entry: entry["t"])
+    return entries[:limit] if limit else entries, skipped
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+async def replay(entries, base_url, speed, concurrency, timeout):
+    """
+    Issue every entry at its captured offset divided by speed (open loop)
+
+    speed 0 sends back to back, at most concurrency in flight. Returns
+    (route, captured entry, status or None, seconds) per request.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def issue(client, entry):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(entry["m"], entry["p"], params=entry["q"])
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            results.append((f"{entry['m']} {entry['r'] or entry['p']}", entry, status, time.perf_counter() - start))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        t0 = entries[0]["t"]
+        start = time.monotonic()
+        tasks = []
+        for entry in entries:
+            if speed > 0:
+                delay = start + (entry["t"] - t0) / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(issue(client, entry)))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    """Per-route replay latency percentiles next to the captured ones"""
+    by_route = defaultdict(list)
+    for route, entry, status, seconds in results:
+        by_route[route].append((entry, status, seconds))
+
+    routes = {}
+    for route, rows in sorted(by_route.items()):
+        ms = sorted(seconds * 1000 for _, _, seconds in rows)
+        captured = sorted(entry["ms"] for entry, _, _ in rows)
+        routes[route] = {
+            "count": len(rows),
+            "p50_ms": round(statistics.median(ms), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "captured_p50_ms": round(statistics.median(captured), 2),
+            "errors": sum(1 for _, status, _ in rows if status is None or status >= 500),
+            "status_mismatches": sum(1 for entry, status, _ in rows if status != entry["s"]),
+        }
+    return {"requests": len(results), "elapsed_s": round(elapsed, 2),
+            "throughput": round(len(results) / elapsed, 2) if elapsed else None, "routes": routes}
+
+
+def print_summary(summary, baseline=None):
+    print(f"\n📊 {summary['requests']} requests in {summary['elapsed_s']} s ({summary['throughput']} req/s)\n")
+    print(f"   {'route':<44} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'captured':>9} {'errors':>6} {'status≠':>7}")
+    for route, stats in summary["routes"].items():
+        print(f"   {route:<44} {stats['count']:>6} {stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms "
+              f"{stats['p99_ms']:>7.1f}ms {stats['captured_p50_ms']:>7.1f}ms {stats['errors']:>6} {stats['status_mismatches']:>7}")
+
+    if baseline is None:
+        return
+    print("\n   Against baseline (p50 / p95 change):")
+    for route, stats in summary["routes"].items():
+        before = baseline["routes"].get(route)
+        if not before:
+            print(f"   {route:<44} (not in baseline)")
+            continue
+        p50 = (stats["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+        p95 = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        flag = "⚠️ " if p95 > 10 else "  "
+        print(f" {flag}{route:<44} {p50:+7.1f}% {p95:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Captured traffic log (TRAFFIC_CAPTURE_PATH)")
+    parser.add_argument("--base-url", default=API_BASE_URL, help="Test instance (captured paths include /api/v1)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time scale: 1 original, 4 four times faster, 0 back to back")
+    parser.add_argument("--concurrency", type=int, default=50, help="Most requests in flight at once")
+    parser.add_argument("--include-writes", action="store_true", help="Also replay body-less writes (e.g. alert acknowledgements)")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the summary as JSON (a baseline for --compare)")
+    parser.add_argument("--compare", help="Baseline summary JSON from an earlier run")
+    args = parser.parse_args()
+
+    entries, skipped = load_capture(args.capture, args.include_writes, args.limit)
+    print("🔁 Traffic replay")
+    print(f"   Target: {args.base_url}")
+    print(f"   {len(entries)} requests from {args.capture} ({skipped} writes skipped), speed {args.speed:g}x")
+    if not entries:
+        print("❌ Nothing to replay")
+        return
+
+    span = entries[-1]["t"] - entries[0]["t"]
+    if args.speed > 0:
+        print(f"   Captured span {span:.0f} s, replay takes about {span / args.speed:.0f} s")
+
+    results, elapsed = asyncio.run(replay(entries, args.base_url, args.speed, args.concurrency, args.timeout))
+    summary = summarize(results, elapsed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_summary(summary, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n✅ Summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()